@@ -0,0 +1,69 @@
+"""Benchmark of the binary container format against JSON, for size and speed.
+
+Writes synthetic phenopackets as one JSON file each (`MessageToJson`), as NDJSON and as varint length-delimited binary
+records, then reads them back (`read_phenopackets`, `Parse` per line, `read_phenopackets_from_binary`), and reports the
+size on disk and the time of both directions.
+
+Run with:
+    python benchmarks/bench_binary_format.py --phenopackets 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from google.protobuf.json_format import Parse
+from phenopackets.schema.v2 import Phenopacket
+
+from bench_write import make_phenopackets
+from phenopacket_mapper.pipeline import write, read_phenopackets, read_phenopackets_from_binary
+
+
+def read_ndjson(path: Path):
+    phenopackets_list = []
+    with open(path) as fh:
+        for line in fh:
+            phenopacket = Phenopacket()
+            Parse(line, phenopacket)
+            phenopackets_list.append(phenopacket)
+    return phenopackets_list
+
+
+def size_on_disk(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phenopackets', type=int, default=20_000)
+    args = parser.parse_args()
+
+    phenopackets_list = list(make_phenopackets(args.phenopackets))
+    mib = 1024 ** 2
+    print(f"{'format':>8} {'size [MiB]':>11} {'write [s]':>10} {'read [s]':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_format in ('json', 'ndjson', 'binary'):
+            out_dir = Path(tmp_dir) / file_format
+            start = time.perf_counter()
+            report = write(phenopackets_list, out_dir, file_format=file_format)
+            write_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if file_format == 'json':
+                read = read_phenopackets(out_dir)
+            elif file_format == 'ndjson':
+                read = read_ndjson(report.path)
+            else:
+                read = read_phenopackets_from_binary(report.path)
+            read_seconds = time.perf_counter() - start
+            assert len(read) == len(phenopackets_list)
+
+            size = size_on_disk(report.path or out_dir)
+            print(f"{file_format:>8} {size / mib:>11.2f} {write_seconds:>10.2f} {read_seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
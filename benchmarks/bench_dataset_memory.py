@@ -0,0 +1,53 @@
+"""Benchmark of the memory held by a `DataSet` with row and with columnar storage.
+
+Loads the synthetic registry export of `bench_load_data.py` with `storage='rows'` and `storage='columnar'` and reports
+the memory still allocated by the loaded `DataSet` (measured with `tracemalloc`), as well as the peak during loading.
+
+Run with:
+    python benchmarks/bench_dataset_memory.py --rows 10000 100000
+"""
+import argparse
+import gc
+import tempfile
+import tracemalloc
+import warnings
+from pathlib import Path
+
+from bench_load_data import DATA_MODEL, COLUMN_NAMES, make_csv
+from phenopacket_mapper.pipeline import load_data_using_data_model
+
+
+def measure(path: Path, storage: str):
+    """Returns the memory held by the loaded data set and the peak memory during loading, in bytes"""
+    gc.collect()
+    tracemalloc.start()
+    data_set = load_data_using_data_model(path, DATA_MODEL, dict(COLUMN_NAMES), storage=storage)
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data_set
+    return held, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    mib = 1024 ** 2
+    print(f"{'rows':>10} {'cells':>10} {'rows [MiB]':>11} {'columnar [MiB]':>15} {'ratio':>6} "
+          f"{'rows peak':>10} {'columnar peak':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.rows:
+            path = Path(tmp_dir) / f"data_{rows}.csv"
+            make_csv(path, rows)
+            rows_held, rows_peak = measure(path, 'rows')
+            columnar_held, columnar_peak = measure(path, 'columnar')
+            print(f"{rows:>10} {rows * len(DATA_MODEL.fields):>10} {rows_held / mib:>11.1f} "
+                  f"{columnar_held / mib:>15.1f} {rows_held / columnar_held:>5.1f}x "
+                  f"{rows_peak / mib:>10.1f} {columnar_peak / mib:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
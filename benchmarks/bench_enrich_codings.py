@@ -0,0 +1,57 @@
+"""Benchmark of `DataSet.enrich_codings` on a cohort with many coding cells but few distinct codes.
+
+The resolver answers after a fixed latency, like a remote API. Enriching resolves each distinct code once; the time
+of resolving every cell one at a time is estimated from a sample.
+
+Run with:
+    python benchmarks/bench_enrich_codings.py --rows 1000000 --codes 3000 --latency 0.001
+"""
+import argparse
+import random
+import time
+
+from phenopacket_mapper.api_requests import APIRequestSuperClass
+from phenopacket_mapper.data_standards import DataModel, DataField, ValueSet, ColumnarData, DataColumn, DataSet, \
+    Coding, HPO
+
+
+class SlowResolver(APIRequestSuperClass):
+    def __init__(self, latency: float, max_workers: int):
+        super().__init__(HPO, max_workers=max_workers)
+        self.latency = latency
+
+    def _fetch(self, concept_id):
+        time.sleep(self.latency)
+        return Coding(system=HPO, code=str(concept_id), display=f"Term {concept_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--codes', type=int, default=3_000)
+    parser.add_argument('--latency', type=float, default=0.001, help="Seconds per resolved code")
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    data_model = DataModel(data_model_name="bench", resources=[HPO], fields=(
+        DataField(name="Phenotype", specification=ValueSet([HPO])),
+    ))
+    codings = [Coding(system=HPO, code=f"{i:07d}") for i in range(args.codes)]
+    column = DataColumn.from_values([random.choice(codings) for _ in range(args.rows)])
+    data_set = DataSet(data_model=data_model,
+                       data=ColumnarData(data_model=data_model, columns=[column], row_nos=range(args.rows)))
+    resolver = SlowResolver(args.latency, args.workers)
+
+    sample = column.values[:1000]
+    start = time.perf_counter()
+    for coding in sample:
+        resolver.get(coding.code)
+    print(f"per cell (estimated): {(time.perf_counter() - start) * args.rows / len(sample):.2f} s")
+
+    start = time.perf_counter()
+    changed = data_set.enrich_codings(resolver)
+    print(f"enrich_codings:       {time.perf_counter() - start:.2f} s ({changed} values changed)")
+
+
+if __name__ == '__main__':
+    main()
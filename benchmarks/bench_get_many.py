@@ -0,0 +1,71 @@
+"""Benchmark of resolving HPO codes one at a time with `get` and in a batch with `get_many`.
+
+Serves labels from a local stand-in for the HPO API that answers after a fixed latency, as a remote API would, and
+compares resolving the codes sequentially, concurrently, and again from the cache.
+
+Run with:
+    python benchmarks/bench_get_many.py --codes 2000 --latency 0.02 --workers 16
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from phenopacket_mapper.api_requests import HPOAPIRequest, APIRequestCache
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        data = json.dumps({"name": f"Term {self.path.rsplit(':', 1)[-1]}"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--codes', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds the server takes to answer")
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    Handler.latency = args.latency
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_port}/api/hp/terms/HP:"
+    codes = [f"{i:07d}" for i in range(args.codes)]
+
+    hpo = HPOAPIRequest(api_base_url=url)
+    sample = codes[:max(1, len(codes) // 10)]
+    start = time.perf_counter()
+    for code in sample:
+        hpo.get(code)
+    elapsed = (time.perf_counter() - start) * len(codes) / len(sample)
+    print(f"get (estimated):  {elapsed:.2f} s")
+
+    cache = APIRequestCache()
+    hpo = HPOAPIRequest(api_base_url=url, cache=cache, max_workers=args.workers)
+    start = time.perf_counter()
+    hpo.get_many(codes)
+    print(f"get_many:         {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    hpo.get_many(codes)
+    print(f"get_many, cached: {time.perf_counter() - start:.2f} s")
+
+    httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
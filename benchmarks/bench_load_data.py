@@ -0,0 +1,114 @@
+"""Benchmark of `load_data_using_data_model` against the previous row-by-row loader.
+
+Generates a synthetic registry export with ERDRI-CDS-like columns and times loading it with the column-wise loader and
+with a reference copy of the row-wise loader that used `loc_default` and `math.isnan` per cell.
+
+Run with:
+    python benchmarks/bench_load_data.py --rows 10000 100000 1000000
+"""
+import argparse
+import math
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from phenopacket_mapper.data_standards import DataModel, DataField, DataModelInstance, DataFieldValue, DataSet, \
+    ValueSet, Date
+from phenopacket_mapper.data_standards.code_system import ORDO, OMIM, HPO
+from phenopacket_mapper.pipeline import load_data_using_data_model
+from phenopacket_mapper.utils import loc_default, parsing
+
+DATA_MODEL = DataModel(
+    data_model_name="Benchmark data model",
+    resources=[ORDO, OMIM, HPO],
+    fields=(
+        DataField(name="Pseudonym", specification=str),
+        DataField(name="Date of Birth", specification=Date),
+        DataField(name="Sex", specification=ValueSet(["Female", "Male", "Undetermined"])),
+        DataField(name="Age", specification=int),
+        DataField(name="Diagnosis", specification=ValueSet([ORDO])),
+        DataField(name="Genetic diagnosis", specification=ValueSet([OMIM]), required=False),
+        DataField(name="Phenotype", specification=ValueSet([HPO]), required=False),
+    )
+)
+
+COLUMN_NAMES = {
+    "pseudonym": "pseudonym",
+    "date_of_birth": "date_of_birth",
+    "sex": "sex",
+    "age": "age",
+    "diagnosis": "diagnosis",
+    "genetic_diagnosis": "genetic_diagnosis",
+    "phenotype": "phenotype",
+}
+
+
+def make_csv(path: Path, rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1940, 2020, rows)
+    months = rng.integers(1, 13, rows)
+    days = rng.integers(1, 29, rows)
+    genetic = rng.choice(["OMIM:614106", "OMIM:300377", ""], rows)
+    pd.DataFrame({
+        "pseudonym": [f"patient{i}" for i in range(rows)],
+        "date_of_birth": [f"{d:02d}/{m:02d}/{y}" for d, m, y in zip(days, months, years)],
+        "sex": rng.choice(["Female", "Male", "Undetermined"], rows),
+        "age": rng.integers(0, 99, rows),
+        "diagnosis": rng.choice(["ORPHA:206638", "ORPHA:95157", "ORPHA:558", "ORPHA:79445"], rows),
+        "genetic_diagnosis": np.where(genetic == "", None, genetic),
+        "phenotype": rng.choice(["HP:0000098", "HP:0001250", "HP:0004322"], rows),
+    }).to_csv(path, index=False)
+
+
+def legacy_load(path: Path, data_model: DataModel, column_names, compliance='lenient') -> DataSet:
+    """Reference copy of the row-wise loader"""
+    df = pd.read_csv(path)
+    data_model_instances = []
+    for i in range(len(df)):
+        values = []
+        for f in data_model.fields:
+            pandas_value = loc_default(df, row_index=i, column_name=column_names[f.id])
+            if not pandas_value or (isinstance(pandas_value, float) and math.isnan(pandas_value)):
+                continue
+            value = parsing.parse_value(value_str=str(pandas_value), resources=data_model.resources,
+                                        compliance=compliance)
+            values.append(DataFieldValue(row_no=i, field=f, value=value))
+        data_model_instances.append(
+            DataModelInstance(row_no=i, data_model=data_model, values=values, compliance=compliance)
+        )
+    return DataSet(data_model=data_model, data=data_model_instances)
+
+
+def time_it(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--legacy-max-rows', type=int, default=100_000,
+                        help='Skip the row-wise reference loader above this number of rows')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    print(f"{'rows':>10} {'column-wise [s]':>16} {'row-wise [s]':>14} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.rows:
+            path = Path(tmp_dir) / f"data_{rows}.csv"
+            make_csv(path, rows)
+            new = time_it(load_data_using_data_model, path, DATA_MODEL, dict(COLUMN_NAMES))
+            if rows <= args.legacy_max_rows:
+                old = time_it(legacy_load, path, DATA_MODEL, COLUMN_NAMES)
+                print(f"{rows:>10} {new:>16.2f} {old:>14.2f} {old / new:>7.1f}x")
+            else:
+                print(f"{rows:>10} {new:>16.2f} {'skipped':>14} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark of `LocalOntologyRequest` on a synthetic ontology of the size of the HPO.
+
+Writes an OBO file, then measures building the index on first use, opening the prebuilt index on later runs, and the
+time per label lookup.
+
+Run with:
+    python benchmarks/bench_local_ontology.py --terms 20000 --lookups 100000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from phenopacket_mapper.api_requests import LocalOntologyRequest
+from phenopacket_mapper.data_standards import HPO
+
+
+def write_obo(path: Path, n: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("format-version: 1.2\nontology: hp\n")
+        for i in range(n):
+            f.write(f"\n[Term]\nid: HP:{i:07d}\nname: Synthetic phenotype {i}\n")
+            f.write(f'synonym: "Phenotype number {i}" EXACT []\n')
+            if i:
+                f.write(f"is_a: HP:{(i - 1) // 3:07d} ! parent\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--terms', type=int, default=20_000)
+    parser.add_argument('--lookups', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "hp.obo"
+        write_obo(path, args.terms)
+
+        start = time.perf_counter()
+        LocalOntologyRequest(path, HPO).close()
+        print(f"first run (parse + build index): {time.perf_counter() - start:.3f} s")
+
+        start = time.perf_counter()
+        hpo = LocalOntologyRequest(path, HPO)
+        print(f"later run (open index):          {time.perf_counter() - start:.4f} s")
+
+        codes = [f"{random.randrange(args.terms):07d}" for _ in range(args.lookups)]
+        start = time.perf_counter()
+        for code in codes:
+            hpo.get(code)
+        print(f"get:                             {(time.perf_counter() - start) / len(codes) * 1e6:.1f} us/lookup")
+        hpo.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Benchmark of checking codings against a `ValueSet` with an `OntologySubtree`.
+
+Builds a synthetic ontology of the size of the HPO with several parents per term, then measures creating the subtree
+of a term near the top and the time per membership check of random codings.
+
+Run with:
+    python benchmarks/bench_ontology_subtree.py --terms 20000 --values 1000000
+"""
+import argparse
+import random
+import time
+
+from phenopacket_mapper.data_standards import OntologyHierarchy, OntologySubtree, ValueSet, Coding, HPO
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--terms', type=int, default=20_000)
+    parser.add_argument('--values', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    parents = {"HP:0000000": ()}
+    for i in range(1, args.terms):
+        parents[f"HP:{i:07d}"] = tuple({f"HP:{random.randrange(i):07d}" for _ in range(2)})
+    hierarchy = OntologyHierarchy(parents)
+
+    start = time.perf_counter()
+    value_set = ValueSet([OntologySubtree(HPO, "HP:0000001", hierarchy)])
+    print(f"subtree: {time.perf_counter() - start:.3f} s ({len(value_set.elements[0].codes)} terms)")
+
+    codings = [Coding(system=HPO, code=f"{random.randrange(args.terms):07d}") for _ in range(args.values)]
+    start = time.perf_counter()
+    n = sum(coding in value_set for coding in codings)
+    elapsed = time.perf_counter() - start
+    print(f"checks:  {elapsed:.2f} s, {elapsed / len(codings) * 1e6:.2f} us/value ({n} in the value set)")
+
+
+if __name__ == '__main__':
+    main()
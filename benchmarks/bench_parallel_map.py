@@ -0,0 +1,62 @@
+"""Benchmark of `PhenopacketMapper.map` across numbers of worker processes.
+
+Loads the synthetic registry export of `bench_load_data.py` and maps it with 1, 2, 4, ... worker processes, reporting
+the time, the throughput and the speedup over a single process.
+
+Run with:
+    python benchmarks/bench_parallel_map.py --rows 100000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import phenopackets
+
+from bench_load_data import DATA_MODEL, COLUMN_NAMES, make_csv
+from phenopacket_mapper import PhenopacketMapper
+from phenopacket_mapper.mapping import PhenopacketBuildingBlock
+from phenopacket_mapper.pipeline import load_data_using_data_model
+
+MAPPER = PhenopacketMapper(
+    data_model=DATA_MODEL,
+    id=DATA_MODEL.pseudonym,
+    subject=PhenopacketBuildingBlock(
+        phenopackets.Individual,
+        id=DATA_MODEL.pseudonym,
+        date_of_birth=DATA_MODEL.date_of_birth,
+    ),
+    diseases=[PhenopacketBuildingBlock(phenopackets.Disease, term=DATA_MODEL.diagnosis)],
+    phenotypic_features=[PhenopacketBuildingBlock(phenopackets.PhenotypicFeature, type=DATA_MODEL.phenotype)],
+)
+
+
+def main():
+    default_workers = [w for w in (1, 2, 4, 8, 16, 32) if w <= (os.cpu_count() or 1)]
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers)
+    parser.add_argument('--chunk-size', type=int, default=1_000)
+    parser.add_argument('--storage', choices=['rows', 'columnar'], default='rows')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / f"data_{args.rows}.csv"
+        make_csv(path, args.rows)
+        data_set = load_data_using_data_model(path, DATA_MODEL, dict(COLUMN_NAMES), storage=args.storage)
+
+    print(f"{'workers':>8} {'time [s]':>9} {'records/s':>10} {'speedup':>8}")
+    single = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        MAPPER.map(data_set, workers=workers, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        single = single or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {args.rows / elapsed:>10.0f} {single / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark of reading a directory of phenopacket JSON files, serially and in pools of threads and processes.
+
+Writes synthetic phenopackets into hashed subdirectories, then reads them back with `iter_phenopackets` for each
+number of workers and executor, and reports the throughput in files/s and the peak memory of the reading process.
+
+Run with:
+    python benchmarks/bench_read_phenopackets.py --phenopackets 50000 --workers 1 4 8
+"""
+import argparse
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from bench_write import make_phenopackets
+from phenopacket_mapper.pipeline import write, iter_phenopackets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phenopackets', type=int, default=20_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--shard-depth', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write(make_phenopackets(args.phenopackets), tmp_dir, shard_depth=args.shard_depth, workers=4)
+        print(f"{'workers':>8} {'executor':>9} {'files/s':>9} {'peak RSS [MiB]':>15}")
+        for workers in args.workers:
+            for executor in (['thread'] if workers == 1 else ['thread', 'process']):
+                start = time.perf_counter()
+                n = sum(1 for _ in iter_phenopackets(Path(tmp_dir), recursive=True, workers=workers,
+                                                     executor=executor))
+                seconds = time.perf_counter() - start
+                assert n == args.phenopackets
+                peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                print(f"{workers:>8} {executor:>9} {n / seconds:>9.0f} {peak:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
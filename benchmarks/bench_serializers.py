@@ -0,0 +1,46 @@
+"""Benchmark of the 'fast' JSON serializer against `MessageToJson`, for size and speed.
+
+Parses the phenopackets in `res/test_data/erdri/output`, replicates them, serializes them with `MessageToJson` (as
+`write` does by default), `MessageToJson` without indentation and the 'fast' serializer of `pipeline.serializers`, and
+reports the time and the total size of the output. Each output of the 'fast' serializer is checked to parse to the same
+JSON as the `MessageToJson` output.
+
+Run with:
+    python benchmarks/bench_serializers.py --copies 2000
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from phenopacket_mapper.pipeline import read_phenopackets
+from phenopacket_mapper.pipeline.serializers import to_json
+
+ERDRI_OUTPUT = Path(__file__).parents[1] / "res" / "test_data" / "erdri" / "output"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--copies', type=int, default=2000, help="Number of copies of each ERDRI phenopacket")
+    parser.add_argument('--input-dir', type=Path, default=ERDRI_OUTPUT)
+    args = parser.parse_args()
+
+    phenopackets_list = read_phenopackets(args.input_dir) * args.copies
+    mib = 1024 ** 2
+    print(f"{len(phenopackets_list)} phenopackets")
+    print(f"{'serializer':>18} {'size [MiB]':>11} {'time [s]':>9} {'phenopackets/s':>15}")
+    outputs = {}
+    for name, serializer, compact in (('protobuf', 'protobuf', False), ('protobuf compact', 'protobuf', True),
+                                      ('fast', 'fast', True)):
+        start = time.perf_counter()
+        outputs[name] = [to_json(p, serializer=serializer, compact=compact) for p in phenopackets_list]
+        seconds = time.perf_counter() - start
+        size = sum(len(s.encode('utf-8')) for s in outputs[name])
+        print(f"{name:>18} {size / mib:>11.2f} {seconds:>9.2f} {len(phenopackets_list) / seconds:>15.0f}")
+
+    assert all(json.loads(fast) == json.loads(pretty) for fast, pretty in zip(outputs['fast'], outputs['protobuf']))
+    print("fast output is equivalent to MessageToJson")
+
+
+if __name__ == "__main__":
+    main()
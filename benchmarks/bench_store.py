@@ -0,0 +1,67 @@
+"""Benchmark of random access by id with `PhenopacketStore`, against reading all phenopackets to find one.
+
+Writes synthetic phenopackets as NDJSON and as binary files, builds the index of each, and reports the time to build
+it, the time to append a tenth more phenopackets and update the index, and the mean time to fetch a random phenopacket
+by id.
+
+Run with:
+    python benchmarks/bench_store.py --phenopackets 100000 --lookups 10000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from bench_write import make_phenopackets
+from phenopacket_mapper.pipeline import write, PhenopacketStore, iter_phenopackets_from_binary
+from phenopacket_mapper.utils import encode_varint
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phenopackets', type=int, default=50_000)
+    parser.add_argument('--lookups', type=int, default=5_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    lookup_ids = [f"patient{rng.randrange(args.phenopackets)}" for _ in range(args.lookups)]
+    print(f"{'format':>7} {'index [s]':>10} {'update [s]':>11} {'lookup [us]':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_format in ('ndjson', 'binary'):
+            out_dir = Path(tmp_dir) / file_format
+            report = write(make_phenopackets(args.phenopackets), out_dir, file_format=file_format,
+                           serializer='fast')
+
+            start = time.perf_counter()
+            store = PhenopacketStore(out_dir / "index.sqlite", [report.path])
+            index_seconds = time.perf_counter() - start
+
+            with open(report.path, 'ab') as fh:
+                for phenopacket in make_phenopackets(args.phenopackets // 10):
+                    phenopacket.id = "appended_" + phenopacket.id
+                    if file_format == 'binary':
+                        data = phenopacket.SerializeToString()
+                        fh.write(encode_varint(len(data)) + data)
+                    else:
+                        fh.write(b'{"id":"%s"}\n' % phenopacket.id.encode())
+            start = time.perf_counter()
+            store.update()
+            update_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for phenopacket_id in lookup_ids:
+                assert store[phenopacket_id].id == phenopacket_id
+            lookup_seconds = (time.perf_counter() - start) / args.lookups
+            store.close()
+            print(f"{file_format:>7} {index_seconds:>10.2f} {update_seconds:>11.2f} {lookup_seconds * 1e6:>12.1f}")
+
+        start = time.perf_counter()
+        next(p for p in iter_phenopackets_from_binary(Path(tmp_dir) / "binary" / "phenopackets.pb")
+             if p.id == lookup_ids[0])
+        print(f"for comparison, finding one phenopacket by scanning the binary file: "
+              f"{(time.perf_counter() - start) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark of the peak memory of the load, map and write pipeline, in memory and streaming.
+
+For each number of rows, the synthetic registry export of `bench_load_data.py` is mapped and written to JSON files
+once with `load_data` + `map` + `write`, which hold the whole cohort in memory, and once with `iter_data` + `imap` +
+`write`, which only hold one chunk at a time. The peak memory is measured with `tracemalloc` and should stay flat for
+the streaming pipeline as the number of rows grows. The cache of parsed values is disabled for the streaming pipeline by
+default, as it is shared by all chunks and grows (up to its maximum size) with the number of distinct values.
+
+Run with:
+    python benchmarks/bench_streaming_map.py --rows 10000 20000 40000 --chunk-size 1000
+"""
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+from bench_load_data import DATA_MODEL, COLUMN_NAMES, make_csv
+from bench_parallel_map import MAPPER
+from phenopacket_mapper.pipeline import write
+
+COLUMN_KWARGS = {f"{field_id}_column": column for field_id, column in COLUMN_NAMES.items()}
+
+
+def in_memory(path: Path, out_dir: Path, args: argparse.Namespace):
+    data_set = DATA_MODEL.load_data(path, **COLUMN_KWARGS)
+    write(MAPPER.map(data_set), out_dir)
+
+
+def streaming(path: Path, out_dir: Path, args: argparse.Namespace):
+    chunks = DATA_MODEL.iter_data(path, chunk_size=args.chunk_size, parse_cache_size=args.parse_cache_size,
+                                  **COLUMN_KWARGS)
+    write(MAPPER.imap(chunks), out_dir)
+
+
+def measure(pipeline, path: Path, out_dir: Path, args: argparse.Namespace):
+    """Returns the time and the peak memory in bytes of running the pipeline"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    pipeline(path, out_dir, args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 20_000, 40_000])
+    parser.add_argument('--chunk-size', type=int, default=1_000)
+    parser.add_argument('--parse-cache-size', type=int, default=0,
+                        help='Size of the cache of parsed values of the streaming pipeline')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    mib = 1024 ** 2
+    print(f"{'rows':>8} {'in memory peak [MiB]':>21} {'streaming peak [MiB]':>21} {'in memory [s]':>14} "
+          f"{'streaming [s]':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.rows:
+            path = Path(tmp_dir) / f"data_{rows}.csv"
+            make_csv(path, rows)
+            memory_time, memory_peak = measure(in_memory, path, Path(tmp_dir) / f"in_memory_{rows}", args)
+            stream_time, stream_peak = measure(streaming, path, Path(tmp_dir) / f"streaming_{rows}", args)
+            print(f"{rows:>8} {memory_peak / mib:>21.1f} {stream_peak / mib:>21.1f} {memory_time:>14.2f} "
+                  f"{stream_time:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
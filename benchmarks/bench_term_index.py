@@ -0,0 +1,70 @@
+"""Benchmark of the `TermIndex`: the cost of indexing while writing, its size on disk and the speed of queries.
+
+Writes synthetic phenopackets with a few phenotypic features and a disease each, drawn from a pool of terms, once
+without and once with a `TermIndex`, saves and loads the index, and compares a boolean query on the index with the
+same query answered by reading every phenopacket.
+
+Run with:
+    python benchmarks/bench_term_index.py --phenopackets 50000 --terms 2000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from phenopackets.schema.v2 import Phenopacket, PhenotypicFeature, OntologyClass, Disease
+
+from phenopacket_mapper.pipeline import write, TermIndex, iter_phenopackets_from_binary
+
+
+def make_phenopackets(n: int, n_terms: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield Phenopacket(
+            id=f"patient{i}",
+            phenotypic_features=[PhenotypicFeature(type=OntologyClass(id=f"HP:{rng.randrange(n_terms):07d}"))
+                                 for _ in range(rng.randrange(1, 6))],
+            diseases=[Disease(term=OntologyClass(id=f"ORPHA:{rng.randrange(n_terms // 10 + 1)}"))],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phenopackets', type=int, default=20_000)
+    parser.add_argument('--terms', type=int, default=1_000)
+    args = parser.parse_args()
+    query = "(HP:0000001 OR HP:0000002) AND NOT ORPHA:0"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        plain = write(make_phenopackets(args.phenopackets, args.terms), tmp_dir / "plain", file_format='binary')
+        term_index = TermIndex()
+        indexed = write(make_phenopackets(args.phenopackets, args.terms), tmp_dir / "indexed", file_format='binary',
+                        term_index=term_index)
+        print(f"write without index: {plain.seconds:.2f} s, with index: {indexed.seconds:.2f} s")
+
+        term_index.save(tmp_dir / "terms.idx")
+        start = time.perf_counter()
+        term_index = TermIndex.load(tmp_dir / "terms.idx")
+        print(f"index: {len(term_index.terms())} terms, {(tmp_dir / 'terms.idx').stat().st_size / 1024:.0f} KiB, "
+              f"loaded in {time.perf_counter() - start:.3f} s")
+
+        start = time.perf_counter()
+        matches = term_index.query(query)
+        print(f"query on the index: {len(matches)} matches in {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+        start = time.perf_counter()
+        scanned = []
+        for phenopacket in iter_phenopackets_from_binary(indexed.path):
+            features = {f.type.id for f in phenopacket.phenotypic_features}
+            diseases = {d.term.id for d in phenopacket.diseases}
+            if features & {"HP:0000001", "HP:0000002"} and "ORPHA:0" not in diseases:
+                scanned.append(phenopacket.id)
+        print(f"query by reading the phenopackets: {len(scanned)} matches in "
+              f"{(time.perf_counter() - start) * 1e3:.2f} ms")
+        assert scanned == matches
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark of the native `Validator`, serially and in a pool of processes, with the time spent in each rule.
+
+Validates synthetic phenopackets streamed from a generator and reports the throughput in phenopackets/s for each number
+of workers, followed by the per-rule timings of the serial run.
+
+Run with:
+    python benchmarks/bench_validate.py --phenopackets 100000 --workers 1 4 8
+"""
+import argparse
+import time
+
+from bench_write import make_phenopackets
+from phenopacket_mapper.pipeline import Validator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phenopackets', type=int, default=20_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--batch-size', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'phenopackets/s':>15}")
+    serial = None
+    for workers in args.workers:
+        validator = Validator()
+        start = time.perf_counter()
+        n = sum(1 for _ in validator.iter_validate(make_phenopackets(args.phenopackets), workers=workers,
+                                                   batch_size=args.batch_size))
+        print(f"{workers:>8} {n / (time.perf_counter() - start):>15.0f}")
+        if workers == 1:
+            serial = validator
+
+    if serial is not None:
+        print()
+        for timing in serial.timings:
+            print(timing)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Benchmark of incremental validation with a `ValidationCache`.
+
+Validates synthetic phenopackets once to fill the cache, then again after changing a fraction of them, as a nightly
+run would, and compares the time of both runs and of a run without the cache.
+
+Run with:
+    python benchmarks/bench_validation_cache.py --phenopackets 50000 --changed 0.01
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from bench_write import make_phenopackets
+from phenopacket_mapper.pipeline import Validator, ValidationCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phenopackets', type=int, default=20_000)
+    parser.add_argument('--changed', type=float, default=0.01, help="Fraction of phenopackets changed between runs")
+    args = parser.parse_args()
+
+    phenopackets_list = list(make_phenopackets(args.phenopackets))
+    validator = Validator()
+
+    start = time.perf_counter()
+    validator.validate(phenopackets_list)
+    print(f"without cache:   {time.perf_counter() - start:.2f} s")
+
+    with tempfile.TemporaryDirectory() as tmp_dir, ValidationCache(Path(tmp_dir) / "cache.sqlite") as cache:
+        start = time.perf_counter()
+        validator.validate(phenopackets_list, cache=cache)
+        print(f"filling cache:   {time.perf_counter() - start:.2f} s")
+
+        step = max(1, round(1 / args.changed)) if args.changed > 0 else len(phenopackets_list) + 1
+        for phenopacket in phenopackets_list[::step]:
+            phenopacket.subject.id += "_changed"
+        start = time.perf_counter()
+        validator.validate(phenopackets_list, cache=cache)
+        print(f"incremental run: {time.perf_counter() - start:.2f} s "
+              f"({cache.misses - args.phenopackets} validated, {cache.hits} from the cache)")
+
+
+if __name__ == "__main__":
+    main()
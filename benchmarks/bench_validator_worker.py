@@ -0,0 +1,45 @@
+"""Benchmark of the persistent `ValidatorWorker` across batch sizes, against starting a worker per call.
+
+Validates synthetic phenopackets through one long-lived worker subprocess with increasing batch sizes, and reports the
+throughput in phenopackets/s. For comparison, a few batches are validated with a new worker started for each batch.
+
+Run with:
+    python benchmarks/bench_validator_worker.py --phenopackets 20000 --batch-sizes 1 10 100 1000
+"""
+import argparse
+import time
+from itertools import islice
+
+from bench_write import make_phenopackets
+from phenopacket_mapper.pipeline.validator_worker import ValidatorWorker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phenopackets', type=int, default=10_000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--launches', type=int, default=3, help="Number of batches validated with a new worker each")
+    args = parser.parse_args()
+
+    print(f"{'batch size':>11} {'phenopackets/s':>15}")
+    with ValidatorWorker() as worker:
+        for batch_size in args.batch_sizes:
+            it = make_phenopackets(args.phenopackets)
+            start = time.perf_counter()
+            n = 0
+            while batch := list(islice(it, batch_size)):
+                n += sum(1 for _ in worker.validate_batch(batch))
+            print(f"{batch_size:>11} {n / (time.perf_counter() - start):>15.0f}")
+
+    batch_size = max(args.batch_sizes)
+    start = time.perf_counter()
+    for _ in range(args.launches):
+        with ValidatorWorker() as worker:
+            list(worker.validate_batch(make_phenopackets(batch_size)))
+    seconds = time.perf_counter() - start
+    print(f"worker started per batch of {batch_size}: {args.launches * batch_size / seconds:.0f} phenopackets/s "
+          f"({seconds / args.launches:.2f} s per batch)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark of `pipeline.output.write` across numbers of workers, executors and directory layouts.
+
+Writes synthetic phenopackets with the serial writer and with pools of threads and processes, into one flat directory
+and into hashed subdirectories, and reports the throughput in files/s. Bulk formats (NDJSON, zip and tar archives)
+can be compared with `--file-formats`.
+
+Run with:
+    python benchmarks/bench_write.py --phenopackets 100000 --workers 1 4 8
+    python benchmarks/bench_write.py --file-formats json ndjson zip tar --compression gzip
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from google.protobuf.timestamp_pb2 import Timestamp
+from phenopackets.schema.v2 import Phenopacket, Individual, Disease, OntologyClass, PhenotypicFeature
+
+from phenopacket_mapper.pipeline import write
+
+
+def make_phenopackets(n: int):
+    for i in range(n):
+        yield Phenopacket(
+            id=f"patient{i}",
+            subject=Individual(id=f"patient{i}", date_of_birth=Timestamp(seconds=631152000 + i), sex="FEMALE"),
+            diseases=[Disease(term=OntologyClass(id="ORPHA:206638", label="Fibrodysplasia ossificans progressiva"))],
+            phenotypic_features=[PhenotypicFeature(type=OntologyClass(id="HP:0001250", label="Seizure"))],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phenopackets', type=int, default=20_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--shard-depth', type=int, nargs='+', default=[0, 1])
+    parser.add_argument('--file-formats', nargs='+', default=['json'], choices=['json', 'ndjson', 'zip', 'tar'])
+    parser.add_argument('--compression', choices=['gzip', 'zstd'], default=None)
+    args = parser.parse_args()
+
+    print(f"{'format':>7} {'workers':>8} {'executor':>9} {'shard depth':>12} {'files/s':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_format in args.file_formats:
+            for shard_depth in args.shard_depth:
+                for workers in args.workers:
+                    for executor in (['thread'] if workers == 1 else ['thread', 'process']):
+                        out_dir = Path(tmp_dir) / f"{file_format}_{workers}_{executor}_{shard_depth}"
+                        report = write(make_phenopackets(args.phenopackets), out_dir, workers=workers,
+                                       executor=executor, shard_depth=shard_depth, file_format=file_format,
+                                       compression=args.compression)
+                        print(f"{file_format:>7} {workers:>8} {executor:>9} {shard_depth:>12} "
+                              f"{report.files_per_second:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
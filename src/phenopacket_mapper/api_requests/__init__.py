@@ -2,15 +2,22 @@
 systems."""
 
 
+from .cache import APIRequestCache
 from .api_request_super_class import APIRequestSuperClass
-from .get import get
+from .get import get, create_session, RateLimiter
 from .orpha_api_request import OrphaAPIRequest
 from .hpo_api_request import HPOAPIRequest
+from .ontology_index import OntologyIndex
+from .local_ontology_request import LocalOntologyRequest
 
 __all__ = [
+    "APIRequestCache",
     "APIRequestSuperClass",
     "get",
+    "create_session",
+    "RateLimiter",
     "OrphaAPIRequest",
     "HPOAPIRequest",
-
+    "OntologyIndex",
+    "LocalOntologyRequest",
 ]
@@ -1,6 +1,18 @@
+import threading
+import warnings
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Union, Iterable, Dict, List, Tuple, Literal
 
-from phenopacket_mapper.data_standards import Coding
+import requests
+
+from phenopacket_mapper.data_standards import Coding, CodeSystem
+from phenopacket_mapper.api_requests.cache import APIRequestCache
+from phenopacket_mapper.api_requests.get import RateLimiter
+
+
+# guards the lazy creation of the lock of each instance
+_STATE_LOCK = threading.Lock()
 
 
 class APIRequestSuperClass(ABC):
@@ -9,8 +21,140 @@ class APIRequestSuperClass(ABC):
     A class should implement this super class to provide a method to get details about a concept from one specific
     code system. An example of this can be seen in `orpha_api_request.py` where the Orphanet API is used to get details
     about a concept from the Orphanet code system.
+
+    Subclasses implement `_fetch`, which requests a concept from the API. `get` and `get_many` wrap it with the
+    `cache`, which is keyed by the namespace prefix and version of `code_system`. Calling `__init__` is optional, the
+    class attributes below are the defaults of subclasses that do not.
     """
 
+    code_system: Optional[CodeSystem] = None
+    cache: Optional[APIRequestCache] = None
+    max_workers: int = 8
+    session: Optional[requests.Session] = None
+    _rate_limiter: Optional[RateLimiter] = None
+
+    def __init__(self, code_system: CodeSystem, cache: Optional[APIRequestCache] = None, max_workers: int = 8,
+                 rate_limit: Optional[float] = None, session: Optional[requests.Session] = None) -> None:
+        """
+        :param code_system: The code system of the concepts, its version is part of the cache keys
+        :param cache: Cache of the labels of the concepts requested by `get` and `get_many`, `None` to request every
+            concept
+        :param max_workers: Maximum number of concurrent requests of `get_many`
+        :param rate_limit: Maximum number of requests per second, `None` for no limit
+        :param session: Session of the requests, defaults to a session shared by all API requests
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, not {max_workers}")
+        self.code_system = code_system
+        self.cache = cache
+        self.max_workers = max_workers
+        self.session = session
+        self._rate_limiter = RateLimiter(rate_limit) if rate_limit is not None else None
+
     @abstractmethod
-    def get(self, concept_id) -> Coding:
+    def _fetch(self, concept_id: Union[str, int]) -> Coding:
+        """Request details about a concept from the API, without using the cache"""
         pass
+
+    def get(self, concept_id: Union[str, int]) -> Coding:
+        """Get details about a concept, from the cache if it has them, otherwise from the API
+
+        :param concept_id: The id of the concept in the code system
+        :return: The coding of the concept
+        """
+        code = str(concept_id)
+        if self.cache is None:
+            return self._request(code)
+
+        namespace, version = self._cache_namespace()
+        display = self.cache.get(namespace, version, code)
+        if display is not None:
+            return Coding(system=self.code_system or namespace, code=code, display=display)
+
+        coding = self._request(code)
+        self.cache.put(namespace, version, code, coding.display)
+        return coding
+
+    def get_many(
+            self,
+            concept_ids: Iterable[Union[str, int]],
+            compliance: Literal['lenient', 'strict'] = 'lenient',
+            errors: Optional[List[Tuple[str, str]]] = None,
+    ) -> Dict[str, Coding]:
+        """Get details about many concepts, requesting those that are not cached concurrently
+
+        Each concept is requested once, even if it occurs several times in `concept_ids` or is being requested by a
+        concurrent call of `get_many` on this instance.
+
+        :param concept_ids: The ids of the concepts in the code system
+        :param compliance: 'strict' to raise a `ValueError` if a concept cannot be requested, 'lenient' to warn and
+            leave it out of the result
+        :param errors: If given, the id and error message of each concept left out is appended to this list
+        :return: The coding of each concept by its id as a string, in the order of `concept_ids`
+        """
+        codes = list(dict.fromkeys(str(concept_id) for concept_id in concept_ids))
+        namespace, version = self._cache_namespace()
+
+        codings: Dict[str, Coding] = {}
+        if self.cache is not None:
+            for code, display in self.cache.get_many(namespace, version, codes).items():
+                codings[code] = Coding(system=self.code_system or namespace, code=code, display=display)
+
+        lock, in_flight = self._in_flight_state()
+        fetched: Dict[str, Coding] = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures: Dict[str, Future] = {}
+                with lock:
+                    for code in codes:
+                        if code in codings:
+                            continue
+                        future = in_flight.get(code)
+                        if future is None:
+                            future = executor.submit(self._request, code)
+                            in_flight[code] = future
+                            future.add_done_callback(lambda f, c=code: self._done(c, f))
+                        futures[code] = future
+
+                for code, future in futures.items():
+                    try:
+                        fetched[code] = future.result()
+                    except Exception as e:  # implementations of _fetch raise all kinds of errors for unknown concepts
+                        msg = f"Could not get {namespace}:{code}: {type(e).__name__}: {e}"
+                        if compliance == 'strict':
+                            raise ValueError(msg) from e
+                        warnings.warn(msg)
+                        if errors is not None:
+                            errors.append((code, str(e)))
+        finally:
+            if self.cache is not None and fetched:
+                self.cache.put_many(namespace, version, {code: c.display for code, c in fetched.items()})
+
+        codings.update(fetched)
+        return {code: codings[code] for code in codes if code in codings}
+
+    def _cache_namespace(self) -> Tuple[str, str]:
+        """The namespace and version of the cache entries, the class name for subclasses without a code system"""
+        if self.code_system is None:
+            return type(self).__qualname__, ''
+        return self.code_system.namespace_prefix, self.code_system.version
+
+    def _in_flight_state(self) -> Tuple[threading.RLock, Dict[str, Future]]:
+        """The lock and the futures of the concepts being requested, created on first use"""
+        with _STATE_LOCK:
+            if '_lock' not in self.__dict__:
+                # reentrant, as a future that is already done runs its callback in the thread adding it
+                self._lock = threading.RLock()
+                self._in_flight: Dict[str, Future] = {}
+        return self._lock, self._in_flight
+
+    def _request(self, code: str) -> Coding:
+        if self._rate_limiter is not None:
+            self._rate_limiter.wait()
+        return self._fetch(code)
+
+    def _done(self, code: str, future: Future):
+        lock, in_flight = self._in_flight_state()
+        with lock:
+            if in_flight.get(code) is future:
+                del in_flight[code]
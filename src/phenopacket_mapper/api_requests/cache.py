@@ -0,0 +1,193 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union, Tuple, Dict, List
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    version TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (namespace, version, key)
+);
+"""
+
+# keys per query, below the default limit of SQLite on the number of parameters of a statement
+_MAX_PARAMETERS = 500
+
+
+class APIRequestCache:
+    """Cache of the results of API requests, in memory and optionally on disk
+
+    Entries are keyed by the namespace of the code system (e.g. 'HP'), its version and the code, so that results of
+    other versions of an ontology are not used. The most recently used entries are kept in memory, up to
+    `max_entries`, and with a `path` all entries are stored in an SQLite database, so that they are available across
+    runs. Entries older than `ttl` seconds are not used.
+
+    E.g.:
+    ```python
+    cache = APIRequestCache("~/.cache/phenopacket_mapper/api_requests.sqlite", ttl=30 * 24 * 60 * 60)
+    hpo = HPOAPIRequest(cache=cache)
+    hpo.get("0000098")  # requested from the API once, then read from the cache
+    ```
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, max_entries: int = 10_000,
+                 ttl: Optional[float] = None):
+        """
+        :param path: Path of the SQLite database, `None` to only cache in memory
+        :param max_entries: Number of entries kept in memory
+        :param ttl: Time to live of the entries in seconds, `None` for entries that do not expire
+        """
+        if max_entries < 0:
+            raise ValueError(f"max_entries must not be negative, not {max_entries}")
+        self.path = Path(path).expanduser() if path is not None else None
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[Tuple[str, str, str], Tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(_SCHEMA)
+
+    def get(self, namespace: str, version: str, key: str) -> Optional[str]:
+        """Returns the cached value of a key, or `None` if it is not cached or has expired
+
+        :param namespace: The namespace prefix of the code system
+        :param version: The version of the code system
+        :param key: The key, e.g. the code of a concept
+        :return: The cached value
+        """
+        return self.get_many(namespace, version, [key]).get(key)
+
+    def get_many(self, namespace: str, version: str, keys: List[str]) -> Dict[str, str]:
+        """Returns the cached values of the keys that are cached and have not expired
+
+        :param namespace: The namespace prefix of the code system
+        :param version: The version of the code system
+        :param keys: The keys
+        :return: The cached value of each key found
+        """
+        oldest = time.time() - self.ttl if self.ttl is not None else None
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                entry = self._memory.get((namespace, version, key))
+                if entry is not None and (oldest is None or entry[1] >= oldest):
+                    self._memory.move_to_end((namespace, version, key))
+                    found[key] = entry[0]
+                else:
+                    missing.append(key)
+
+            if missing and self._connection is not None:
+                for i in range(0, len(missing), _MAX_PARAMETERS):
+                    chunk = missing[i:i + _MAX_PARAMETERS]
+                    rows = self._connection.execute(
+                        "SELECT key, value, created FROM entries WHERE namespace = ? AND version = ? "
+                        f"AND key IN ({', '.join('?' * len(chunk))})", (namespace, version, *chunk))
+                    for key, value, created in rows:
+                        if oldest is None or created >= oldest:
+                            found[key] = value
+                            self._remember((namespace, version, key), value, created)
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, namespace: str, version: str, key: str, value: str):
+        """Caches the value of a key
+
+        :param namespace: The namespace prefix of the code system
+        :param version: The version of the code system
+        :param key: The key, e.g. the code of a concept
+        :param value: The value, e.g. the label of the concept
+        """
+        self.put_many(namespace, version, {key: value})
+
+    def put_many(self, namespace: str, version: str, items: Dict[str, str]):
+        """Caches the values of keys, in one transaction
+
+        :param namespace: The namespace prefix of the code system
+        :param version: The version of the code system
+        :param items: The value of each key
+        """
+        now = time.time()
+        with self._lock:
+            for key, value in items.items():
+                self._remember((namespace, version, key), value, now)
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO entries (namespace, version, key, value, created) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        ((namespace, version, key, value, now) for key, value in items.items()))
+
+    def clear(self, namespace: Optional[str] = None):
+        """Removes all entries, or those of one namespace
+
+        :param namespace: The namespace prefix of the code system, `None` for all
+        """
+        with self._lock:
+            if namespace is None:
+                self._memory.clear()
+            else:
+                for k in [k for k in self._memory if k[0] == namespace]:
+                    del self._memory[k]
+            if self._connection is not None:
+                with self._connection:
+                    if namespace is None:
+                        self._connection.execute("DELETE FROM entries")
+                    else:
+                        self._connection.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def expire(self) -> int:
+        """Removes the entries older than `ttl` from the database and from memory
+
+        :return: The number of entries removed from the database
+        """
+        if self.ttl is None:
+            return 0
+        oldest = time.time() - self.ttl
+        with self._lock:
+            for k in [k for k, (_, created) in self._memory.items() if created < oldest]:
+                del self._memory[k]
+            if self._connection is None:
+                return 0
+            with self._connection:
+                return self._connection.execute("DELETE FROM entries WHERE created < ?", (oldest,)).rowcount
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __len__(self) -> int:
+        """The number of entries, in the database if there is one, otherwise in memory"""
+        with self._lock:
+            if self._connection is not None:
+                return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return len(self._memory)
+
+    def __enter__(self) -> 'APIRequestCache':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _remember(self, k: Tuple[str, str, str], value: str, created: float):
+        if self.max_entries == 0:
+            return
+        self._memory[k] = (value, created)
+        self._memory.move_to_end(k)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
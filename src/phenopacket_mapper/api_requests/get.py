@@ -1,15 +1,92 @@
-from typing import Dict
+import threading
+import time
+from typing import Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+"""Status codes of responses that are retried"""
 
-def get(url: str, params: Dict = None, json=False):
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_maxsize: int = 32, retries: int = 3, backoff_factor: float = 0.5) -> requests.Session:
+    """Creates a session that keeps its connections open and retries failed requests
+
+    Requests with connection errors or a status code in `RETRY_STATUS_CODES` are retried with exponential backoff,
+    respecting the `Retry-After` header of the response.
+
+    :param pool_maxsize: Number of connections kept open per host, should be at least the number of concurrent requests
+    :param retries: Number of times a request is retried
+    :param backoff_factor: Seconds waited before the second retry, doubling for each further retry
+    :return: The session
+    """
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUS_CODES,
+                  allowed_methods=('GET',), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Returns the session shared by all requests that are not given one, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def get(url: str, params: Dict = None, json=False, session: Optional[requests.Session] = None):
+    """Sends a GET request and returns the body of the response
+
+    Responses with an error status code (4xx or 5xx) raise a `requests.HTTPError`, after the retries of the session,
+    instead of returning the body of the error page.
+
+    :param url: The URL
+    :param params: The query parameters
+    :param json: Whether to parse the body as JSON
+    :param session: The session of the request, defaults to the session of `get_session`
+    :return: The body, as text or parsed JSON
+    :raises requests.HTTPError: If the status code of the response is an error
+    """
+    if session is None:
+        session = get_session()
     if params:
-        r = requests.get(url=url, params=params)
+        r = session.get(url=url, params=params)
     else:
-        r = requests.get(url=url)
+        r = session.get(url=url)
+    r.raise_for_status()
 
     if json:
         return r.json()
     else:
-        return r.text
\ No newline at end of file
+        return r.text
+
+
+class RateLimiter:
+    """Spaces calls of `wait` so that at most `rate` of them return per second, across threads"""
+
+    def __init__(self, rate: float):
+        """
+        :param rate: Number of calls per second
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, not {rate}")
+        self.interval = 1 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Blocks until the next call is allowed"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
@@ -1,8 +1,11 @@
-from typing import Union
+from typing import Union, Optional
+
+import requests
 
 from phenopacket_mapper.data_standards import CodeSystem
 from phenopacket_mapper.api_requests import APIRequestSuperClass
 from phenopacket_mapper.api_requests import get as rest_get
+from phenopacket_mapper.api_requests.cache import APIRequestCache
 from phenopacket_mapper.data_standards import Coding, HPO
 
 
@@ -11,12 +14,26 @@ class HPOAPIRequest(APIRequestSuperClass):
 
     api_base_url = "https://ontology.jax.org/api/hp/terms/HP:"
 
-    def __init__(self, hpo_code_system: CodeSystem = HPO) -> None:
+    def __init__(self, hpo_code_system: CodeSystem = HPO, cache: Optional[APIRequestCache] = None,
+                 api_base_url: Optional[str] = None, max_workers: int = 8, rate_limit: Optional[float] = None,
+                 session: Optional[requests.Session] = None) -> None:
+        """
+        :param hpo_code_system: The HPO code system, its version is part of the cache keys
+        :param cache: Cache of the labels of the concepts requested by `get` and `get_many`, `None` to request every
+            concept
+        :param api_base_url: URL the concept ids are appended to, defaults to the class attribute `api_base_url`
+        :param max_workers: Maximum number of concurrent requests of `get_many`
+        :param rate_limit: Maximum number of requests per second, `None` for no limit
+        :param session: Session of the requests, defaults to a session shared by all API requests
+        """
+        super().__init__(hpo_code_system, cache=cache, max_workers=max_workers, rate_limit=rate_limit, session=session)
         self.hpo_code_system = hpo_code_system
+        if api_base_url is not None:
+            self.api_base_url = api_base_url
 
-    def get(self, concept_id: Union[str, int]) -> Coding:
-        """Get details about a concept from the Orphanet API."""
-        json = rest_get(self.api_base_url + str(concept_id), json=True)
+    def _fetch(self, concept_id: Union[str, int]) -> Coding:
+        """Request details about a concept from the HPO API, `get` and `get_many` look it up in the cache first"""
+        json = rest_get(self.api_base_url + str(concept_id), json=True, session=self.session)
 
         name = json['name']
 
@@ -0,0 +1,97 @@
+import warnings
+from pathlib import Path
+from typing import Union, Optional, Iterable, Dict, List, Tuple, Literal
+
+from phenopacket_mapper.data_standards import CodeSystem, Coding
+from phenopacket_mapper.api_requests import APIRequestSuperClass
+from phenopacket_mapper.api_requests.cache import APIRequestCache
+from phenopacket_mapper.api_requests.ontology_index import OntologyIndex
+from phenopacket_mapper.utils.parsing import OntologyTerm
+
+
+class LocalOntologyRequest(APIRequestSuperClass):
+    """Gets details about concepts from a local ontology file instead of an API, for hosts without internet access
+
+    The ontology file (`.obo` or OBO Graphs `.json`, optionally gzipped) is parsed once into an `OntologyIndex`, which
+    is reused by later runs as long as the file does not change.
+
+    ```python
+    hpo = LocalOntologyRequest("hp.obo", HPO)
+    hpo.get("0001250")  # Coding(system=HPO, code='0001250', display='Seizure')
+
+    ordo = LocalOntologyRequest("ordo.json", ORDO, id_prefix="Orphanet")
+    ordo.get(95157)
+    ```
+    """
+
+    def __init__(self, ontology_path: Union[str, Path], code_system: CodeSystem, id_prefix: Optional[str] = None,
+                 index_path: Optional[Union[str, Path]] = None, cache: Optional[APIRequestCache] = None) -> None:
+        """
+        :param ontology_path: The ontology file
+        :param code_system: The code system of the ontology
+        :param id_prefix: The prefix of the ids in the ontology file, defaults to the namespace prefix of `code_system`
+        :param index_path: The path of the index file, defaults to the path of the ontology file with `.pmoi` appended
+        :param cache: Cache of the labels of the requested concepts, usually not needed as the index is fast
+        """
+        super().__init__(code_system, cache=cache)
+        self.id_prefix = id_prefix if id_prefix is not None else code_system.namespace_prefix
+        self.index = OntologyIndex.open(ontology_path, index_path)
+
+    def term(self, concept_id: Union[str, int]) -> OntologyTerm:
+        """Get the term of a concept, with its synonyms, obsolescence and parents
+
+        :param concept_id: The id of the concept, with or without the prefix, e.g. `0001250` or `HP:0001250`
+        :return: The term
+        """
+        code = str(concept_id)
+        term = self.index.get(code if ':' in code else f"{self.id_prefix}:{code}")
+        if term is None:
+            raise KeyError(f"{concept_id} is not a term of {self.code_system.name}")
+        return term
+
+    def get(self, concept_id: Union[str, int]) -> Coding:
+        """Get details about a concept from the ontology file, see `APIRequestSuperClass.get`
+
+        :param concept_id: The id of the concept, with or without the prefix, e.g. `0001250` or `HP:0001250`
+        :return: The coding of the concept, its code without the prefix
+        """
+        return super().get(self._code(concept_id))
+
+    def _fetch(self, concept_id: Union[str, int]) -> Coding:
+        """Get details about a concept from the ontology file."""
+        code = self._code(concept_id)
+        label = self.index.label(code if ':' in code else f"{self.id_prefix}:{code}")
+        if label is None:
+            raise KeyError(f"{concept_id} is not a term of {self.code_system.name}")
+        return Coding(system=self.code_system, code=code, display=label)
+
+    def get_many(
+            self,
+            concept_ids: Iterable[Union[str, int]],
+            compliance: Literal['lenient', 'strict'] = 'lenient',
+            errors: Optional[List[Tuple[str, str]]] = None,
+    ) -> Dict[str, Coding]:
+        """Get details about many concepts from the ontology file, see `APIRequestSuperClass.get_many`
+
+        Lookups in the index take microseconds, so they are not spread over threads.
+        """
+        codings: Dict[str, Coding] = {}
+        for code in dict.fromkeys(str(concept_id) for concept_id in concept_ids):
+            try:
+                codings[code] = self.get(code)
+            except KeyError as e:
+                if compliance == 'strict':
+                    raise ValueError(e.args[0]) from e
+                warnings.warn(e.args[0])
+                if errors is not None:
+                    errors.append((code, e.args[0]))
+        return codings
+
+    def _code(self, concept_id: Union[str, int]) -> str:
+        """The id of a concept without the prefix `id_prefix`"""
+        code = str(concept_id)
+        prefix = f"{self.id_prefix}:"
+        return code[len(prefix):] if code.startswith(prefix) else code
+
+    def close(self):
+        self.index.close()
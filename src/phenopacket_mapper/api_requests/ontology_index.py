@@ -0,0 +1,224 @@
+"""
+This module provides a compact, memory-mapped index of the terms of an ontology file, see `OntologyIndex`.
+
+Parsing `hp.obo` takes seconds, so the terms are parsed once and written to an index file next to the ontology, which
+later runs map into memory instead. The index records the size and modification time of the ontology file and is built
+again when they change.
+
+The index file consists of:
+- a header: the magic bytes `PMOI`, the format version, the size and modification time (ns) of the ontology file and
+  the number of terms
+- a table with the offset of each term's record, sorted by the UTF-8 encoded id of the term, as 32-bit integers
+- the records: the id, the label, a flag byte (1: obsolete, 2: has `replaced_by`), `replaced_by`, the number of
+  synonyms and the synonyms, the number of parents and the parents, each string prefixed with its length as a varint
+
+Looking up a term is a binary search over the table that decodes only the ids it compares and the record it finds.
+"""
+
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Union, Iterable, Iterator, Optional, Tuple, List
+
+from phenopacket_mapper.utils import encode_varint, decode_varint
+from phenopacket_mapper.utils.parsing import OntologyTerm, parse_ontology_file
+
+_MAGIC = b'PMOI'
+_VERSION = 1
+_HEADER = struct.Struct('<4sIQQI')
+_OFFSET = struct.Struct('<I')
+
+_OBSOLETE = 1
+_REPLACED = 2
+
+
+class OntologyIndex:
+    """Memory-mapped index from the ids of the terms of an ontology to their label, synonyms, obsolescence and parents
+
+    ```python
+    with OntologyIndex.open("hp.obo") as index:  # builds hp.obo.pmoi on first use
+        index.get("HP:0001250").label
+    ```
+    """
+
+    def __init__(self, index_path: Union[str, Path]):
+        """Opens an index file, see `build` and `open` to create one
+
+        :param index_path: The path of the index file
+        """
+        self.index_path = Path(index_path)
+        with open(self.index_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, self.source_size, self.source_mtime_ns, self._count = _HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            self._map.close()
+            raise ValueError(f"{self.index_path} is not an ontology index")
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError(f"{self.index_path} is not an ontology index of version {_VERSION}")
+
+    @classmethod
+    def build(cls, terms: Iterable[OntologyTerm], index_path: Union[str, Path], source_size: int = 0,
+              source_mtime_ns: int = 0) -> 'OntologyIndex':
+        """Writes an index of terms and opens it
+
+        The index is written to a temporary file first, so that a concurrent reader never sees a partial index.
+
+        :param terms: The terms, if an id occurs more than once the last term with it is kept
+        :param index_path: The path of the index file
+        :param source_size: The size of the ontology file the terms were read from
+        :param source_mtime_ns: The modification time of the ontology file the terms were read from
+        :return: The index
+        """
+        index_path = Path(index_path)
+        by_id = {term.id.encode('utf-8'): term for term in terms}
+        ids = sorted(by_id)
+
+        records = bytearray()
+        offsets = bytearray()
+        data_start = _HEADER.size + _OFFSET.size * len(ids)
+        for term_id in ids:
+            term = by_id[term_id]
+            offset = data_start + len(records)
+            if offset > 0xFFFFFFFF:
+                raise ValueError("The ontology is too large for an index")
+            offsets += _OFFSET.pack(offset)
+            _write_bytes(records, term_id)
+            _write_str(records, term.label)
+            records.append((_OBSOLETE if term.obsolete else 0) | (_REPLACED if term.replaced_by is not None else 0))
+            if term.replaced_by is not None:
+                _write_str(records, term.replaced_by)
+            for strings in (term.synonyms, term.parents):
+                records += encode_varint(len(strings))
+                for s in strings:
+                    _write_str(records, s)
+
+        tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, source_size, source_mtime_ns, len(ids)))
+            f.write(offsets)
+            f.write(records)
+        os.replace(tmp_path, index_path)
+        return cls(index_path)
+
+    @classmethod
+    def open(cls, ontology_path: Union[str, Path], index_path: Optional[Union[str, Path]] = None) -> 'OntologyIndex':
+        """Opens the index of an ontology file, building it if it does not exist or the file has changed since
+
+        :param ontology_path: The ontology file, see `parse_ontology_file` for the supported formats
+        :param index_path: The path of the index file, defaults to the path of the ontology file with `.pmoi` appended
+        :return: The index
+        """
+        ontology_path = Path(ontology_path)
+        if index_path is None:
+            index_path = ontology_path.with_name(ontology_path.name + '.pmoi')
+        index_path = Path(index_path)
+        stat = ontology_path.stat()
+        if index_path.exists():
+            try:
+                index = cls(index_path)
+            except ValueError:
+                pass
+            else:
+                if (index.source_size, index.source_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                    return index
+                index.close()
+        return cls.build(parse_ontology_file(ontology_path), index_path, stat.st_size, stat.st_mtime_ns)
+
+    def get(self, term_id: str) -> Optional[OntologyTerm]:
+        """Returns the term with an id
+
+        :param term_id: The id of the term, e.g. `HP:0001250`
+        :return: The term, or `None` if the index has no term with the id
+        """
+        offset = self._find(term_id.encode('utf-8'))
+        return self._read_term(offset) if offset is not None else None
+
+    def label(self, term_id: str) -> Optional[str]:
+        """Returns the label of the term with an id, without decoding the rest of its record
+
+        :param term_id: The id of the term, e.g. `HP:0001250`
+        :return: The label, or `None` if the index has no term with the id
+        """
+        offset = self._find(term_id.encode('utf-8'))
+        if offset is None:
+            return None
+        _, pos = self._read_bytes(offset)
+        return self._read_bytes(pos)[0].decode('utf-8')
+
+    def __contains__(self, term_id: str) -> bool:
+        return self._find(term_id.encode('utf-8')) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[OntologyTerm]:
+        """Iterates over the terms, ordered by id"""
+        for i in range(self._count):
+            yield self._read_term(self._offset(i))
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> 'OntologyIndex':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _offset(self, i: int) -> int:
+        return _OFFSET.unpack_from(self._map, _HEADER.size + _OFFSET.size * i)[0]
+
+    def _find(self, key: bytes) -> Optional[int]:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = self._offset(mid)
+            term_id, _ = self._read_bytes(offset)
+            if term_id < key:
+                lo = mid + 1
+            elif term_id > key:
+                hi = mid
+            else:
+                return offset
+        return None
+
+    def _read_bytes(self, pos: int) -> Tuple[bytes, int]:
+        length, pos = decode_varint(self._map, pos)
+        return self._map[pos:pos + length], pos + length
+
+    def _read_str(self, pos: int) -> Tuple[str, int]:
+        data, pos = self._read_bytes(pos)
+        return data.decode('utf-8'), pos
+
+    def _read_strs(self, pos: int) -> Tuple[Tuple[str, ...], int]:
+        count, pos = decode_varint(self._map, pos)
+        strings: List[str] = []
+        for _ in range(count):
+            s, pos = self._read_str(pos)
+            strings.append(s)
+        return tuple(strings), pos
+
+    def _read_term(self, pos: int) -> OntologyTerm:
+        term_id, pos = self._read_str(pos)
+        label, pos = self._read_str(pos)
+        flags = self._map[pos]
+        pos += 1
+        replaced_by = None
+        if flags & _REPLACED:
+            replaced_by, pos = self._read_str(pos)
+        synonyms, pos = self._read_strs(pos)
+        parents, pos = self._read_strs(pos)
+        return OntologyTerm(id=term_id, label=label, synonyms=synonyms, obsolete=bool(flags & _OBSOLETE),
+                            replaced_by=replaced_by, parents=parents)
+
+
+def _write_bytes(out: bytearray, data: bytes):
+    out += encode_varint(len(data))
+    out += data
+
+
+def _write_str(out: bytearray, s: str):
+    _write_bytes(out, s.encode('utf-8'))
@@ -1,10 +1,12 @@
-from typing import Union
+from typing import Union, Optional
 
+import requests
 from bs4 import BeautifulSoup
 
 from phenopacket_mapper.data_standards import CodeSystem
 from phenopacket_mapper.api_requests import APIRequestSuperClass
 from phenopacket_mapper.api_requests import get as rest_get
+from phenopacket_mapper.api_requests.cache import APIRequestCache
 from phenopacket_mapper.data_standards import Coding, ORDO
 
 
@@ -13,12 +15,27 @@ class OrphaAPIRequest(APIRequestSuperClass):
 
     api_base_url = "https://www.orpha.net/en/disease/detail/"
 
-    def __init__(self, orpha_code_system: CodeSystem = ORDO) -> None:
+    def __init__(self, orpha_code_system: CodeSystem = ORDO, cache: Optional[APIRequestCache] = None,
+                 api_base_url: Optional[str] = None, max_workers: int = 8, rate_limit: Optional[float] = None,
+                 session: Optional[requests.Session] = None) -> None:
+        """
+        :param orpha_code_system: The Orphanet code system, its version is part of the cache keys
+        :param cache: Cache of the labels of the concepts requested by `get` and `get_many`, `None` to request every
+            concept
+        :param api_base_url: URL the concept ids are appended to, defaults to the class attribute `api_base_url`
+        :param max_workers: Maximum number of concurrent requests of `get_many`
+        :param rate_limit: Maximum number of requests per second, `None` for no limit
+        :param session: Session of the requests, defaults to a session shared by all API requests
+        """
+        super().__init__(orpha_code_system, cache=cache, max_workers=max_workers, rate_limit=rate_limit,
+                         session=session)
         self.orpha_code_system = orpha_code_system
+        if api_base_url is not None:
+            self.api_base_url = api_base_url
 
-    def get(self, concept_id: Union[str, int]) -> Coding:
-        """Get details about a concept from the Orphanet API."""
-        html = rest_get(self.api_base_url + str(concept_id))
+    def _fetch(self, concept_id: Union[str, int]) -> Coding:
+        """Request details about a concept from the Orphanet API, `get` and `get_many` look it up in the cache first"""
+        html = rest_get(self.api_base_url + str(concept_id), session=self.session)
 
         soup = BeautifulSoup(html, 'html.parser')
 
@@ -32,6 +32,17 @@ def main():
     # Validate command
     parser_validate = subparsers.add_parser('validate', help='Validate phenopackets.')
     parser_validate.add_argument('-p', '--path', type=str, help='Path to Phenopackets')
+    parser_validate.add_argument('-r', '--recursive', action='store_true',
+                                 help='Validate the phenopackets in subdirectories too')
+    parser_validate.add_argument('-w', '--workers', type=int, default=1,
+                                 help='Number of processes validating the phenopackets')
+    parser_validate.add_argument('--timings', action='store_true', help='Print the time spent in each rule')
+    parser_validate.add_argument('--cache', type=str,
+                                 help='Path to a cache of validation results, unchanged phenopackets are not '
+                                      'validated again')
+    parser_validate.add_argument('--cache-max-age', type=float,
+                                 help='Age in days after which cached results expire')
+    parser_validate.add_argument('--clear-cache', action='store_true', help='Clear the cache before validating')
 
     args = parser.parse_args()
 
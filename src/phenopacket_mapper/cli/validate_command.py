@@ -1,12 +1,18 @@
 import os
+import sys
 from pathlib import Path
 
-from phenopacket_mapper.pipeline import read_phenopackets
-from phenopacket_mapper.pipeline.validate import validate
+from phenopacket_mapper.pipeline import iter_phenopackets
+from phenopacket_mapper.pipeline.validate import Validator
+from phenopacket_mapper.pipeline.validation_cache import ValidationCache
 
 
 def main(args):
-    """Validate Command: syntactically validates phenopackets using phenopacket-tools.
+    """Validate Command: structurally validates phenopackets against the Phenopacket v2 schema.
+
+    Prints the problems found in each invalid phenopacket and a summary, and exits with status 1 if any phenopacket is
+    invalid or cannot be read. With `--cache`, the phenopackets that were validated before and have not changed since
+    are not validated again.
 
     Run `validate -h` for help."""
     if args.path:
@@ -14,6 +20,38 @@ def main(args):
     else:
         path = Path(os.getcwd())
 
-    phenopackets = read_phenopackets(path)
+    cache = None
+    if args.cache:
+        max_age = args.cache_max_age * 24 * 60 * 60 if args.cache_max_age is not None else None
+        cache = ValidationCache(args.cache, max_age=max_age)
+        if args.clear_cache:
+            cache.clear()
+        elif max_age is not None:
+            cache.expire()
+
+    errors = []
+    validator = Validator()
+    phenopackets = iter_phenopackets(path, recursive=args.recursive, errors=errors)
+    total = invalid = 0
+    try:
+        for result in validator.iter_validate(phenopackets, workers=args.workers, cache=cache):
+            total += 1
+            if not result.valid:
+                invalid += 1
+                print(result)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    for file_path, error in errors:
+        print(f"{file_path}: could not be read: {error}")
+    print(f"{total} phenopackets validated, {total - invalid} valid, {invalid} invalid, {len(errors)} unreadable files")
+    if cache is not None:
+        print(f"{cache.hits} results from the cache, {cache.misses} phenopackets validated")
+
+    if args.timings:
+        for timing in validator.timings:
+            print(timing)
 
-    validate(phenopackets)
+    if invalid or errors:
+        sys.exit(1)
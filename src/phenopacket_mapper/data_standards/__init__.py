@@ -2,16 +2,22 @@
 
 from .date import Date
 from .code_system import CodeSystem, SNOMED_CT, HPO, MONDO, OMIM, ORDO, LOINC
+from .resource_registry import ResourceRegistry
 from .code import Coding, CodeableConcept
+from .ontology_hierarchy import OntologyHierarchy, OntologySubtree
 from .data_model import DataModel, DataField, DataModelInstance, DataFieldValue, DataSet
+from .columnar_data import ColumnarData, DataColumn
 from . import data_models
 from .value_set import ValueSet
 
 __all__ = [
     "Coding", "CodeableConcept",
+    "OntologyHierarchy", "OntologySubtree",
     "DataModel", "DataField", "DataModelInstance", "DataFieldValue", "DataSet",
+    "ColumnarData", "DataColumn",
     "data_models",
     "CodeSystem",
+    "ResourceRegistry",
     "SNOMED_CT", "HPO", "MONDO", "OMIM", "ORDO", "LOINC",
     "Date",
     "ValueSet"
@@ -55,6 +55,18 @@ class Coding:
         from phenopacket_mapper.utils.parsing import parse_coding
         return parse_coding(coding_str, resources, compliance)
 
+    @property
+    def curie(self) -> str:
+        """The compact URI of the coding, `<namespace_prefix>:<code>`, e.g. as the id of an `OntologyClass`
+
+        >>> Coding(system=code_system.HPO, code="0001250", display="Seizure").curie
+        'HP:0001250'
+        >>> Coding(system="SNOMED", code="404684003").curie
+        'SNOMED:404684003'
+        """
+        prefix = self.system if isinstance(self.system, str) else self.system.namespace_prefix
+        return f"{prefix}:{self.code}"
+
     def __str__(self):
         return f"{self.system.namespace_prefix}:{self.code} ({self.display})"
 
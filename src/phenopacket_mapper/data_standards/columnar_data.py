@@ -0,0 +1,232 @@
+"""
+This module defines the columnar storage of a `DataSet`. Instead of one `DataModelInstance` per row holding one
+`DataFieldValue` per cell, the values of each `DataField` are kept in a `DataColumn`. Columns of integers, floats and
+booleans are backed by NumPy arrays, all other values are kept in a list.
+
+`ColumnarData` is a sequence of `DataModelInstance` objects, which are created lazily as lightweight views when the
+data is indexed or iterated. The views are not validated again (the data is validated once when it is loaded) and they
+are snapshots of the data: to change values, use `DataSet.preprocess`.
+"""
+
+from dataclasses import dataclass
+from typing import Union, List, Literal, Optional, Any, Iterator, Sequence
+
+import numpy as np
+
+from phenopacket_mapper.data_standards.data_model import DataModel, DataModelInstance, DataFieldValue
+
+_NUMPY_DTYPES = {int: np.int64, float: np.float64, bool: np.bool_}
+
+
+@dataclass(slots=True)
+class DataColumn:
+    """This class holds the values of one `DataField` in a dataset
+
+    :ivar values: The values of the column, either a NumPy array (for columns of integers, floats or booleans) or a list
+    :ivar present: A boolean NumPy array, `True` where the row holds a value for the field. Rows that are not present
+                    are skipped when the row views are created, like cells that are empty in the loaded file.
+    """
+    values: Union[np.ndarray, List[Any]]
+    present: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.present)
+
+    def __getitem__(self, item: slice) -> 'DataColumn':
+        return DataColumn(values=self.values[item], present=self.present[item])
+
+    @staticmethod
+    def from_values(values: List[Any], present: Optional[np.ndarray] = None) -> 'DataColumn':
+        """Creates a `DataColumn` from a list of values, using a NumPy array where the type of the values allows
+
+        :param values: The values of the column, one per row
+        :param present: A boolean mask of the rows holding a value, if `None` all values that are not `None` are present
+        :return: A `DataColumn` holding the values
+        """
+        if present is None:
+            present = np.fromiter((v is not None for v in values), dtype=bool, count=len(values))
+        else:
+            present = np.asarray(present, dtype=bool)
+            if len(present) != len(values):
+                raise ValueError(f"Length of present mask ({len(present)}) does not match the number of values "
+                                 f"({len(values)})")
+
+        present_values = [v for v, p in zip(values, present.tolist()) if p]
+        value_types = set(map(type, present_values))
+        if len(value_types) == 1 and (value_type := value_types.pop()) in _NUMPY_DTYPES:
+            dtype = _NUMPY_DTYPES[value_type]
+            array = np.zeros(len(values), dtype=dtype)
+            try:
+                array[present] = np.array(present_values, dtype=dtype)
+            except OverflowError:  # integers that do not fit into 64 bits
+                pass
+            else:
+                return DataColumn(values=array, present=present)
+
+        return DataColumn(values=[v if p else None for v, p in zip(values, present.tolist())], present=present)
+
+    def tolist(self) -> List[Any]:
+        """Returns the values of the column as a list of Python objects, `None` where no value is present
+
+        :return: A list with one value per row
+        """
+        values = self.values.tolist() if isinstance(self.values, np.ndarray) else list(self.values)
+        if not self.present.all():
+            for i in np.flatnonzero(~self.present).tolist():
+                values[i] = None
+        return values
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes used by the containers of the column, not counting the Python objects in a list"""
+        if isinstance(self.values, np.ndarray):
+            values_nbytes = self.values.nbytes
+        else:
+            values_nbytes = 8 * len(self.values)
+        return values_nbytes + self.present.nbytes
+
+
+class ColumnarData(Sequence[DataModelInstance]):
+    """A sequence of `DataModelInstance` objects backed by one `DataColumn` per field of a `DataModel`
+
+    E.g.:
+    ```python
+    data_set = data_model.load_data("data.csv", storage='columnar', **column_names)
+    for instance in data_set:  # views are created while iterating
+        print(instance.row_no, instance.pseudonym.value)
+    ```
+
+    :ivar data_model: The `DataModel` the data adheres to
+    :ivar columns: One `DataColumn` per field of the data model, in the order of `data_model.fields`. `None` if the
+                    field has no column.
+    :ivar row_nos: The row number of each row
+    :ivar compliance: Compliance level passed on to the `DataModelInstance` views
+    """
+    __slots__ = ('data_model', 'columns', 'row_nos', 'compliance')
+
+    def __init__(
+            self,
+            data_model: DataModel,
+            columns: List[Optional[DataColumn]],
+            row_nos: Union[range, Sequence[Union[int, str]]],
+            compliance: Literal['lenient', 'strict'] = 'lenient',
+    ):
+        if len(columns) != len(data_model.fields):
+            raise ValueError(f"Expected one column per field of the data model ({len(data_model.fields)}), "
+                             f"got {len(columns)}")
+        for f, column in zip(data_model.fields, columns):
+            if column is not None and len(column) != len(row_nos):
+                raise ValueError(f"Length of column {f.id} ({len(column)}) does not match the number of rows "
+                                 f"({len(row_nos)})")
+        self.data_model = data_model
+        self.columns = list(columns)
+        self.row_nos = row_nos
+        self.compliance = compliance
+
+    def __len__(self) -> int:
+        return len(self.row_nos)
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[DataModelInstance, 'ColumnarData']:
+        if isinstance(item, slice):
+            return ColumnarData(
+                data_model=self.data_model,
+                columns=[c[item] if c is not None else None for c in self.columns],
+                row_nos=self.row_nos[item],
+                compliance=self.compliance
+            )
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(f"Row index {item} is out of range")
+        row_values = [
+            (c.values[item].item() if isinstance(c.values, np.ndarray) else c.values[item])
+            if c is not None and c.present[item] else _MISSING
+            for c in self.columns
+        ]
+        return self._view(self.row_nos[item], row_values)
+
+    def __iter__(self) -> Iterator[DataModelInstance]:
+        column_values = [c.tolist() if c is not None else None for c in self.columns]
+        column_present = [c.present.tolist() if c is not None else None for c in self.columns]
+        for i, row_no in enumerate(self.row_nos):
+            yield self._view(row_no, [
+                values[i] if values is not None and present[i] else _MISSING
+                for values, present in zip(column_values, column_present)
+            ])
+
+    def __eq__(self, other):
+        if isinstance(other, (ColumnarData, list)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ColumnarData(data_model={self.data_model.data_model_name!r}, rows={len(self)})"
+
+    def _view(self, row_no: Union[int, str], row_values: List[Any]) -> DataModelInstance:
+        """Creates a `DataModelInstance` for a row without validating it again
+
+        :param row_no: The row number of the row
+        :param row_values: One value per field of the data model, `_MISSING` where the row holds no value
+        """
+        if isinstance(row_no, np.generic):
+            row_no = row_no.item()
+        values_by_position = [
+            DataFieldValue(row_no=row_no, field=f, value=v) if v is not _MISSING else None
+            for f, v in zip(self.data_model.fields, row_values)
+        ]
+        return DataModelInstance.view(
+            row_no=row_no,
+            data_model=self.data_model,
+            values_by_position=values_by_position,
+            compliance=self.compliance
+        )
+
+    def get_column(self, field_id: str) -> Optional[DataColumn]:
+        """Returns the column of a field by its id
+
+        :param field_id: The id of the field
+        :return: The `DataColumn` of the field, `None` if the field has no column
+        """
+        position = self.data_model.get_field_position(field_id)
+        if position is None:
+            raise KeyError(f"Field with id {field_id} not found in DataModel")
+        return self.columns[position]
+
+    def set_column(self, field_id: str, column: Optional[DataColumn]):
+        """Replaces the column of a field
+
+        :param field_id: The id of the field
+        :param column: The new column, must have one entry per row
+        """
+        position = self.data_model.get_field_position(field_id)
+        if position is None:
+            raise KeyError(f"Field with id {field_id} not found in DataModel")
+        if column is not None and len(column) != len(self):
+            raise ValueError(f"Length of column {field_id} ({len(column)}) does not match the number of rows "
+                             f"({len(self)})")
+        self.columns[position] = column
+
+    def validate(self) -> bool:
+        """Validates each row like `DataModelInstance.validate`, using transient views of the rows
+
+        :return: True if all rows are valid, False otherwise
+        """
+        valid = True
+        for instance in self:
+            valid = instance.validate() and valid
+        return valid
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes used by the containers of the columns, not counting the Python objects in lists"""
+        return sum(c.nbytes for c in self.columns if c is not None)
+
+
+class _Missing:
+    def __repr__(self):
+        return '<missing>'
+
+
+_MISSING = _Missing()
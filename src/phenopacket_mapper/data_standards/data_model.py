@@ -11,12 +11,15 @@ The `DataFieldValue` class is used to define the value of a `DataField` in a `Da
 from dataclasses import dataclass, field
 from pathlib import Path
 from types import MappingProxyType
-from typing import Union, List, Literal, Dict, Optional, Any, Callable, Tuple
+from typing import Union, List, Literal, Dict, Optional, Any, Callable, Tuple, Iterator, FrozenSet
+import operator
 import warnings
 
+import numpy as np
 import pandas as pd
 
-from phenopacket_mapper.data_standards import CodeSystem
+from phenopacket_mapper.data_standards import CodeSystem, ResourceRegistry
+from phenopacket_mapper.data_standards.code import Coding, CodeableConcept
 from phenopacket_mapper.data_standards.date import Date
 from phenopacket_mapper.data_standards.value_set import ValueSet
 from phenopacket_mapper.preprocessing import preprocess, preprocess_method
@@ -161,15 +164,39 @@ class DataModel:
     data_model_name: str = field()
     fields: Tuple[DataField, ...] = field()
     resources: List[CodeSystem] = field(default_factory=list)
+    _resource_registry: ResourceRegistry = field(default=None, init=False, repr=False, compare=False)
+    _registered_resources: Tuple[CodeSystem, ...] = field(default=(), init=False, repr=False, compare=False)
+    _field_index: Dict[str, int] = field(default=None, init=False, repr=False, compare=False)
+    _required_field_ids: FrozenSet[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if len(self.fields) != len(set([f.id for f in self.fields])):
             raise ValueError("All fields in a DataModel must have unique identifiers")
+        object.__setattr__(self, '_resource_registry', ResourceRegistry(self.resources))
+        object.__setattr__(self, '_registered_resources', tuple(self.resources))
+        # id -> position of each field, shared by all instances of the data model
+        object.__setattr__(self, '_field_index', {f.id: i for i, f in enumerate(self.fields)})
+        object.__setattr__(self, '_required_field_ids', frozenset(f.id for f in self.fields if f.required))
+
+    @property
+    def resource_registry(self) -> ResourceRegistry:
+        """A `ResourceRegistry` of the resources of the data model, for constant time lookups of namespace prefixes
+
+        The registry is built with the data model, and again if any resource is added, removed or replaced by another
+        object.
+        """
+        registered = self._registered_resources
+        if (self._resource_registry is None or len(registered) != len(self.resources)
+                or not all(map(operator.is_, registered, self.resources))):
+            object.__setattr__(self, '_resource_registry', ResourceRegistry(self.resources))
+            object.__setattr__(self, '_registered_resources', tuple(self.resources))
+        return self._resource_registry
 
     def __getattr__(self, var_name: str) -> DataField:
-        for f in self.fields:
-            if f.id == var_name:
-                return f
+        if var_name not in DataModel.__slots__:  # slots are looked up here only while they are not set yet
+            position = self._field_index.get(var_name)
+            if position is not None:
+                return self.fields[position]
         raise AttributeError(f"'DataModel' object has no attribute '{var_name}'")
 
     def __str__(self):
@@ -192,13 +219,21 @@ class DataModel:
         :param default: The default value to return if the field is not found
         :return: The DataField object
         """
-        for f in self.fields:
-            if f.id == field_id:
-                return f
+        position = self._field_index.get(field_id)
+        if position is not None:
+            return self.fields[position]
         if default or default is None:
             return default
         raise ValueError(f"Field with id {field_id} not found in DataModel")
 
+    def get_field_position(self, field_id: str) -> Optional[int]:
+        """Returns the position of a DataField in `fields` by its id
+
+        :param field_id: The id of the field
+        :return: The position of the field, or None if the field is not found
+        """
+        return self._field_index.get(field_id)
+
     def get_field_ids(self) -> List[str]:
         """Returns a list of the ids of the DataFields in the DataModel"""
         return [f.id for f in self.fields]
@@ -207,6 +242,8 @@ class DataModel:
             self,
             path: Union[str, Path],
             compliance: Literal['lenient', 'strict'] = 'lenient',
+            parse_cache_size: int = 65_536,
+            storage: Literal['rows', 'columnar'] = 'rows',
             **kwargs
     ) -> 'DataSet':
         """Loads data from a file using a DataModel definition
@@ -224,25 +261,76 @@ class DataModel:
 
         :param path: Path to the file containing the data
         :param compliance: Compliance level to use when loading the data.
+        :param parse_cache_size: Maximum number of distinct parsed values to cache, set to 0 to disable the cache.
+        :param storage: Whether to store the data as a list of `DataModelInstance` objects ('rows') or in columns
+                        ('columnar'), see `ColumnarData`
         :param kwargs: Dynamically passed parameters that match {id}_column for each item
         :return: A list of `DataModelInstance` objects
         """
-        column_names = dict()
-        for f in self.fields:
-            column_param = f"{f.id}_column"
-            if column_param not in kwargs:
-                raise TypeError(f"load_data() missing 1 required argument: '{column_param}'")
-            else:
-                column_names[f.id] = kwargs[column_param]
+        column_names = self._column_names_from_kwargs("load_data", kwargs)
 
         from phenopacket_mapper.pipeline import load_data_using_data_model
         return load_data_using_data_model(
             path=path,
             data_model=self,
             column_names=column_names,
-            compliance=compliance
+            compliance=compliance,
+            parse_cache_size=parse_cache_size,
+            storage=storage
         )
 
+    def iter_data(
+            self,
+            path: Union[str, Path],
+            chunk_size: int = 10_000,
+            compliance: Literal['lenient', 'strict'] = 'lenient',
+            parse_cache_size: int = 65_536,
+            storage: Literal['rows', 'columnar'] = 'rows',
+            **kwargs
+    ) -> Iterator['DataSet']:
+        """Loads data from a file using a DataModel definition, yielding it in chunks of `chunk_size` rows
+
+        Streaming variant of `load_data`, the column names are passed in the same way. Row numbers stay global across
+        chunks, i.e. they refer to the row in the file.
+
+        E.g.:
+        ```python
+        for data_set in data_model.iter_data("data.csv", chunk_size=1000, field_1_column="column_name_in_file"):
+            phenopackets = mapper.map(data_set)
+        ```
+
+        :param path: Path to the file containing the data
+        :param chunk_size: Number of rows per yielded `DataSet`
+        :param compliance: Compliance level to use when loading the data.
+        :param parse_cache_size: Maximum number of distinct parsed values to cache, set to 0 to disable the cache.
+        :param storage: Whether to store the data as a list of `DataModelInstance` objects ('rows') or in columns
+                        ('columnar'), see `ColumnarData`
+        :param kwargs: Dynamically passed parameters that match {id}_column for each item
+        :return: An iterator over `DataSet` objects of at most `chunk_size` rows each
+        """
+        column_names = self._column_names_from_kwargs("iter_data", kwargs)
+
+        from phenopacket_mapper.pipeline import iter_data_using_data_model
+        return iter_data_using_data_model(
+            path=path,
+            data_model=self,
+            column_names=column_names,
+            compliance=compliance,
+            chunk_size=chunk_size,
+            parse_cache_size=parse_cache_size,
+            storage=storage
+        )
+
+    def _column_names_from_kwargs(self, method_name: str, kwargs: Dict) -> Dict[str, str]:
+        column_names = dict()
+        for f in self.fields:
+            column_param = f"{f.id}_column"
+            if column_param not in kwargs:
+                raise TypeError(f"{method_name}() missing 1 required argument: '{column_param}'")
+            else:
+                column_names[f.id] = kwargs[column_param]
+        return column_names
+
     @staticmethod
     def from_file(
             data_model_name: str,
@@ -331,6 +419,8 @@ class DataModelInstance:
     data_model: DataModel
     values: List[DataFieldValue]
     compliance: Literal['lenient', 'strict'] = 'lenient'
+    _values_by_position: List[Optional[DataFieldValue]] = field(default=None, init=False, repr=False, compare=False)
+    _indexed_values: Tuple[DataFieldValue, ...] = field(default=(), init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self.validate()
@@ -354,7 +444,7 @@ class DataModelInstance:
                 else:
                     raise ValueError(f"Compliance level {self.compliance} is not valid")
 
-        is_required = set(f.id for f in self.data_model.fields if f.required)
+        is_required = self.data_model._required_field_ids
         fields_present = set(v.field.id for v in self.values)
 
         if len(missing_fields := (is_required - fields_present)) > 0:
@@ -373,11 +463,67 @@ class DataModelInstance:
         return iter(self.values)
 
     def __getattr__(self, var_name: str) -> DataFieldValue:
-        fields = [v.field.id for v in self.values]
-        if var_name in fields:
-            return self.values[fields.index(var_name)]
+        if var_name not in DataModelInstance.__slots__:  # slots are looked up here only while they are not set yet
+            position = self.data_model.get_field_position(var_name)
+            if position is not None:
+                value = self.get_values_by_position()[position]
+                if value is not None:
+                    return value
+            else:  # values of fields that are not part of the data model
+                for v in self.values:
+                    if v.field.id == var_name:
+                        return v
         raise AttributeError(f"'DataModelInstance' object has no attribute '{var_name}'")
 
+    @staticmethod
+    def view(
+            row_no: Union[int, str],
+            data_model: DataModel,
+            values_by_position: List[Optional[DataFieldValue]],
+            compliance: Literal['lenient', 'strict'] = 'lenient',
+    ) -> 'DataModelInstance':
+        """Creates a `DataModelInstance` from values that were already validated, skipping the validation
+
+        Used by `ColumnarData` to create lightweight views of its rows.
+
+        :param row_no: The id of the instance, i.e. the row number
+        :param data_model: The `DataModel` object that defines the data model for this instance
+        :param values_by_position: One `DataFieldValue` per field of the data model, `None` for missing values
+        :param compliance: Compliance level to enforce when validating the instance
+        :return: A `DataModelInstance` that has not been validated
+        """
+        instance = object.__new__(DataModelInstance)
+        instance.row_no = row_no
+        instance.data_model = data_model
+        instance.values = [v for v in values_by_position if v is not None]
+        instance.compliance = compliance
+        instance._values_by_position = values_by_position
+        instance._indexed_values = tuple(instance.values)
+        return instance
+
+    def get_values_by_position(self) -> List[Optional[DataFieldValue]]:
+        """Returns the values of the instance ordered like the fields of the data model, `None` for missing values
+
+        The list is built once (and again if any entry of `values` is added, removed or replaced by another object)
+        using the id to position index of the `DataModel`, which is shared by all of its instances.
+
+        :return: A list with one entry per field of the data model
+        """
+        if self._values_by_position is None or not self._is_indexed(self.values):
+            values_by_position = [None] * len(self.data_model.fields)
+            for v in self.values:
+                position = self.data_model.get_field_position(v.field.id)
+                if position is not None and values_by_position[position] is None:
+                    values_by_position[position] = v
+            self._values_by_position = values_by_position
+            self._indexed_values = tuple(self.values)
+        return self._values_by_position
+
+    def _is_indexed(self, values: List[DataFieldValue]) -> bool:
+        """Whether `values` holds the same objects, in the same order, as when `_values_by_position` was built"""
+        indexed = self._indexed_values
+        return len(indexed) == len(values) and all(map(operator.is_, indexed, values))
+
 
 @dataclass(slots=True, frozen=True)
 class DataSet:
@@ -386,11 +532,17 @@ class DataSet:
     This class is used to define a dataset as defined by a `DataModel`. It is a collection of `DataModelInstance`
     objects.
 
+    The data is either stored as a list of `DataModelInstance` objects or in columns, as `ColumnarData`, which creates
+    `DataModelInstance` objects only as views when the data is iterated.
+
     :ivar data_model: The `DataModel` object that defines the data model for this dataset
-    :ivar data: A list of `DataModelInstance` objects, each adhering to the `DataField` definition in the `DataModel`
+    :ivar data: A list of `DataModelInstance` objects, each adhering to the `DataField` definition in the `DataModel`,
+                or `ColumnarData`
+    :ivar parse_stats: Statistics of the cache of parsed values used while loading the dataset, if any
     """
     data_model: 'DataModel' = field()
-    data: List[DataModelInstance] = field()
+    data: Union[List[DataModelInstance], 'ColumnarData'] = field()
+    parse_stats: Optional['ParseCacheStats'] = field(default=None, compare=False)
 
     @property
     def height(self):
@@ -400,26 +552,42 @@ class DataSet:
     def width(self):
         return len(self.data_model.fields)
 
+    @property
+    def storage(self) -> Literal['rows', 'columnar']:
+        from phenopacket_mapper.data_standards.columnar_data import ColumnarData
+        return 'columnar' if isinstance(self.data, ColumnarData) else 'rows'
+
     @property
     def data_frame(self) -> pd.DataFrame:
         column_names = [f.id for f in self.data_model.fields]
-        data_dict = {c: list() for c in column_names}
+        if self.storage == 'columnar':
+            columns = [c.tolist() if c is not None else [None] * self.height for c in self.data.columns]
+            return pd.DataFrame(dict(zip(column_names, columns)), columns=column_names)
+
+        columns: List[List[Any]] = [list() for _ in column_names]
         for instance in self.data:
-            for f in self.data_model.fields:
-                field_id = f.id
-                value: Any = None
-                try:
-                    dfv: DataFieldValue = getattr(instance, field_id)
-                    value = dfv.value
-                except AttributeError:
-                    pass
-                finally:
-                    data_dict[field_id].append(value)
-        return pd.DataFrame(data_dict, columns=column_names)
+            for column, dfv in zip(columns, instance.get_values_by_position()):
+                column.append(dfv.value if dfv is not None else None)
+        return pd.DataFrame(dict(zip(column_names, columns)), columns=column_names)
 
     def __iter__(self):
         return iter(self.data)
 
+    def partition(self, chunk_size: int) -> List['DataSet']:
+        """Partitions the dataset into datasets of at most `chunk_size` records, keeping the order of the records
+
+        The partitions share the records (or, for columnar storage, the columns) with this dataset.
+
+        :param chunk_size: Maximum number of records per partition
+        :return: A list of `DataSet` objects
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive integer, not {chunk_size}")
+        return [
+            DataSet(data_model=self.data_model, data=self.data[start:start + chunk_size])
+            for start in range(0, len(self.data), chunk_size)
+        ]
+
     def preprocess(
             self,
             fields: Union[str, DataField, List[Union[str, DataField]]],
@@ -449,15 +617,24 @@ class DataSet:
 
         field_ids = list()
         for f in fields:
-            if isinstance(field, str):
+            if isinstance(f, str):
                 field_ids.append(f)
             elif isinstance(f, DataField):
                 field_ids.append(f.id)
             else:
-                raise ValueError(f"Field {field} is not of type str or DataField")
+                raise ValueError(f"Field {f} is not of type str or DataField")
 
         if len(field_ids) == 0:
             raise ValueError("No fields to preprocess")
+        elif len(field_ids) == 1 and self.storage == 'columnar':
+            from phenopacket_mapper.data_standards.columnar_data import DataColumn
+            field_id = field_ids[0]
+            column = self.data.get_column(field_id)
+            if column is not None:
+                values = column.tolist()
+                for i in np.flatnonzero(column.present).tolist():
+                    values[i] = preprocess(values[i], mapping, **kwargs)
+                self.data.set_column(field_id, DataColumn.from_values(values, present=column.present))
         elif len(field_ids) == 1:
             field_id = field_ids[0]
             for instance in self.data:
@@ -477,6 +654,139 @@ class DataSet:
 
                 preprocess_method(values, mapping, **kwargs)
 
+    def enrich_codings(
+            self,
+            resolvers: Union['APIRequestSuperClass', List['APIRequestSuperClass']],
+            fields: Optional[Union[str, DataField, List[Union[str, DataField]]]] = None,
+            overwrite: bool = False,
+            compliance: Literal['lenient', 'strict'] = 'lenient',
+    ) -> int:
+        """Fills in the `display` of the codings in the dataset, resolving each distinct code only once
+
+        The codings of all fields (or of `fields`), including those in `CodeableConcept` values, are collected first.
+        The distinct codes of each code system are then resolved in bulk with `get_many` of the resolver for that code
+        system, and the values are replaced in place. Codings of code systems without a resolver are left as they are.
+
+        E.g.:
+        ```python
+        with APIRequestCache("labels.sqlite") as cache:
+            data_set.enrich_codings([HPOAPIRequest(cache=cache), OrphaAPIRequest(cache=cache)])
+        ```
+
+        :param resolvers: One or more `APIRequestSuperClass` implementations, each resolving the codes of its
+            `code_system`
+        :param fields: Data fields to enrich, defaults to all fields
+        :param overwrite: Whether to also replace the `display` of codings that already have one
+        :param compliance: 'strict' to raise a `ValueError` if a code cannot be resolved, 'lenient' to warn and leave
+            its codings as they are
+        :return: The number of values that were changed
+        """
+        if not isinstance(resolvers, list):
+            resolvers = [resolvers]
+        if fields is None:
+            fields = list(self.data_model.fields)
+        elif not isinstance(fields, list):
+            fields = [fields]
+        field_ids = [f.id if isinstance(f, DataField) else f for f in fields]
+
+        # the resolver of each code system, by its namespace prefix and version, as `CodeSystem` is not hashable
+        resolver_of: Dict[Tuple[str, Optional[str]], Optional[int]] = {}
+
+        def resolver_index(coding: Coding) -> Optional[int]:
+            system = coding.system
+            key = (system, None) if isinstance(system, str) else (system.namespace_prefix, system.version)
+            if key not in resolver_of:
+                resolver_of[key] = next((i for i, r in enumerate(resolvers) if coding.system == r.code_system), None)
+            return resolver_of[key]
+
+        def codings_of(value) -> Iterator[Coding]:
+            if isinstance(value, Coding):
+                yield value
+            elif isinstance(value, CodeableConcept):
+                yield from value.coding
+
+        codes: List[Dict[str, None]] = [dict() for _ in resolvers]
+        for value in self._iter_field_values(field_ids):
+            for coding in codings_of(value):
+                if overwrite or not coding.display:
+                    i = resolver_index(coding)
+                    if i is not None:
+                        codes[i][coding.code] = None
+
+        labels: Dict[Tuple[int, str], str] = {}
+        for i, (resolver, resolver_codes) in enumerate(zip(resolvers, codes)):
+            if resolver_codes:
+                for code, coding in resolver.get_many(resolver_codes, compliance=compliance).items():
+                    labels[(i, code)] = coding.display
+
+        # the enriched codings, shared by all cells with the same code and text
+        enriched: Dict[Tuple[int, str, Optional[str]], Coding] = {}
+
+        def enrich_coding(coding: Coding) -> Coding:
+            if not overwrite and coding.display:
+                return coding
+            i = resolver_index(coding)
+            display = labels.get((i, coding.code))
+            if display is None or display == coding.display:
+                return coding
+            key = (i, coding.code, coding.text)
+            new = enriched.get(key)
+            if new is None:
+                new = enriched[key] = Coding(system=coding.system, code=coding.code, display=display, text=coding.text)
+            return new
+
+        def enrich(value):
+            if isinstance(value, Coding):
+                return enrich_coding(value)
+            elif isinstance(value, CodeableConcept):
+                coding = [enrich_coding(c) for c in value.coding]
+                if any(new is not old for new, old in zip(coding, value.coding)):
+                    return CodeableConcept(coding=coding, text=value.text)
+            return value
+
+        changed = 0
+        if not labels:
+            return changed
+        if self.storage == 'columnar':
+            from phenopacket_mapper.data_standards.columnar_data import DataColumn
+            for field_id in field_ids:
+                column = self.data.get_column(field_id)
+                if column is None or isinstance(column.values, np.ndarray):
+                    continue
+                values = column.tolist()
+                n = changed
+                for i in np.flatnonzero(column.present).tolist():
+                    new = enrich(values[i])
+                    if new is not values[i]:
+                        values[i] = new
+                        changed += 1
+                if changed > n:
+                    self.data.set_column(field_id, DataColumn.from_values(values, present=column.present))
+        else:
+            field_id_set = set(field_ids)
+            for instance in self.data:
+                for v in instance.values:
+                    if v.field.id in field_id_set:
+                        new = enrich(v.value)
+                        if new is not v.value:
+                            v.value = new
+                            changed += 1
+        return changed
+
+    def _iter_field_values(self, field_ids: List[str]) -> Iterator[Any]:
+        """Iterates over the values of fields, without creating views of the rows of columnar data"""
+        if self.storage == 'columnar':
+            for field_id in field_ids:
+                column = self.data.get_column(field_id)
+                if column is not None and not isinstance(column.values, np.ndarray):
+                    yield from (v for v, p in zip(column.values, column.present.tolist()) if p)
+        else:
+            field_id_set = set(field_ids)
+            for instance in self.data:
+                for v in instance.values:
+                    if v.field.id in field_id_set:
+                        yield v.value
+
     def head(self, n: int = 5):
         if self.data_frame is not None:
             return self.data_frame.head(n)
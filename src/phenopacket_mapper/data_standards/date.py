@@ -1,7 +1,7 @@
 from google.protobuf.timestamp_pb2 import Timestamp
 
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Tuple, Union, Literal
 
 
@@ -98,8 +98,12 @@ class Date:
         :return: the date in a Google Protobuf Timestamp object
         """
         timestamp = Timestamp()
-        from dateutil import parser
-        dt = parser.parse(self.iso_8601_datestring(allow_zeros=False))
+        if 0 < self.year < 1000:  # years with less than four digits are interpreted by the parser
+            from dateutil import parser
+            dt = parser.parse(self.iso_8601_datestring(allow_zeros=False))
+        else:  # same as parsing `iso_8601_datestring(allow_zeros=False)`, zeros in year, month and day become 1
+            dt = datetime(self.year or 1, self.month or 1, self.day or 1, self.hour, self.minute, self.second,
+                          tzinfo=timezone.utc)
         timestamp.FromDatetime(dt)
         return timestamp
 
@@ -162,6 +166,13 @@ class Date:
             except ValueError as e:
                 raise ValueError(f"Invalid format string '{fmt}': {e}")
 
+    def __copy__(self) -> 'Date':
+        """Copies the date without validating its values again"""
+        date = object.__new__(Date)
+        for name in Date.__slots__:
+            object.__setattr__(date, name, getattr(self, name))
+        return date
+
     def __repr__(self):
         return self.iso_8601_datestring()
 
@@ -0,0 +1,143 @@
+"""
+This module defines the `is_a` hierarchy of an ontology and `OntologySubtree`, a `ValueSet` element that permits any
+descendant of a term, e.g. any phenotypic abnormality (descendants of `HP:0000118`).
+
+The descendants of a subtree's root are computed once, when the subtree is created, and kept as a set of codes, so that
+checking a value is a single set lookup, no matter how deep the hierarchy is or how many values are checked.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, FrozenSet, List, Optional, Union, Tuple
+
+from phenopacket_mapper.data_standards.code_system import CodeSystem
+from phenopacket_mapper.data_standards.code import Coding, CodeableConcept
+
+
+class OntologyHierarchy:
+    """The `is_a` hierarchy of an ontology, with the descendants of each term computed on first use
+
+    E.g.:
+    ```python
+    hierarchy = OntologyHierarchy.from_file("hp.obo")
+    "HP:0001250" in hierarchy.descendants("HP:0000118")  # True, a seizure is a phenotypic abnormality
+    ```
+    """
+
+    def __init__(self, parents: Dict[str, Iterable[str]]):
+        """
+        :param parents: The ids of the parents of each term
+        """
+        self._parents: Dict[str, Tuple[str, ...]] = {term_id: tuple(p) for term_id, p in parents.items()}
+        self._children: Dict[str, List[str]] = {}
+        for term_id, term_parents in self._parents.items():
+            for parent in term_parents:
+                self._children.setdefault(parent, []).append(term_id)
+        self._descendants: Dict[str, FrozenSet[str]] = {}
+
+    @classmethod
+    def from_terms(cls, terms: Iterable['OntologyTerm'], include_obsolete: bool = False) -> 'OntologyHierarchy':
+        """Creates the hierarchy of terms, e.g. those of `parse_ontology_file`
+
+        :param terms: The terms
+        :param include_obsolete: Whether to include obsolete terms
+        :return: The hierarchy
+        """
+        return cls({term.id: term.parents for term in terms if include_obsolete or not term.obsolete})
+
+    @classmethod
+    def from_file(cls, ontology_path: Union[str, Path], index_path: Optional[Union[str, Path]] = None,
+                  include_obsolete: bool = False) -> 'OntologyHierarchy':
+        """Creates the hierarchy of an ontology file, reading it from its prebuilt `OntologyIndex` if there is one
+
+        :param ontology_path: The ontology file, see `parse_ontology_file` for the supported formats
+        :param index_path: The path of the index file, see `OntologyIndex.open`
+        :param include_obsolete: Whether to include obsolete terms
+        :return: The hierarchy
+        """
+        from phenopacket_mapper.api_requests.ontology_index import OntologyIndex  # imports this package
+        with OntologyIndex.open(ontology_path, index_path) as index:
+            return cls.from_terms(index, include_obsolete=include_obsolete)
+
+    def parents(self, term_id: str) -> Tuple[str, ...]:
+        """Returns the ids of the direct parents of a term"""
+        return self._parents.get(term_id, ())
+
+    def children(self, term_id: str) -> Tuple[str, ...]:
+        """Returns the ids of the direct children of a term"""
+        return tuple(self._children.get(term_id, ()))
+
+    def descendants(self, term_id: str) -> FrozenSet[str]:
+        """Returns the ids of a term and of all terms below it, computed once per term
+
+        :param term_id: The id of the term, e.g. `HP:0000118`
+        :return: The ids of the term and its descendants
+        """
+        descendants = self._descendants.get(term_id)
+        if descendants is None:
+            found = {term_id}
+            stack = [term_id]
+            while stack:
+                for child in self._children.get(stack.pop(), ()):
+                    if child not in found:
+                        found.add(child)
+                        stack.append(child)
+            descendants = self._descendants[term_id] = frozenset(found)
+        return descendants
+
+    def is_descendant(self, term_id: str, ancestor_id: str) -> bool:
+        """Whether a term is the term `ancestor_id` or below it"""
+        return term_id in self.descendants(ancestor_id)
+
+    def __contains__(self, term_id: str) -> bool:
+        return term_id in self._parents
+
+    def __len__(self) -> int:
+        return len(self._parents)
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class OntologySubtree:
+    """A `ValueSet` element permitting the codings of a term and of all terms below it in an ontology
+
+    E.g. any phenotypic abnormality, or any Orphanet disease of a group:
+    ```python
+    hierarchy = OntologyHierarchy.from_file("hp.obo")
+    ValueSet([OntologySubtree(HPO, "HP:0000118", hierarchy)])
+
+    ordo_hierarchy = OntologyHierarchy.from_file("ordo.json")
+    ValueSet([OntologySubtree(ORDO, "Orphanet:68367", ordo_hierarchy, id_prefix="Orphanet")])
+    ```
+
+    Subtrees are compared by identity, as two subtrees with the same root permit different codes if their hierarchies
+    come from different versions of the ontology.
+
+    :ivar code_system: The code system of the permitted codings
+    :ivar root: The id of the root term in the ontology, e.g. `HP:0000118`
+    :ivar hierarchy: The hierarchy of the ontology
+    :ivar id_prefix: The prefix of the ids in the ontology, defaults to the namespace prefix of `code_system`
+    :ivar include_root: Whether the root term itself is permitted
+    :ivar codes: The codes of the permitted terms, without prefix, computed when the subtree is created
+    """
+    code_system: CodeSystem
+    root: str
+    hierarchy: OntologyHierarchy = field(repr=False)
+    id_prefix: Optional[str] = field(default=None)
+    include_root: bool = field(default=True)
+    codes: FrozenSet[str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        prefix = (self.id_prefix if self.id_prefix is not None else self.code_system.namespace_prefix) + ':'
+        if self.root not in self.hierarchy:
+            raise ValueError(f"{self.root} is not a term of the ontology hierarchy")
+        codes = frozenset(term_id[len(prefix):] for term_id in self.hierarchy.descendants(self.root)
+                          if term_id.startswith(prefix) and (self.include_root or term_id != self.root))
+        object.__setattr__(self, 'codes', codes)
+
+    def __contains__(self, item) -> bool:
+        """Whether a `Coding`, or any coding of a `CodeableConcept`, is in the subtree"""
+        if isinstance(item, Coding):
+            return item.code in self.codes and item.system == self.code_system
+        elif isinstance(item, CodeableConcept):
+            return any(coding in self for coding in item.coding)
+        return False
@@ -0,0 +1,94 @@
+import warnings
+from typing import Iterable, Dict, List, Optional, Union, Literal, Iterator
+
+from phenopacket_mapper.data_standards.code_system import CodeSystem
+
+
+class ResourceRegistry:
+    """A lookup table from namespace prefixes, names and synonyms of resources to their `CodeSystem`
+
+    The registry is built once from a list of resources (e.g. `DataModel.resources`) and then answers lookups in
+    constant time, ignoring upper and lower case:
+
+    >>> from phenopacket_mapper.data_standards.code_system import HPO, ORDO
+    >>> registry = ResourceRegistry([HPO, ORDO])
+    >>> registry.get("hpo")
+    CodeSystem(name=Human Phenotype Ontology, name space prefix=HP, version=0.0.0)
+
+    If two different resources share a namespace prefix, name or synonym, the collision is flagged when the registry is
+    built. With `compliance='lenient'` a warning is issued and the first resource keeps the key, with
+    `compliance='strict'` a `ValueError` is raised.
+
+    The registry behaves like the list of resources it was built from, so it can be passed wherever a list of resources
+    is expected.
+
+    :ivar collisions: Maps each colliding key to all resources that claim it
+    """
+
+    def __init__(
+            self,
+            resources: Iterable[CodeSystem] = (),
+            compliance: Literal['lenient', 'strict'] = 'lenient'
+    ):
+        """
+        :param resources: The resources to register
+        :param compliance: Whether to raise a `ValueError` or only warn if two resources share a key
+        """
+        self._resources: List[CodeSystem] = list(resources) if resources else []
+        self._lookup: Dict[str, CodeSystem] = {}
+        self.collisions: Dict[str, List[CodeSystem]] = {}
+
+        for res in self._resources:
+            for key in (res.namespace_prefix, res.name, *res.synonyms):
+                if not key:
+                    continue
+                key = key.lower()
+                registered = self._lookup.get(key)
+                if registered is None:
+                    self._lookup[key] = res
+                elif registered is not res and registered != res:
+                    self.collisions.setdefault(key, [registered]).append(res)
+
+        if self.collisions:
+            msg = "Resources share namespace prefixes, names or synonyms: " + "; ".join(
+                f"'{key}' ({', '.join(res.name for res in resources)})" for key, resources in self.collisions.items()
+            )
+            if compliance == 'strict':
+                raise ValueError(msg)
+            else:
+                warnings.warn(msg + ". The first resource listed is used for each of them.")
+
+    @staticmethod
+    def of(resources: Union['ResourceRegistry', Iterable[CodeSystem], None]) -> 'ResourceRegistry':
+        """Returns `resources` if it is a `ResourceRegistry` already, otherwise builds one from it
+
+        :param resources: A `ResourceRegistry` or list of resources
+        :return: A `ResourceRegistry` of the resources
+        """
+        if isinstance(resources, ResourceRegistry):
+            return resources
+        return ResourceRegistry(resources)
+
+    def get(self, namespace_prefix_str: str, default: Optional[CodeSystem] = None) -> Optional[CodeSystem]:
+        """Returns the resource with the namespace prefix, name or synonym `namespace_prefix_str`
+
+        :param namespace_prefix_str: The namespace prefix, name or synonym, ignoring upper and lower case
+        :param default: The value to return if no resource matches
+        :return: The matching `CodeSystem` or `default`
+        """
+        return self._lookup.get(namespace_prefix_str.lower(), default)
+
+    def __iter__(self) -> Iterator[CodeSystem]:
+        return iter(self._resources)
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def __getitem__(self, item):
+        return self._resources[item]
+
+    def __contains__(self, item) -> bool:
+        return item in self._resources
+
+    def __repr__(self):
+        return f"ResourceRegistry({self._resources})"
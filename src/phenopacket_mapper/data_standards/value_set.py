@@ -3,6 +3,7 @@ from dataclasses import dataclass, field
 from typing import List, Union, Literal
 
 from phenopacket_mapper.data_standards import Coding, CodeableConcept, CodeSystem, Date
+from phenopacket_mapper.data_standards.ontology_hierarchy import OntologySubtree
 
 
 @dataclass(slots=True, frozen=True)
@@ -18,6 +19,7 @@ class ValueSet:
     - allow any numerical value (i.e., int, float)
     - allow any date
     - allow any code from one or more CodeSystems
+    - allow any code below a term of an ontology, see `OntologySubtree`
     - allow only a specific set of codings
     - etc.
 
@@ -29,7 +31,7 @@ class ValueSet:
     :ivar name: Name of the value set
     :ivar description: Description of the value set
     """
-    elements: List[Union[Coding, CodeableConcept, CodeSystem, str, bool, int, float, Date, type]] \
+    elements: List[Union[Coding, CodeableConcept, CodeSystem, OntologySubtree, str, bool, int, float, Date, type]] \
         = field(default_factory=list)
     name: str = field(default="")
     description: str = field(default="")
@@ -58,6 +60,8 @@ class ValueSet:
             for e in self.elements:
                 if isinstance(e, CodeSystem):
                     self._resources.append(e)
+                elif isinstance(e, OntologySubtree) and e.code_system not in self._resources:
+                    self._resources.append(e.code_system)
         return self._resources
 
     @staticmethod
@@ -106,6 +110,11 @@ class ValueSet:
             for element in self.elements:
                 if element == item.value:
                     return True
+            item = item.value
+        if isinstance(item, (Coding, CodeableConcept)):  # codings below a term of an ontology
+            for element in self.elements:
+                if isinstance(element, OntologySubtree) and item in element:
+                    return True
         return False
 
     def __iter__(self):
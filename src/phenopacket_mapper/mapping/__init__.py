@@ -1,11 +1,13 @@
 """This module facilitates the mapping from a local data model to the phenopacket schema"""
 
 from .phenopacket_building_block import PhenopacketBuildingBlock, map_single
+from .mapping_plan import MappingPlan, PlanNode, NodeProfile
 from .mapper import PhenopacketMapper
 
 __all__ = [
     'map_single',
     'PhenopacketBuildingBlock',
     'PhenopacketMapper',
+    'MappingPlan', 'PlanNode', 'NodeProfile',
 
 ]
@@ -1,9 +1,13 @@
-from typing import List, Union, Dict
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Union, Dict, Optional, Sequence, Tuple, Iterable, Iterator
 
 from phenopackets import Phenopacket
 
-from phenopacket_mapper.data_standards.data_model import DataModel, DataSet, DataField
-from phenopacket_mapper.mapping import PhenopacketBuildingBlock, map_single
+from phenopacket_mapper.data_standards.data_model import DataModel, DataSet, DataField, DataModelInstance
+from phenopacket_mapper.mapping import PhenopacketBuildingBlock
+from phenopacket_mapper.mapping.mapping_plan import MappingPlan
 
 
 class PhenopacketMapper:
@@ -23,6 +27,7 @@ class PhenopacketMapper:
             setattr(self, k, v)
             self.elements[k] = v
 
+        self._plan: Optional[MappingPlan] = None
         self.__post_init__()
 
     def __post_init__(self):
@@ -30,6 +35,27 @@ class PhenopacketMapper:
         for e in self.elements.values():
             self.check_data_fields_in_model(e)
 
+    def __getstate__(self):
+        # the plan is made of closures, it is compiled again when needed
+        state = self.__dict__.copy()
+        state['_plan'] = None
+        return state
+
+    @property
+    def plan(self) -> MappingPlan:
+        """The mapping definition compiled into a `MappingPlan`, compiled once on first use
+
+        The plan can be printed to inspect it and profiled to measure the cost of each of its nodes:
+        ```python
+        print(mapper.plan)
+        for node_profile in mapper.plan.profile(data_set):
+            print(node_profile)
+        ```
+        """
+        if self._plan is None:
+            self._plan = MappingPlan.compile(Phenopacket, self.elements, self.data_model)
+        return self._plan
+
     def check_data_fields_in_model(self, element: Union[PhenopacketBuildingBlock, DataField]):
         if isinstance(element, DataField):
             field = element
@@ -41,32 +67,117 @@ class PhenopacketMapper:
             for key, ee in element.elements.items():
                 self.check_data_fields_in_model(ee)
 
-    def map(self, data: DataSet) -> List[Phenopacket]:
+    def map(
+            self,
+            data: Union[DataSet, Sequence[DataModelInstance]],
+            workers: Optional[int] = 1,
+            chunk_size: int = 1_000,
+    ) -> List[Phenopacket]:
         """Map data from the DataModel to Phenopackets
 
         The mapping is based on the definition of the DataModel and the parameters passed to the constructor.
 
-        If successful, a list of Phenopackets will be returned
+        If successful, a list of Phenopackets will be returned, in the order of the records in `data`.
+
+        With `workers` greater than 1, the data is partitioned into chunks of `chunk_size` records, which are mapped in
+        a pool of processes. The mapper and the data have to be picklable to be passed to the processes.
+
+        If the mapping of a record fails, the error reports the `row_no` of the record. `TypeError` and `ValueError` are
+        raised again with the row number in the message, any other error is raised as a `RuntimeError` caused by it.
 
         :param data: List of DataModelInstances created from the data using the DataModel
+        :param workers: Number of processes to map the data in, `None` to use one per CPU
+        :param chunk_size: Number of records mapped at a time by a process
         :return: List of Phenopackets
         """
-        phenopackets_list = []
-        for instance in data:
-            kwargs = {}
-            for key, e in self.elements.items():
-                map_single(key, e, instance, kwargs)
-            # TODO: Add the resources to the phenopacket
-            try:
-                phenopackets_list.append(
-                    Phenopacket(
-                        **kwargs
-                    )
-                )
-            except TypeError as e:
-                raise TypeError(f"Error in mapping: {e}")
-            except Exception as e:
-                raise e
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError(f"workers must be a positive integer, not {workers}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive integer, not {chunk_size}")
+
+        height = data.height if isinstance(data, DataSet) else len(data)
+        if workers == 1 or height <= chunk_size:
+            plan = self.plan
+            return [_map_instance(plan, instance) for instance in data]
+
+        bounds = [(start, min(start + chunk_size, height)) for start in range(0, height, chunk_size)]
+        # the default context, fixing the start method for the pool if it has not been set yet
+        mp_context = multiprocessing.get_context()
+        if mp_context.get_start_method() == 'fork':
+            # forked processes inherit the data, only the bounds of the chunks are sent to them
+            worker_data, tasks = data, bounds
+        elif isinstance(data, DataSet):
+            worker_data, tasks = None, data.partition(chunk_size)
+        else:
+            worker_data, tasks = None, [data[start:stop] for start, stop in bounds]
 
+        phenopackets_list = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(bounds)), mp_context=mp_context,
+                                 initializer=_init_worker, initargs=(self, worker_data)) as executor:
+            for chunk_phenopackets in executor.map(_map_chunk, tasks):
+                phenopackets_list.extend(chunk_phenopackets)
         return phenopackets_list
 
+    def imap(
+            self,
+            data: Union[DataSet, Iterable[DataModelInstance], Iterable[DataSet]],
+    ) -> Iterator[Phenopacket]:
+        """Lazily map data from the DataModel to Phenopackets, yielding one Phenopacket at a time
+
+        Unlike `map`, no list of all Phenopackets is built. `data` can also be an iterable of `DataSet` objects, such as
+        the chunks yielded by `DataModel.iter_data`, so that loading, mapping and writing run with constant memory:
+        ```python
+        chunks = data_model.iter_data("data.csv", chunk_size=1000, **column_names)
+        write(mapper.imap(chunks), out_dir)
+        ```
+
+        Errors report the `row_no` of the record like in `map`.
+
+        :param data: A `DataSet`, an iterable of `DataModelInstance` objects or an iterable of `DataSet` objects
+        :return: An iterator over the Phenopackets, in the order of the records in `data`
+        """
+        plan = self.plan
+        for item in data:
+            if isinstance(item, DataSet):
+                for instance in item:
+                    yield _map_instance(plan, instance)
+            else:
+                yield _map_instance(plan, item)
+
+
+def _map_instance(plan: MappingPlan, instance: DataModelInstance) -> Phenopacket:
+    """Maps a single record to a Phenopacket, reporting the row number of the record if the mapping fails"""
+    try:
+        kwargs = plan.map_kwargs(instance)
+        # TODO: Add the resources to the phenopacket
+        return Phenopacket(
+            **kwargs
+        )
+    except TypeError as e:
+        raise TypeError(f"Error in mapping (row {instance.row_no}): {e}") from e
+    except ValueError as e:
+        raise ValueError(f"Error in mapping (row {instance.row_no}): {e}") from e
+    except Exception as e:
+        raise RuntimeError(f"Error in mapping (row {instance.row_no}): {e}") from e
+
+
+_worker_mapper: Optional[PhenopacketMapper] = None
+_worker_data: Optional[Union[DataSet, Sequence[DataModelInstance]]] = None
+
+
+def _init_worker(mapper: PhenopacketMapper, data: Optional[Union[DataSet, Sequence[DataModelInstance]]]):
+    # the mapper (and with fork, the data) is passed to each process once, instead of with every chunk
+    global _worker_mapper, _worker_data
+    _worker_mapper = mapper
+    _worker_data = data
+
+
+def _map_chunk(chunk: Union[Tuple[int, int], DataSet, Sequence[DataModelInstance]]) -> List[Phenopacket]:
+    if isinstance(chunk, tuple):
+        start, stop = chunk
+        data = _worker_data.data if isinstance(_worker_data, DataSet) else _worker_data
+        chunk = data[start:stop]
+    plan = _worker_mapper.plan
+    return [_map_instance(plan, instance) for instance in chunk]
@@ -0,0 +1,343 @@
+"""
+This module compiles the element tree of a mapping definition (the `elements` of a `PhenopacketMapper` or a
+`PhenopacketBuildingBlock`) into a flat execution plan.
+
+The plan is a list of `PlanNode` objects in execution order (children before their parent). Field nodes know the
+position of their `DataField` in the `DataModel` and a converter chosen from the value set of the field, block nodes
+construct a phenopacket element from the values mapped by their children, and list nodes collect the elements built by
+their children. Executing the plan for a record runs one precompiled step per node, without walking the `elements`
+dictionaries or dispatching on the type of the elements again.
+"""
+
+from dataclasses import dataclass, field, replace
+from time import perf_counter
+from typing import Union, List, Literal, Dict, Optional, Any, Callable, Iterable
+
+from google.protobuf.timestamp_pb2 import Timestamp
+from phenopackets.schema.v2.core.base_pb2 import OntologyClass
+
+from phenopacket_mapper.data_standards import DataModel, DataModelInstance, DataField, DataFieldValue, Coding, \
+    CodeSystem, Date, ValueSet
+
+ConverterKind = Literal['date', 'coding', 'primitive', 'dynamic']
+
+_PRIMITIVE_TYPES = (str, int, float, bool)
+
+
+def _convert_value(value: Any) -> Any:
+    """Converts a value to its phenopacket representation, dispatching on its type"""
+    if isinstance(value, Date):
+        timestamp = value.protobuf_timestamp()
+        assert isinstance(timestamp, Timestamp)
+        return timestamp
+    elif isinstance(value, Coding):
+        return OntologyClass(id=value.curie, label=value.display)
+    return value
+
+
+def _convert_date(value: Any) -> Any:
+    if type(value) is Date:
+        return value.protobuf_timestamp()
+    return _convert_value(value)
+
+
+def _convert_coding(value: Any) -> Any:
+    if type(value) is Coding:
+        return OntologyClass(id=value.curie, label=value.display)
+    return _convert_value(value)
+
+
+def _convert_primitive(value: Any) -> Any:
+    if type(value) in _PRIMITIVE_TYPES:
+        return value
+    return _convert_value(value)
+
+
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    'date': _convert_date,
+    'coding': _convert_coding,
+    'primitive': _convert_primitive,
+    'dynamic': _convert_value,
+}
+
+
+def converter_kind(data_field: DataField) -> ConverterKind:
+    """Chooses the converter for the values of a `DataField` from its value set
+
+    The converters only take a shortcut for the type the value set promises, values of any other type are converted by
+    dispatching on their type, so the result never depends on the choice of the converter.
+
+    >>> converter_kind(DataField(name="Date of Birth", specification=Date))
+    'date'
+    >>> converter_kind(DataField(name="Sex", specification=ValueSet(["Female", "Male"])))
+    'primitive'
+
+    :param data_field: The `DataField` to choose the converter for
+    :return: The kind of converter, one of 'date', 'coding', 'primitive' and 'dynamic'
+    """
+    value_set = data_field.specification
+    if not isinstance(value_set, ValueSet) or len(value_set.elements) == 0:
+        return 'dynamic'
+    elements = value_set.elements
+    if all(e is Date for e in elements):
+        return 'date'
+    elif all(isinstance(e, CodeSystem) for e in elements):
+        return 'coding'
+    elif all(e in _PRIMITIVE_TYPES if isinstance(e, type) else type(e) in _PRIMITIVE_TYPES for e in elements):
+        return 'primitive'
+    return 'dynamic'
+
+
+@dataclass(slots=True, frozen=True)
+class PlanNode:
+    """A node of a `MappingPlan`
+
+    :ivar index: Position of the node in the plan, i.e. in execution order
+    :ivar kind: 'field' for a `DataField`, 'block' for a `PhenopacketBuildingBlock` (or the root element) and 'list'
+                for a list of building blocks
+    :ivar key: Name of the argument the node maps to, `None` if the node is an item of a list or the root
+    :ivar parent: Index of the parent node, `None` for the root
+    :ivar depth: Depth of the node in the element tree, 0 for the root
+    :ivar data_field: The `DataField` of a field node
+    :ivar field_position: Position of the `DataField` in the `DataModel`, `None` if it is not part of the data model
+    :ivar converter: Kind of converter of a field node, see `converter_kind`
+    :ivar element: The phenopacket element constructed by a block node
+    """
+    index: int
+    kind: Literal['field', 'block', 'list']
+    key: Optional[str]
+    parent: Optional[int]
+    depth: int
+    data_field: Optional[DataField] = None
+    field_position: Optional[int] = None
+    converter: Optional[ConverterKind] = None
+    element: Any = None
+
+    @property
+    def label(self) -> str:
+        if self.kind == 'field':
+            return f"{self.key} <- {self.data_field.id} ({self.converter})"
+        elif self.kind == 'block':
+            name = getattr(self.element, '__name__', str(self.element))
+            return f"{self.key} = {name}(...)" if self.key is not None else f"{name}(...)"
+        return f"{self.key} = [...]" if self.key is not None else "[...]"
+
+
+@dataclass(slots=True, frozen=True)
+class NodeProfile:
+    """Time spent in a node of a `MappingPlan`, as measured by `MappingPlan.profile`
+
+    For block and list nodes, the time does not include the time spent in their children.
+
+    :ivar node: The profiled node
+    :ivar calls: Number of times the node was executed
+    :ivar seconds: Total time spent in the node
+    """
+    node: PlanNode
+    calls: int
+    seconds: float
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def __str__(self):
+        return (f"{self.node.index:>3} {'  ' * self.node.depth}{self.node.label}: {self.calls} calls, "
+                f"{self.seconds:.6f} s ({self.mean_seconds * 1e6:.2f} us/call)")
+
+
+@dataclass(slots=True)
+class MappingPlan:
+    """Flat execution plan of a mapping definition
+
+    E.g.:
+    ```python
+    plan = mapper.plan
+    print(plan)  # lists the nodes in execution order
+    for node_profile in plan.profile(data_set):
+        print(node_profile)
+    ```
+
+    :ivar root_element: The phenopacket element constructed from the mapped values, e.g. `Phenopacket`
+    :ivar data_model: The `DataModel` the field positions refer to
+    :ivar nodes: The nodes of the plan in execution order, the root is the last node
+    """
+    root_element: Any
+    data_model: Optional[DataModel]
+    nodes: List[PlanNode]
+    _fields: List[DataField] = field(repr=False)
+    _field_positions: Optional[List[int]] = field(repr=False)
+    _steps: List[Callable[[List[Optional[DataFieldValue]], List[Union[Dict, List]]], None]] = field(repr=False)
+    _container_types: List[type] = field(repr=False)
+
+    @staticmethod
+    def compile(
+            root_element: Any,
+            elements: Dict[str, Any],
+            data_model: Optional[DataModel] = None,
+    ) -> 'MappingPlan':
+        """Compiles the elements of a mapping definition into a `MappingPlan`
+
+        :param root_element: The phenopacket element to construct from the mapped values, e.g. `Phenopacket`
+        :param elements: The elements of the mapping definition, mapping argument names to `DataField`,
+                        `PhenopacketBuildingBlock` objects or lists of `PhenopacketBuildingBlock` objects
+        :param data_model: The `DataModel` of the records the plan is executed on
+        :return: The compiled `MappingPlan`
+        """
+        from phenopacket_mapper.mapping import PhenopacketBuildingBlock
+
+        nodes: List[PlanNode] = []
+        steps = []
+        container_types: List[type] = []
+        fields: List[DataField] = []
+        field_slots: Dict[str, int] = {}
+
+        def add_container(container_type: type) -> int:
+            container_types.append(container_type)
+            return len(container_types) - 1
+
+        def add_children(parent_slot: int, parent_kind: str, children: Iterable, depth: int, parent_nodes: list):
+            # the nodes of the children are added before the node of their parent, so the index of the parent is
+            # only set once the parent node is added
+            for key, e in children:
+                if parent_kind == 'list' and not isinstance(e, PhenopacketBuildingBlock):
+                    raise ValueError(f"Lists in a mapping definition may only contain PhenopacketBuildingBlocks, not "
+                                     f"{type(e)}")
+                if isinstance(e, DataField):
+                    if e.id not in field_slots:
+                        field_slots[e.id] = len(fields)
+                        fields.append(e)
+                    kind = converter_kind(e)
+                    nodes.append(PlanNode(
+                        index=len(nodes), kind='field', key=key, parent=None, depth=depth, data_field=e,
+                        field_position=data_model.get_field_position(e.id) if data_model is not None else None,
+                        converter=kind,
+                    ))
+                    steps.append(_field_step(field_slots[e.id], key, parent_slot, _CONVERTERS[kind]))
+                elif isinstance(e, list):
+                    slot = add_container(list)
+                    child_nodes = []
+                    add_children(slot, 'list', ((None, item) for item in e), depth + 1, child_nodes)
+                    nodes.append(PlanNode(index=len(nodes), kind='list', key=key, parent=None, depth=depth))
+                    steps.append(_list_step(key, parent_slot, slot))
+                    _set_parents(nodes, child_nodes, len(nodes) - 1)
+                elif isinstance(e, PhenopacketBuildingBlock):
+                    slot = add_container(dict)
+                    child_nodes = []
+                    add_children(slot, 'block', e.elements.items(), depth + 1, child_nodes)
+                    nodes.append(PlanNode(index=len(nodes), kind='block', key=key, parent=None, depth=depth,
+                                          element=e.phenopacket_element))
+                    steps.append(_block_step(e.phenopacket_element, key, parent_slot, slot, parent_kind == 'list'))
+                    _set_parents(nodes, child_nodes, len(nodes) - 1)
+                else:  # other elements are not mapped
+                    continue
+                parent_nodes.append(len(nodes) - 1)
+
+        root_slot = add_container(dict)
+        root_children = []
+        add_children(root_slot, 'block', elements.items(), 1, root_children)
+        nodes.append(PlanNode(index=len(nodes), kind='block', key=None, parent=None, depth=0, element=root_element))
+        _set_parents(nodes, root_children, len(nodes) - 1)
+
+        field_positions = None
+        if data_model is not None and all(data_model.get_field_position(f.id) is not None for f in fields):
+            field_positions = [data_model.get_field_position(f.id) for f in fields]
+
+        return MappingPlan(
+            root_element=root_element,
+            data_model=data_model,
+            nodes=nodes,
+            _fields=fields,
+            _field_positions=field_positions,
+            _steps=steps,
+            _container_types=container_types,
+        )
+
+    def _field_values(self, instance: DataModelInstance) -> List[Optional[DataFieldValue]]:
+        """Returns the value of each field used by the plan, `None` if the instance has no value for it"""
+        if self._field_positions is not None and instance.data_model is self.data_model:
+            values_by_position = instance.get_values_by_position()
+            return [values_by_position[p] for p in self._field_positions]
+        return [getattr(instance, f.id, None) for f in self._fields]
+
+    def map_kwargs(self, instance: DataModelInstance) -> Dict[str, Any]:
+        """Executes the plan for a record, returning the arguments to construct the root element with
+
+        :param instance: The record to map
+        :return: The keyword arguments for the root element
+        """
+        values = self._field_values(instance)
+        containers = [container_type() for container_type in self._container_types]
+        for step in self._steps:
+            step(values, containers)
+        return containers[0]
+
+    def map(self, instance: DataModelInstance) -> Any:
+        """Executes the plan for a record and constructs the root element
+
+        :param instance: The record to map
+        :return: The root element, e.g. a `Phenopacket`
+        """
+        return self.root_element(**self.map_kwargs(instance))
+
+    def profile(self, data: Iterable[DataModelInstance]) -> List[NodeProfile]:
+        """Executes the plan for each record of `data`, measuring the time spent in each node
+
+        :param data: The records to map, e.g. a `DataSet`
+        :return: One `NodeProfile` per node of the plan, in execution order
+        """
+        seconds = [0.0] * len(self.nodes)
+        calls = 0
+        for instance in data:
+            values = self._field_values(instance)
+            containers = [container_type() for container_type in self._container_types]
+            for i, step in enumerate(self._steps):
+                start = perf_counter()
+                step(values, containers)
+                seconds[i] += perf_counter() - start
+            start = perf_counter()
+            self.root_element(**containers[0])
+            seconds[-1] += perf_counter() - start
+            calls += 1
+        return [NodeProfile(node=node, calls=calls, seconds=s) for node, s in zip(self.nodes, seconds)]
+
+    def __str__(self):
+        root_name = getattr(self.root_element, '__name__', str(self.root_element))
+        ret = f"MappingPlan({root_name}, {len(self.nodes)} nodes)\n"
+        for node in self.nodes:
+            parent = f" -> {node.parent}" if node.parent is not None else ""
+            ret += f"{node.index:>3} {'  ' * node.depth}{node.label}{parent}\n"
+        return ret
+
+
+def _set_parents(nodes: List[PlanNode], children: List[int], parent: int):
+    for child in children:
+        nodes[child] = replace(nodes[child], parent=parent)
+
+
+def _field_step(value_index: int, key: str, parent_slot: int, convert: Callable[[Any], Any]):
+    def step(values, containers):
+        dfv = values[value_index]
+        if dfv is None:  # no value for the field in this record
+            return
+        try:
+            containers[parent_slot][key] = convert(dfv.value)
+        except AttributeError:
+            pass
+    return step
+
+
+def _block_step(element: Any, key: Optional[str], parent_slot: int, slot: int, in_list: bool):
+    if in_list:
+        def step(values, containers):
+            containers[parent_slot].append(element(**containers[slot]))
+    else:
+        def step(values, containers):
+            containers[parent_slot][key] = element(**containers[slot])
+    return step
+
+
+def _list_step(key: str, parent_slot: int, slot: int):
+    def step(values, containers):
+        containers[parent_slot][key] = containers[slot]
+    return step
@@ -3,7 +3,7 @@ from typing import Union, Dict
 from phenopackets.schema.v2.core.base_pb2 import OntologyClass
 from google.protobuf.timestamp_pb2 import Timestamp
 
-from phenopacket_mapper.data_standards import DataModelInstance, DataField, DataFieldValue, Coding
+from phenopacket_mapper.data_standards import DataModelInstance, DataField, DataFieldValue, Coding, DataModel
 
 
 class PhenopacketBuildingBlock:
@@ -37,11 +37,28 @@ class PhenopacketBuildingBlock:
         :param instance: the `DataModelInstance` from which to map to a Phenopacket schema element
         :return: the resulting Phenopacket schema element
         """
-        kwargs = {}
-        for key, e in self.elements.items():
-            map_single(key, e, instance, kwargs)
+        return self.plan_for(instance.data_model).map(instance)
 
-        return self.phenopacket_element(**kwargs)
+    def plan_for(self, data_model: DataModel) -> 'MappingPlan':
+        """Returns the building block compiled into a `MappingPlan` for records of `data_model`
+
+        The plan is compiled once and reused as long as the records belong to the same data model.
+
+        :param data_model: The `DataModel` of the records to map
+        :return: The compiled `MappingPlan`
+        """
+        plan = self.__dict__.get('_plan')
+        if plan is None or plan.data_model is not data_model:
+            from phenopacket_mapper.mapping.mapping_plan import MappingPlan
+            plan = MappingPlan.compile(self.phenopacket_element, self.elements, data_model)
+            self.__dict__['_plan'] = plan
+        return plan
+
+    def __getstate__(self):
+        # the plan is made of closures, it is compiled again when needed
+        state = self.__dict__.copy()
+        state.pop('_plan', None)
+        return state
 
 
 def map_single(key, e, instance, kwargs):
@@ -57,7 +74,7 @@ def map_single(key, e, instance, kwargs):
                 assert isinstance(timestamp, Timestamp)
                 kwargs[key] = timestamp
             elif isinstance(value, Coding):
-                kwargs[key] = OntologyClass(id=str(value), label=value.display)
+                kwargs[key] = OntologyClass(id=value.curie, label=value.display)
             else:
                 kwargs[key] = value
         except AttributeError:
@@ -1,12 +1,20 @@
 """This module includes the pipeline for mapping  data to phenopackets."""
 
-from .input import read_data_model, read_phenopackets, read_phenopacket_from_json, load_data_using_data_model
+from .input import read_data_model, read_phenopackets, iter_phenopackets, read_phenopacket_from_json, \
+    load_data_using_data_model, iter_data_using_data_model, iter_phenopackets_from_binary, read_phenopackets_from_binary
 from phenopacket_mapper.mapping.mapper import PhenopacketMapper
-from .output import write
-from .validate import validate, read_validate
+from .output import write, WriteReport
+from .store import PhenopacketStore
+from .term_index import TermIndex
+from .validate import validate, read_validate, iter_validate, Validator, ValidationResult, ValidationIssue
+from .validation_cache import ValidationCache
 
 __all__ = [
-    'read_data_model', 'read_phenopackets', 'read_phenopacket_from_json', 'load_data_using_data_model',
-    'write',
+    'read_data_model', 'read_phenopackets', 'iter_phenopackets', 'read_phenopacket_from_json',
+    'load_data_using_data_model',
+    'iter_data_using_data_model', 'iter_phenopackets_from_binary', 'read_phenopackets_from_binary',
+    'write', 'WriteReport', 'PhenopacketStore', 'TermIndex',
+    'validate', 'read_validate', 'iter_validate', 'Validator', 'ValidationResult', 'ValidationIssue',
+    'ValidationCache',
     'PhenopacketMapper'
 ]
@@ -1,18 +1,24 @@
-import math
+import gzip
 import os
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import replace
+from itertools import islice
 from pathlib import Path
 from types import MappingProxyType
-from typing import Literal, List, Union, Dict, Tuple
+from typing import Literal, List, Union, Dict, Tuple, Iterator, Optional, BinaryIO
 
+import numpy as np
 import pandas as pd
 from phenopackets.schema.v2 import Phenopacket
 from google.protobuf.json_format import Parse
 
 from phenopacket_mapper.data_standards import DataModel, DataModelInstance, DataField, CodeSystem, DataFieldValue, \
-    DataSet
-from phenopacket_mapper.utils import loc_default
+    DataSet, ResourceRegistry, ColumnarData, DataColumn
+from phenopacket_mapper.utils import loc_default, present_mask, read_varint
 from phenopacket_mapper.utils import parsing
-from phenopacket_mapper.utils.parsing import parse_ordinal
+from phenopacket_mapper.utils.parsing import parse_ordinal, ParseCache
 
 
 def read_data_model(
@@ -93,6 +99,7 @@ def read_data_model(
             return value.replace('\n', ' ')
         return value
 
+    resource_registry = ResourceRegistry(resources)
     data_fields: Tuple[DataField, ...] = tuple()
     for i in range(len(df)):
         data_field_name = loc_default(df, row_index=i, column_name=column_names.get(DataField.name.__name__, ''))
@@ -117,7 +124,7 @@ def read_data_model(
             value_set = parsing.parse_value_set(
                 value_set_str=value_set,
                 value_set_name=f"Value set for '{data_field_name}' field",
-                resources=resources
+                resources=resource_registry
             )
 
         data_fields = data_fields + (
@@ -139,6 +146,8 @@ def load_data_using_data_model(
         data_model: DataModel,
         column_names: Dict[str, str],
         compliance: Literal['lenient', 'strict'] = 'lenient',
+        parse_cache_size: int = 65_536,
+        storage: Literal['rows', 'columnar'] = 'rows',
 ) -> DataSet:
     """Loads data from a file using a DataModel definition
 
@@ -158,6 +167,10 @@ def load_data_using_data_model(
                         column in the file
     :param compliance: Compliance level to enforce when reading the file. If 'lenient', the file can have extra fields
                         that are not in the DataModel. If 'strict', the file must have all fields in the DataModel.
+    :param parse_cache_size: Maximum number of distinct parsed values to cache, set to 0 to disable the cache. The
+                        statistics of the cache are available as `DataSet.parse_stats`.
+    :param storage: Whether to store the data as a list of `DataModelInstance` objects ('rows') or in one column per
+                        field ('columnar'), see `ColumnarData`. Columnar storage needs considerably less memory.
     :return: List of DataModelInstances
     """
     if isinstance(path, Path):
@@ -166,7 +179,7 @@ def load_data_using_data_model(
         path = Path(path)
     else:
         raise ValueError(f'Path must be a string or Path object, not {type(path)}')
-    
+
     file_extension = path.suffix[1:]
     if file_extension == 'csv':
         df = pd.read_csv(path)
@@ -175,7 +188,155 @@ def load_data_using_data_model(
     else:
         raise ValueError(f'Unknown file type with extension {file_extension}')
 
-    # check column_names is in the correct format
+    if storage not in ('rows', 'columnar'):
+        raise ValueError(f"Storage {storage} is not valid, use 'rows' or 'columnar'")
+
+    column_names = _resolve_column_names(data_model, column_names)
+
+    return _load_data_frame_using_data_model(
+        df=df,
+        data_model=data_model,
+        column_names=column_names,
+        compliance=compliance,
+        parse_cache=ParseCache(max_size=parse_cache_size) if parse_cache_size > 0 else None,
+        storage=storage
+    )
+
+
+def iter_data_using_data_model(
+        path: Union[str, Path],
+        data_model: DataModel,
+        column_names: Dict[str, str],
+        compliance: Literal['lenient', 'strict'] = 'lenient',
+        chunk_size: int = 10_000,
+        parse_cache_size: int = 65_536,
+        storage: Literal['rows', 'columnar'] = 'rows',
+) -> Iterator[DataSet]:
+    """Loads data from a file using a DataModel definition, yielding it in chunks of `chunk_size` rows
+
+    This is the streaming variant of `load_data_using_data_model`. CSV files are read in chunks, so that only one chunk
+    is held in memory at a time. Excel files cannot be read in chunks, they are read at once and then yielded in slices.
+
+    The `row_no` of each `DataModelInstance` and `DataFieldValue` refers to the position of the row in the whole file,
+    not within its chunk.
+
+    E.g.:
+    ```python
+    for data_set in iter_data_using_data_model("data.csv", data_model, column_names, chunk_size=1000):
+        phenopackets = mapper.map(data_set)
+    ```
+
+    :param path: Path to  formatted csv or excel file
+    :param data_model: DataModel to use for reading the file
+    :param column_names: A dictionary mapping from the id of each field of the `DataField` to the name of a
+                        column in the file
+    :param compliance: Compliance level to enforce when reading the file. If 'lenient', the file can have extra fields
+                        that are not in the DataModel. If 'strict', the file must have all fields in the DataModel.
+    :param chunk_size: Number of rows per yielded `DataSet`
+    :param parse_cache_size: Maximum number of distinct parsed values to cache, set to 0 to disable the cache. The
+                        cache is shared by all chunks, `DataSet.parse_stats` holds its statistics up to that chunk.
+    :param storage: Whether to store the data as a list of `DataModelInstance` objects ('rows') or in one column per
+                        field ('columnar'), see `ColumnarData`
+    :return: An iterator over `DataSet` objects of at most `chunk_size` rows each
+    """
+    if isinstance(path, Path):
+        pass
+    elif isinstance(path, str):
+        path = Path(path)
+    else:
+        raise ValueError(f'Path must be a string or Path object, not {type(path)}')
+
+    if storage not in ('rows', 'columnar'):
+        raise ValueError(f"Storage {storage} is not valid, use 'rows' or 'columnar'")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive integer, not {chunk_size}")
+
+    column_names = _resolve_column_names(data_model, column_names)
+
+    file_extension = path.suffix[1:]
+    if file_extension == 'csv':
+        chunks = _iter_csv_chunks(path, [c for c in column_names.values() if c is not None], chunk_size)
+    elif file_extension == 'xlsx':
+        excel_df = pd.read_excel(path)
+        chunks = (excel_df.iloc[start:start + chunk_size] for start in range(0, len(excel_df), chunk_size))
+    else:
+        raise ValueError(f'Unknown file type with extension {file_extension}')
+
+    parse_cache = ParseCache(max_size=parse_cache_size) if parse_cache_size > 0 else None
+    row_offset = 0
+    for df in chunks:
+        yield _load_data_frame_using_data_model(
+            df=df,
+            data_model=data_model,
+            column_names=column_names,
+            compliance=compliance,
+            row_offset=row_offset,
+            parse_cache=parse_cache,
+            storage=storage
+        )
+        row_offset += len(df)
+
+
+def _iter_csv_chunks(path: Path, columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Reads a csv file in chunks, with the column types `pd.read_csv` infers when reading the whole file at once
+
+    `pd.read_csv` infers the type of each column per chunk, e.g. a column of integers holds floats only in chunks with a
+    missing value. A first pass over the file records the kind of values of the `columns` in each chunk, and columns
+    whose kind differs between chunks are then read as the type of the whole column: floats for numbers, `str` for text
+    and objects for booleans with missing values. Like `load_data_using_data_model`, the default missing values of
+    pandas are kept. Only one chunk is held in memory at a time.
+
+    :param path: Path to the csv file
+    :param columns: Names of the columns whose types are made consistent
+    :param chunk_size: Number of rows per chunk
+    :return: An iterator over the chunks
+    """
+    kinds: Dict[str, set] = {}
+    with pd.read_csv(path, usecols=lambda c: c in columns, chunksize=chunk_size) as reader:
+        for df in reader:
+            for column_name, column in df.items():
+                kinds.setdefault(column_name, set()).add(_value_kind(column))
+
+    dtype: Dict[str, type] = {}
+    object_columns: List[str] = []
+    for column_name, column_kinds in kinds.items():
+        if len(column_kinds) == 1:
+            continue
+        elif column_kinds <= {'int', 'float', 'empty'}:
+            dtype[column_name] = float
+        elif column_kinds == {'bool', 'empty'}:
+            object_columns.append(column_name)
+        else:
+            dtype[column_name] = str
+
+    with pd.read_csv(path, dtype=dtype, chunksize=chunk_size) as reader:
+        for df in reader:
+            for column_name in object_columns:
+                df[column_name] = df[column_name].astype(object)
+            yield df
+
+
+def _value_kind(column: pd.Series) -> Literal['empty', 'bool', 'int', 'float', 'other']:
+    """The kind of the values of a column of a chunk read by `pd.read_csv`"""
+    if not column.notna().any():
+        return 'empty'
+    elif pd.api.types.is_bool_dtype(column) or \
+            (column.dtype == object and all(isinstance(v, bool) for v in column.dropna().tolist())):
+        return 'bool'
+    elif pd.api.types.is_integer_dtype(column):
+        return 'int'
+    elif pd.api.types.is_float_dtype(column):
+        return 'float'
+    return 'other'
+
+
+def _resolve_column_names(data_model: DataModel, column_names: Dict[str, str]) -> Dict[str, str]:
+    """Checks that `column_names` lists a column for each field of the `DataModel` and normalizes its keys to field ids
+
+    :param data_model: DataModel to use for reading the file
+    :param column_names: A dictionary mapping from the id (or `{id}_column`) of each field to the name of a column
+    :return: A dictionary mapping from the id of each field to the name of a column
+    """
     if isinstance(column_names, MappingProxyType):
         column_names = dict(column_names)
     for f in data_model.fields:
@@ -184,48 +345,219 @@ def load_data_using_data_model(
                              f" list it with the key '{f.id}_column'")
         elif f.id + "_column" in column_names.keys():
             column_names[f.id] = column_names.pop(f.id + "_column")
+    return column_names
 
-    data_model_instances = []
 
-    for i in range(len(df)):  # todo: change to iter also non tabular data
-        values = []
-        for f in data_model.fields:
-            column_name = column_names[f.id]
-
-            pandas_value = loc_default(df, row_index=i, column_name=column_name)
-
-            if not pandas_value or (isinstance(pandas_value, float) and math.isnan(pandas_value)):
-                continue
+def _load_data_frame_using_data_model(
+        df: pd.DataFrame,
+        data_model: DataModel,
+        column_names: Dict[str, str],
+        compliance: Literal['lenient', 'strict'] = 'lenient',
+        row_offset: int = 0,
+        parse_cache: Optional[ParseCache] = None,
+        storage: Literal['rows', 'columnar'] = 'rows',
+) -> DataSet:
+    """Column-wise loading of a `pd.DataFrame` into a `DataSet`
+
+    Each mapped column is pulled out of the data frame once and missing values are filtered using a vectorized mask, so
+    that only cells holding a value are parsed. The cells are parsed by a parser compiled from the value set of their
+    field (see `compile_value_parser`). For row storage, the `DataFieldValue` objects are then grouped into one
+    `DataModelInstance` per row. For columnar storage, the parsed values are kept in one `DataColumn` per field and the
+    rows are validated once using transient views.
+
+    :param df: The data frame holding the data, one record per row
+    :param data_model: DataModel to use for reading the data frame
+    :param column_names: A dictionary mapping from the id of each field to the name of a column in the data frame
+    :param compliance: Compliance level to enforce when reading the data frame
+    :param row_offset: Row number of the first row of the data frame, i.e. its position within the whole file
+    :param parse_cache: Cache of parsed values, if `None` every cell is parsed
+    :param storage: Whether to store the data as a list of `DataModelInstance` objects or as `ColumnarData`
+    :return: A `DataSet` with one `DataModelInstance` per row of the data frame
+    """
+    row_values: List[List[DataFieldValue]] = [[] for _ in range(len(df))] if storage == 'rows' else None
+    columns: List[Optional[DataColumn]] = []
+    resources_key = parsing.resources_fingerprint(data_model.resources)
 
-            value_str = str(pandas_value)
-            value = parsing.parse_value(value_str=value_str, resources=data_model.resources, compliance=compliance)
-            values.append(DataFieldValue(row_no=i, field=f, value=value))
-        data_model_instances.append(
+    for f in data_model.fields:
+        column_name = column_names[f.id]
+        if column_name is None or column_name not in df.columns:
+            columns.append(None)
+            continue
+
+        parse = parsing.compile_value_parser(f.specification, resources=data_model.resource_registry,
+                                             compliance=compliance)
+        column = df[column_name]
+        present = present_mask(column)
+        if storage == 'columnar':
+            values = [None] * len(df)
+        for i, pandas_value in zip(np.flatnonzero(present).tolist(), column[present].tolist()):
+            if parse_cache is None:
+                value = parse(str(pandas_value))
+            else:
+                value = parse_cache.parse(f.id, str(pandas_value), resources_key, parse)
+            if storage == 'rows':
+                row_values[i].append(DataFieldValue(row_no=row_offset + i, field=f, value=value))
+            else:
+                values[i] = value
+        if storage == 'columnar':
+            columns.append(DataColumn.from_values(values, present=present))
+
+    if storage == 'rows':
+        data = [
             DataModelInstance(
-                row_no=i,
+                row_no=row_offset + i,
                 data_model=data_model,
                 values=values,
                 compliance=compliance)
+            for i, values in enumerate(row_values)
+        ]
+    else:
+        data = ColumnarData(
+            data_model=data_model,
+            columns=columns,
+            row_nos=range(row_offset, row_offset + len(df)),
+            compliance=compliance
         )
+        data.validate()
 
-    return DataSet(data_model=data_model, data=data_model_instances)
+    return DataSet(
+        data_model=data_model,
+        data=data,
+        parse_stats=replace(parse_cache.stats) if parse_cache is not None else None
+    )
 
 
-def read_phenopackets(dir_path: Path) -> List[Phenopacket]:
+def read_phenopackets(
+        dir_path: Union[str, Path],
+        recursive: bool = False,
+        workers: int = 1,
+        executor: Literal['thread', 'process'] = 'thread',
+) -> List[Phenopacket]:
     """Reads a list of Phenopackets from JSON files in a directory.
 
+    Raises a `ValueError` on the first file that cannot be parsed, use `iter_phenopackets` to skip bad files instead.
+
     :param dir_path: The directory containing JSON files.
     :type dir_path: Union[str, Path]
+    :param recursive: Whether to read the JSON files in subdirectories too, e.g. those written with `shard_depth`
+    :param workers: Number of threads or processes parsing the files
+    :param executor: 'thread' or 'process', the kind of pool used if `workers` is greater than 1
     :return: The list of loaded Phenopackets.
     :rtype: List[Phenopacket]
     """
-    phenopackets_list = []
-    for file_name in os.listdir(dir_path):
-        if file_name.endswith('.json'):
-            file_path = os.path.join(dir_path, file_name)
-            phenopacket = read_phenopacket_from_json(file_path)
-            phenopackets_list.append(phenopacket)
-    return phenopackets_list
+    return list(iter_phenopackets(dir_path, recursive=recursive, workers=workers, executor=executor,
+                                  compliance='strict'))
+
+
+def iter_phenopackets(
+        dir_path: Union[str, Path],
+        recursive: bool = False,
+        workers: int = 1,
+        executor: Literal['thread', 'process'] = 'thread',
+        batch_size: int = 100,
+        compliance: Literal['strict', 'lenient'] = 'lenient',
+        errors: Optional[List[Tuple[Path, str]]] = None,
+) -> Iterator[Phenopacket]:
+    """Reads Phenopackets one at a time from the JSON files in a directory
+
+    The directory is scanned lazily with `os.scandir`, so neither the list of files nor the Phenopackets are held in
+    memory as a whole. Files ending in `.json`, `.json.gz` and `.json.zst` are read, as written by `write`. With
+    `workers` greater than 1, batches of files are parsed in a pool of threads or processes, and the Phenopackets are
+    yielded in the order of the scan.
+
+    >>> for phenopacket in iter_phenopackets("out", recursive=True, workers=4):  # doctest: +SKIP
+    ...     print(phenopacket.id)
+
+    :param dir_path: The directory containing JSON files.
+    :param recursive: Whether to read the JSON files in subdirectories too, e.g. those written with `shard_depth`
+    :param workers: Number of threads or processes parsing the files
+    :param executor: 'thread' or 'process', the kind of pool used if `workers` is greater than 1
+    :param batch_size: Number of files parsed per task of the pool
+    :param compliance: 'strict' to raise a `ValueError` on a file that cannot be read, 'lenient' to warn and skip it
+    :param errors: If given, the path and error message of each skipped file is appended to this list
+    :return: An iterator over the Phenopackets
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be a positive integer, not {workers}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be a positive integer, not {batch_size}")
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"Executor {executor} is not valid, use 'thread' or 'process'")
+    if compliance not in ('strict', 'lenient'):
+        raise ValueError(f"Compliance {compliance} is not valid, use 'strict' or 'lenient'")
+
+    paths = _scan_phenopacket_files(dir_path, recursive)
+    if workers == 1:
+        results = (_read_phenopacket_file(path) for path in paths)
+    else:
+        results = _read_phenopacket_files_in_pool(paths, workers, executor, batch_size)
+
+    for path, phenopacket, error in results:
+        if error is None:
+            yield phenopacket
+            continue
+        msg = f"Could not read phenopacket from {path}: {error}"
+        if compliance == 'strict':
+            raise ValueError(msg)
+        warnings.warn(msg)
+        if errors is not None:
+            errors.append((path, error))
+
+
+_PHENOPACKET_FILE_SUFFIXES = {'.json': None, '.json.gz': 'gzip', '.json.zst': 'zstd'}
+
+
+def _scan_phenopacket_files(dir_path: Union[str, Path], recursive: bool) -> Iterator[Path]:
+    """Yields the paths of the JSON files in a directory, descending into subdirectories if `recursive`"""
+    stack = [dir_path]
+    while stack:
+        subdirs = []
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(('.json', '.json.gz', '.json.zst')):
+                    yield Path(entry.path)
+                elif recursive and entry.is_dir():
+                    subdirs.append(entry.path)
+        stack.extend(reversed(subdirs))
+
+
+def _read_phenopacket_file(path: Path) -> Tuple[Path, Optional[Phenopacket], Optional[str]]:
+    """Reads a Phenopacket from a JSON file, possibly compressed, catching the error if it cannot be read
+
+    :return: The path, and either the Phenopacket or the error message
+    """
+    compression = next(c for suffix, c in _PHENOPACKET_FILE_SUFFIXES.items() if path.name.endswith(suffix))
+    try:
+        with _open_decompressed(path, compression) as fh:
+            phenopacket = Phenopacket()
+            Parse(fh.read(), phenopacket)
+            return path, phenopacket, None
+    except ImportError:
+        raise
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def _read_phenopacket_batch(paths: List[Path]) -> List[Tuple[Path, Optional[Phenopacket], Optional[str]]]:
+    return [_read_phenopacket_file(path) for path in paths]
+
+
+def _read_phenopacket_files_in_pool(
+        paths: Iterator[Path],
+        workers: int,
+        executor: Literal['thread', 'process'],
+        batch_size: int,
+) -> Iterator[Tuple[Path, Optional[Phenopacket], Optional[str]]]:
+    """Reads batches of files in a pool of workers, keeping the order of `paths`"""
+    pool_type = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+    with pool_type(max_workers=workers) as pool:
+        window = deque()
+        while batch := list(islice(paths, batch_size)):
+            if len(window) >= 2 * workers:  # bound the number of batches held in memory
+                yield from window.popleft().result()
+            window.append(pool.submit(_read_phenopacket_batch, batch))
+        while window:
+            yield from window.popleft().result()
 
 
 def read_phenopacket_from_json(file_path: Union[str, Path]) -> Phenopacket:
@@ -241,3 +573,59 @@ def read_phenopacket_from_json(file_path: Union[str, Path]) -> Phenopacket:
         phenopacket = Phenopacket()
         Parse(json_data, phenopacket)
         return phenopacket
+
+
+def iter_phenopackets_from_binary(
+        path: Union[str, Path],
+        compression: Optional[Literal['infer', 'gzip', 'zstd']] = 'infer',
+) -> Iterator[Phenopacket]:
+    """Reads Phenopackets one at a time from a binary file written by `write(..., file_format='binary')`
+
+    Each record of the file is the protobuf binary encoding of a Phenopacket, prefixed with its length as a varint. The
+    file is read as a stream, so only one Phenopacket is held in memory at a time.
+
+    :param path: The path to the binary file.
+    :param compression: `None`, 'gzip' or 'zstd', or 'infer' to choose it from the suffix of the file (`.gz`, `.zst`)
+    :return: An iterator over the Phenopackets, in the order they were written
+    """
+    path = Path(path)
+    if compression == 'infer':
+        compression = {'.gz': 'gzip', '.zst': 'zstd'}.get(path.suffix)
+
+    with _open_decompressed(path, compression) as fh:
+        while (length := read_varint(fh)) is not None:
+            data = fh.read(length)
+            if len(data) != length:
+                raise ValueError(f"Truncated record in {path}: expected {length} bytes, got {len(data)}")
+            phenopacket = Phenopacket()
+            phenopacket.ParseFromString(data)
+            yield phenopacket
+
+
+def read_phenopackets_from_binary(
+        path: Union[str, Path],
+        compression: Optional[Literal['infer', 'gzip', 'zstd']] = 'infer',
+) -> List[Phenopacket]:
+    """Reads a list of Phenopackets from a binary file written by `write(..., file_format='binary')`
+
+    :param path: The path to the binary file.
+    :param compression: `None`, 'gzip' or 'zstd', or 'infer' to choose it from the suffix of the file (`.gz`, `.zst`)
+    :return: The list of loaded Phenopackets.
+    """
+    return list(iter_phenopackets_from_binary(path, compression))
+
+
+def _open_decompressed(path: Union[str, Path], compression: Optional[Literal['gzip', 'zstd']]) -> BinaryIO:
+    """Opens a file for reading bytes, decompressing them with `compression`"""
+    if compression is None:
+        return open(path, 'rb')
+    elif compression == 'gzip':
+        return gzip.open(path, 'rb')
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Compression 'zstd' requires the zstandard package, install it with "
+                              "`pip install phenopacket-mapper[zstd]`") from e
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    raise ValueError(f"Compression {compression} is not valid, use None, 'gzip' or 'zstd'")
@@ -1,36 +1,348 @@
+import gzip
+import hashlib
+import io
 import os
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import List, Union
+from time import perf_counter
+from typing import Union, Iterable, Literal, List, Iterator, Optional, Tuple, BinaryIO
 
-from google.protobuf.json_format import MessageToJson
 from phenopackets.schema.v2 import Phenopacket
 
+from phenopacket_mapper.pipeline.serializers import to_json, Serializer
+from phenopacket_mapper.pipeline.term_index import TermIndex
+from phenopacket_mapper.utils import encode_varint
+
+
+@dataclass(slots=True, frozen=True)
+class WriteReport:
+    """Summary of a call to `write`
+
+    :ivar out_dir: The output directory
+    :ivar files: Number of phenopackets written, i.e. files, lines of an NDJSON file or members of an archive
+    :ivar seconds: Time spent writing, including serialization
+    :ivar path: The path of the NDJSON file or archive, `None` if one file was written per phenopacket
+    """
+    out_dir: Path
+    files: int
+    seconds: float
+    path: Optional[Path] = None
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds > 0 else float('inf')
+
+    def __str__(self):
+        return (f"Wrote {self.files} phenopackets to {self.path or self.out_dir} in {self.seconds:.2f} s "
+                f"({self.files_per_second:.0f} files/s)")
+
+
+FileFormat = Literal['json', 'ndjson', 'zip', 'tar', 'binary']
+Compression = Optional[Literal['gzip', 'zstd']]
+
+_COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+_BULK_FILE_EXTENSIONS = {'ndjson': 'ndjson', 'zip': 'zip', 'tar': 'tar', 'binary': 'pb'}
+
 
 def write(
-        phenopackets_list: List[Phenopacket], out_dir: Union[str, Path]
-):
+        phenopackets_list: Iterable[Phenopacket],
+        out_dir: Union[str, Path],
+        workers: int = 1,
+        executor: Literal['thread', 'process'] = 'thread',
+        shard_depth: int = 0,
+        batch_size: int = 100,
+        file_format: FileFormat = 'json',
+        compression: Compression = None,
+        file_name: Optional[str] = None,
+        serializer: Serializer = 'protobuf',
+        term_index: Optional[TermIndex] = None,
+) -> WriteReport:
     """Writes a list of phenopackets to JSON files.
 
-    :param phenopackets_list: The list of phenopackets.
+    By default, one JSON file is written per phenopacket. The bulk formats write the whole cohort as one sequential
+    stream into a single file `out_dir/file_name`:
+    - 'ndjson': newline-delimited JSON, one compact phenopacket per line
+    - 'zip': a zip archive with one JSON file per phenopacket
+    - 'tar': a tar archive with one JSON file per phenopacket
+    - 'binary': the protobuf binary encoding of each phenopacket (`SerializeToString`), prefixed with its length as a
+        varint, see `read_phenopackets_from_binary`
+
+    The output can be compressed with 'gzip' or 'zstd' (the latter requires the `zstandard` package, install it with
+    `pip install phenopacket-mapper[zstd]`). For the 'json' format each file is compressed, for 'ndjson', 'tar' and
+    'binary' the whole stream, and zip archives are deflated for 'gzip' (zip archives do not support 'zstd').
+
+    The phenopackets are written one at a time, so they can be passed as a generator, e.g. from
+    `PhenopacketMapper.imap`, without holding all of them in memory.
+
+    With `workers` greater than 1, batches of `batch_size` phenopackets are serialized and written in a pool of threads
+    or processes. Only a few batches are submitted ahead of the pool, so a generator is still consumed lazily.
+
+    With `shard_depth` greater than 0, the files are spread over nested subdirectories named after the SHA-1 hash of the
+    phenopacket id, two hex digits per level, e.g. `out_dir/3f/<id>.json` for `shard_depth=1`. Each level splits the
+    files over 256 directories, so that no directory holds too many files. In zip and tar archives, the members are
+    named accordingly.
+
+    For the bulk formats, the phenopackets are serialized by the pool of workers, but written in order by the calling
+    thread.
+
+    :param phenopackets_list: The list (or any iterable) of phenopackets.
     :param out_dir: The output directory.
+    :param workers: Number of threads or processes that serialize and write the files
+    :param executor: Whether to use a pool of threads or processes, if `workers` is greater than 1
+    :param shard_depth: Number of levels of hashed subdirectories, 0 to write all files into `out_dir`
+    :param batch_size: Number of phenopackets passed to a worker at a time
+    :param file_format: 'json' for one file per phenopacket, or one of the bulk formats 'ndjson', 'zip', 'tar' and
+                        'binary'
+    :param compression: `None`, 'gzip' or 'zstd'
+    :param file_name: Name of the file of a bulk format, defaults to `phenopackets.<extension>` (`.pb` for 'binary')
+                        plus the suffix of the compression
+    :param serializer: 'protobuf' to serialize JSON with `MessageToJson`, 'fast' for compact JSON with the same content,
+                        see `pipeline.serializers`
+    :param term_index: A `TermIndex` that each phenopacket is added to as it is written
+    :return: A `WriteReport` with the number of files written and the throughput
     """
+    if workers < 1:
+        raise ValueError(f"workers must be a positive integer, not {workers}")
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"Executor {executor} is not valid, use 'thread' or 'process'")
+    if shard_depth < 0:
+        raise ValueError(f"shard_depth must not be negative, not {shard_depth}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be a positive integer, not {batch_size}")
+    if file_format not in ('json', 'ndjson', 'zip', 'tar', 'binary'):
+        raise ValueError(f"File format {file_format} is not valid, use 'json', 'ndjson', 'zip', 'tar' or 'binary'")
+    if serializer not in ('protobuf', 'fast'):
+        raise ValueError(f"Serializer {serializer} is not valid, use 'protobuf' or 'fast'")
+    if compression not in _COMPRESSION_SUFFIXES:
+        raise ValueError(f"Compression {compression} is not valid, use None, 'gzip' or 'zstd'")
+    if file_format == 'zip' and compression == 'zstd':
+        raise ValueError("Zip archives do not support 'zstd' compression, use 'gzip' or the 'tar' format")
+
+    if term_index is not None:
+        phenopackets_list = _add_to_term_index(phenopackets_list, term_index)
+
     # Make sure output out_dr exists.
     os.makedirs(out_dir, exist_ok=True)
 
+    start = perf_counter()
+    if file_format != 'json':
+        if file_name is None:
+            file_name = f"phenopackets.{_BULK_FILE_EXTENSIONS[file_format]}"
+            if file_format != 'zip':
+                file_name += _COMPRESSION_SUFFIXES[compression]
+        path = Path(out_dir) / file_name
+        if file_format == 'binary':
+            encoding = 'binary'
+        elif serializer == 'fast':
+            encoding = 'fast_json'
+        else:
+            encoding = 'compact_json' if file_format == 'ndjson' else 'json'
+        serialized = _serialize(phenopackets_list, encoding=encoding, workers=workers, executor=executor,
+                                batch_size=batch_size)
+        files = _write_bulk(serialized, path, file_format, compression, shard_depth)
+        return WriteReport(out_dir=Path(out_dir), files=files, seconds=perf_counter() - start, path=path)
+    elif workers == 1:
+        files = _write_batch(phenopackets_list, out_dir, shard_depth, compression, serializer)
+    else:
+        files = 0
+        pool_type = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+        with pool_type(max_workers=workers) as pool:
+            pending = set()
+            for batch in _batches(phenopackets_list, batch_size):
+                if len(pending) >= 2 * workers:  # bound the number of batches held in memory
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    files += sum(f.result() for f in done)
+                pending.add(pool.submit(_write_batch, batch, out_dir, shard_depth, compression, serializer))
+            files += sum(f.result() for f in pending)
+
+    return WriteReport(out_dir=Path(out_dir), files=files, seconds=perf_counter() - start)
+
+
+def shard_path(phenopacket_id: str, shard_depth: int) -> str:
+    """Returns the relative path of the hashed subdirectory for a phenopacket id
+
+    >>> shard_path("patient_1", 2)
+    '8b/e8'
+    >>> shard_path("patient_1", 0)
+    ''
+
+    :param phenopacket_id: The id of the phenopacket
+    :param shard_depth: Number of levels of subdirectories
+    :return: The relative path of the subdirectory, two hex digits of the SHA-1 hash of the id per level
+    """
+    digest = hashlib.sha1(phenopacket_id.encode('utf-8')).hexdigest()
+    return '/'.join(digest[2 * i:2 * i + 2] for i in range(shard_depth))
+
+
+def _batches(phenopackets_list: Iterable[Phenopacket], batch_size: int) -> Iterator[List[Phenopacket]]:
+    iterator = iter(phenopackets_list)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def _add_to_term_index(phenopackets_list: Iterable[Phenopacket], term_index: TermIndex) -> Iterator[Phenopacket]:
+    for phenopacket in phenopackets_list:
+        term_index.add(phenopacket)
+        yield phenopacket
+
+
+Encoding = Literal['json', 'compact_json', 'fast_json', 'binary']
+
+
+def _serialize_batch(phenopackets_list: List[Phenopacket], encoding: Encoding) -> List[Tuple[str, Union[str, bytes]]]:
+    return [(phenopacket.id, _encode(phenopacket, encoding)) for phenopacket in phenopackets_list]
+
+
+def _encode(phenopacket: Phenopacket, encoding: Encoding) -> Union[str, bytes]:
+    if encoding == 'binary':
+        return phenopacket.SerializeToString()
+    elif encoding == 'fast_json':
+        return to_json(phenopacket, serializer='fast')
+    return to_json(phenopacket, serializer='protobuf', compact=encoding == 'compact_json')
+
+
+def _serialize(
+        phenopackets_list: Iterable[Phenopacket],
+        encoding: Encoding,
+        workers: int,
+        executor: Literal['thread', 'process'],
+        batch_size: int,
+) -> Iterator[Tuple[str, Union[str, bytes]]]:
+    """Serializes phenopackets, in a pool of workers if `workers` is greater than 1, keeping their order
+
+    :return: An iterator over the id and serialization of each phenopacket
+    """
+    if workers == 1:
+        for phenopacket in phenopackets_list:
+            yield phenopacket.id, _encode(phenopacket, encoding)
+        return
+
+    pool_type = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+    with pool_type(max_workers=workers) as pool:
+        window = deque()
+        for batch in _batches(phenopackets_list, batch_size):
+            if len(window) >= 2 * workers:  # bound the number of batches held in memory
+                yield from window.popleft().result()
+            window.append(pool.submit(_serialize_batch, batch, encoding))
+        while window:
+            yield from window.popleft().result()
+
+
+def _open_compressed(path: Union[str, Path], compression: Compression) -> BinaryIO:
+    """Opens a file for writing bytes, compressing them with `compression`"""
+    if compression is None:
+        return open(path, 'wb')
+    elif compression == 'gzip':
+        return gzip.open(path, 'wb')
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Compression 'zstd' requires the zstandard package, install it with "
+                              "`pip install phenopacket-mapper[zstd]`") from e
+        return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+    raise ValueError(f"Compression {compression} is not valid, use None, 'gzip' or 'zstd'")
+
+
+def _write_bulk(
+        serialized: Iterable[Tuple[str, Union[str, bytes]]],
+        path: Path,
+        file_format: FileFormat,
+        compression: Compression,
+        shard_depth: int,
+) -> int:
+    """Writes serialized phenopackets as one stream into an NDJSON file, an archive or a binary file
+
+    :return: The number of phenopackets written
+    """
+    def member_name(phenopacket_id: str) -> str:
+        name = phenopacket_id + '.json'
+        return f"{shard_path(phenopacket_id, shard_depth)}/{name}" if shard_depth > 0 else name
+
+    files = 0
+    if file_format == 'ndjson':
+        with _open_compressed(path, compression) as fh:
+            for _, json_str in serialized:
+                fh.write(json_str.encode('utf-8'))
+                fh.write(b'\n')
+                files += 1
+    elif file_format == 'binary':
+        with _open_compressed(path, compression) as fh:
+            for _, data in serialized:
+                fh.write(encode_varint(len(data)))
+                fh.write(data)
+                files += 1
+    elif file_format == 'zip':
+        zip_compression = zipfile.ZIP_DEFLATED if compression == 'gzip' else zipfile.ZIP_STORED
+        with zipfile.ZipFile(path, 'w', compression=zip_compression) as zf:
+            for phenopacket_id, json_str in serialized:
+                zf.writestr(member_name(phenopacket_id), json_str)
+                files += 1
+    elif file_format == 'tar':
+        mtime = time.time()
+        with _open_compressed(path, compression) as fh, tarfile.open(fileobj=fh, mode='w|') as tf:
+            for phenopacket_id, json_str in serialized:
+                data = json_str.encode('utf-8')
+                info = tarfile.TarInfo(member_name(phenopacket_id))
+                info.size = len(data)
+                info.mtime = mtime
+                tf.addfile(info, io.BytesIO(data))
+                files += 1
+    else:
+        raise ValueError(f"File format {file_format} is not a bulk format, use 'ndjson', 'zip', 'tar' or 'binary'")
+    return files
+
+
+def _write_batch(
+        phenopackets_list: Iterable[Phenopacket],
+        out_dir: Union[str, Path],
+        shard_depth: int,
+        compression: Compression = None,
+        serializer: Serializer = 'protobuf',
+) -> int:
+    """Writes phenopackets to JSON files, creating the hashed subdirectories as needed
+
+    :return: The number of files written
+    """
+    files = 0
+    created_dirs = set()
     for phenopacket in phenopackets_list:
-        _write_single_phenopacket(phenopacket, out_dir)
+        phenopacket_dir = out_dir
+        if shard_depth > 0:
+            phenopacket_dir = os.path.join(out_dir, shard_path(phenopacket.id, shard_depth))
+            if phenopacket_dir not in created_dirs:
+                os.makedirs(phenopacket_dir, exist_ok=True)
+                created_dirs.add(phenopacket_dir)
+        _write_single_phenopacket(phenopacket, phenopacket_dir, compression, serializer)
+        files += 1
+    return files
 
 
 def _write_single_phenopacket(
         phenopacket: Phenopacket,
-        out_dir: Union[str, Path]
+        out_dir: Union[str, Path],
+        compression: Compression = None,
+        serializer: Serializer = 'protobuf',
 ):
     """Writes a phenopacket to a JSON file.
 
     :param phenopacket: The phenopacket.
     :param out_dir: The output directory.
+    :param compression: `None`, 'gzip' or 'zstd', adds the suffix of the compression to the file name
+    :param serializer: 'protobuf' or 'fast', see `pipeline.serializers`
     """
-    json_str = MessageToJson(phenopacket)  # Convert phenopacket to JSON string.
-    out_path = os.path.join(out_dir, (phenopacket.id + '.json'))
-    with open(out_path, 'w') as fh:
-        fh.write(json_str)
+    json_str = to_json(phenopacket, serializer=serializer)  # Convert phenopacket to JSON string.
+    if compression is None:
+        out_path = os.path.join(out_dir, (phenopacket.id + '.json'))
+        with open(out_path, 'w') as fh:
+            fh.write(json_str)
+    else:
+        out_path = os.path.join(out_dir, (phenopacket.id + '.json' + _COMPRESSION_SUFFIXES[compression]))
+        with _open_compressed(out_path, compression) as fh:
+            fh.write(json_str.encode('utf-8'))
@@ -0,0 +1,153 @@
+"""
+This module serializes phenopackets to JSON.
+
+The 'protobuf' serializer is `MessageToJson` from protobuf, which produces pretty-printed JSON. The 'fast' serializer
+produces compact JSON with the same content: it converts messages to dictionaries with emitters compiled once per
+message type from its descriptor, and encodes them with `orjson` if it is installed, otherwise with the standard
+library `json` module. Message types the emitters do not cover (e.g. maps, `float` fields, `Any` or `Struct`) are
+converted by `MessageToDict`, so the result always follows the Proto3 JSON mapping.
+"""
+
+import base64
+import json
+import math
+from typing import Literal, Dict, Any, Callable, Tuple
+
+from google.protobuf.descriptor import FieldDescriptor, Descriptor
+from google.protobuf.json_format import MessageToJson, MessageToDict
+from google.protobuf.message import Message
+
+from phenopacket_mapper.utils import is_repeated
+
+Serializer = Literal['protobuf', 'fast']
+
+_TIMESTAMP_TYPES = ('google.protobuf.Timestamp', 'google.protobuf.Duration')
+
+_emitters: Dict[str, Callable[[Message], Dict[str, Any]]] = {}
+
+
+def to_json(message: Message, serializer: Serializer = 'protobuf', compact: bool = False) -> str:
+    """Serializes a message, e.g. a `Phenopacket`, to JSON
+
+    >>> from phenopackets.schema.v2 import Phenopacket, Individual
+    >>> to_json(Phenopacket(id="p0", subject=Individual(id="p0", sex="MALE")), serializer='fast')
+    '{"id":"p0","subject":{"id":"p0","sex":"MALE"}}'
+
+    :param message: The message to serialize
+    :param serializer: 'protobuf' for `MessageToJson`, 'fast' for compact JSON from compiled emitters
+    :param compact: Whether the 'protobuf' serializer should omit the indentation, the 'fast' serializer is always
+                    compact
+    :return: The JSON string
+    """
+    if serializer == 'fast':
+        return dumps(message_to_dict(message))
+    elif serializer == 'protobuf':
+        return MessageToJson(message, indent=None) if compact else MessageToJson(message)
+    raise ValueError(f"Serializer {serializer} is not valid, use 'protobuf' or 'fast'")
+
+
+def message_to_dict(message: Message) -> Dict[str, Any]:
+    """Converts a message to a dictionary following the Proto3 JSON mapping, like `MessageToDict`
+
+    :param message: The message to convert
+    :return: The dictionary, with the JSON names of the fields as keys
+    """
+    emitter = _emitters.get(message.DESCRIPTOR.full_name)
+    if emitter is None:
+        emitter = _compile_emitter(message.DESCRIPTOR)
+    return emitter(message)
+
+
+try:
+    import orjson
+
+    def dumps(obj: Any) -> str:
+        """Encodes an object as compact JSON"""
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    def dumps(obj: Any) -> str:
+        """Encodes an object as compact JSON"""
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+def _compile_emitter(descriptor: Descriptor) -> Callable[[Message], Dict[str, Any]]:
+    """Compiles the emitter for a message type, and those of its message fields, from its descriptor"""
+    if not _is_supported(descriptor):
+        _emitters[descriptor.full_name] = MessageToDict
+        return MessageToDict
+
+    handlers: Dict[int, Tuple[str, Callable[[Any], Any], bool]] = {}
+
+    def emit(message: Message) -> Dict[str, Any]:
+        js = {}
+        for f, value in message.ListFields():
+            handler = handlers.get(f.number)
+            if handler is None or f.is_extension:
+                return MessageToDict(message)
+            name, convert, repeated = handler
+            js[name] = [convert(v) for v in value] if repeated else convert(value)
+        return js
+
+    # registered before the fields are compiled, so that recursive message types refer to this emitter
+    _emitters[descriptor.full_name] = emit
+    for f in descriptor.fields:
+        handlers[f.number] = (f.json_name, _field_converter(f), is_repeated(f))
+    return emit
+
+
+def _is_supported(descriptor: Descriptor) -> bool:
+    if descriptor.full_name.startswith('google.protobuf.'):  # well known types have their own JSON representation
+        return False
+    for f in descriptor.fields:
+        if f.cpp_type == FieldDescriptor.CPPTYPE_FLOAT:
+            return False
+        if f.message_type is not None and f.message_type.GetOptions().map_entry:
+            return False
+        # older versions of protobuf lack `is_closed`, the enums of the phenopacket schema are open (proto3) anyway
+        if f.enum_type is not None and (getattr(f.enum_type, 'is_closed', False)
+                                        or f.enum_type.full_name == 'google.protobuf.NullValue'):
+            return False
+    return True
+
+
+def _field_converter(f: FieldDescriptor) -> Callable[[Any], Any]:
+    """Returns the function converting a value of a field to its JSON representation"""
+    if f.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+        if f.message_type.full_name in _TIMESTAMP_TYPES:
+            return _to_json_string
+        emitter = _emitters.get(f.message_type.full_name)
+        return emitter if emitter is not None else _compile_emitter(f.message_type)
+    elif f.cpp_type == FieldDescriptor.CPPTYPE_ENUM:
+        names = {v.number: v.name for v in f.enum_type.values}
+        return lambda value: names.get(value, value)
+    elif f.type == FieldDescriptor.TYPE_BYTES:
+        return _bytes_to_base64
+    elif f.cpp_type == FieldDescriptor.CPPTYPE_STRING:
+        return str
+    elif f.cpp_type == FieldDescriptor.CPPTYPE_BOOL:
+        return bool
+    elif f.cpp_type in (FieldDescriptor.CPPTYPE_INT64, FieldDescriptor.CPPTYPE_UINT64):
+        return str
+    elif f.cpp_type == FieldDescriptor.CPPTYPE_DOUBLE:
+        return _double
+    return _identity
+
+
+def _to_json_string(value: Message) -> str:
+    return value.ToJsonString()
+
+
+def _bytes_to_base64(value: bytes) -> str:
+    return base64.b64encode(value).decode('utf-8')
+
+
+def _double(value: float) -> Any:
+    if math.isinf(value):
+        return '-Infinity' if value < 0.0 else 'Infinity'
+    if math.isnan(value):
+        return 'NaN'
+    return value
+
+
+def _identity(value: Any) -> Any:
+    return value
@@ -0,0 +1,314 @@
+"""
+This module provides random access by id to phenopackets in NDJSON and binary files written by `write`.
+
+The `PhenopacketStore` keeps an SQLite index from the id of each phenopacket to the file, byte offset and length of its
+record. The data files are memory-mapped, so fetching a phenopacket reads and decodes only its own record. Indexing is
+incremental: the index remembers how many bytes of each file it has read, and on `update` reads only what was
+appended since. Files that were rewritten rather than appended to, e.g. by running `write` into the same file again,
+are recognized by a fingerprint of their first and last indexed bytes and indexed again from the start.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+from pathlib import Path
+from typing import Union, Iterable, Iterator, Optional, Literal, Dict, Tuple, List
+
+from google.protobuf.json_format import Parse
+from phenopackets.schema.v2 import Phenopacket
+
+from phenopacket_mapper.utils import decode_varint
+
+StoreFileFormat = Literal['ndjson', 'binary']
+
+_SUFFIX_FORMATS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.pb': 'binary'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    format TEXT NOT NULL,
+    indexed_bytes INTEGER NOT NULL,
+    inode INTEGER NOT NULL DEFAULT 0,
+    mtime_ns INTEGER NOT NULL DEFAULT 0,
+    fingerprint TEXT NOT NULL DEFAULT '',
+    overrides INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS records (
+    id TEXT PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(file_id),
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+"""
+
+# bytes at the start and at the end of the indexed part of a file that its fingerprint is computed from
+_FINGERPRINT_BYTES = 4096
+
+
+class PhenopacketStore:
+    """Random access by id to the phenopackets in NDJSON and binary files
+
+    ```python
+    report = write(phenopackets, out_dir, file_format='binary')
+    with PhenopacketStore(out_dir / "index.sqlite", [report.path]) as store:
+        phenopacket = store["patient42"]
+    ```
+
+    The files must not be compressed, so that they can be memory-mapped. If an id occurs more than once, the record
+    indexed last is returned. When a file that has replaced records of other files is deleted or rewritten, all files
+    are indexed again, so that its ids fall back to the records of the other files.
+    """
+
+    def __init__(self, index_path: Union[str, Path], paths: Optional[Iterable[Union[str, Path]]] = None):
+        """Opens the index, creating it if it does not exist, and indexes `paths`
+
+        :param index_path: The path of the SQLite index
+        :param paths: NDJSON (`.ndjson`, `.jsonl`) or binary (`.pb`) files to add to the index
+        """
+        self.index_path = Path(index_path)
+        self._connection = sqlite3.connect(self.index_path)
+        self._connection.executescript(_SCHEMA)
+        if 'overrides' not in {row[1] for row in self._connection.execute("PRAGMA table_info(files)")}:
+            # indexes created before files were fingerprinted, their files are indexed again on the next update
+            with self._connection:
+                for column in ("inode INTEGER NOT NULL DEFAULT 0", "mtime_ns INTEGER NOT NULL DEFAULT 0",
+                               "fingerprint TEXT NOT NULL DEFAULT ''", "overrides INTEGER NOT NULL DEFAULT 0"):
+                    self._connection.execute(f"ALTER TABLE files ADD COLUMN {column}")
+        self._maps: Dict[int, Tuple[mmap.mmap, str]] = {}
+        if paths is not None:
+            try:
+                self.update(paths)
+            except Exception:
+                self.close()
+                raise
+
+    def update(self, paths: Optional[Iterable[Union[str, Path]]] = None) -> int:
+        """Adds new files to the index and indexes the records appended to the files indexed before
+
+        A file is indexed again from the start if it has been rewritten since it was indexed, i.e. if it has shrunk, was
+        replaced by another file, or the fingerprint of its first and last indexed bytes has changed. Files that have
+        been deleted are removed from the index with their records. If a deleted or rewritten file had replaced records
+        of other files with the same ids, all files are indexed again, so that these ids are found in the other files.
+        The records of unchanged files that are indexed again are not counted.
+
+        :param paths: Files to add to the index, the files already in the index are always updated
+        :return: The number of records indexed
+        :raises FileNotFoundError: If a file in `paths` does not exist
+        :raises ValueError: If a record of an NDJSON file is not a JSON object with an id
+        """
+        files = {row[1]: row for row in self._connection.execute(
+            "SELECT file_id, path, format, indexed_bytes, inode, mtime_ns, fingerprint, overrides FROM files "
+            "ORDER BY file_id")}
+        for path in paths or []:
+            path = str(Path(path).resolve())
+            if path not in files:
+                file_format = _file_format(path)
+                if not os.path.isfile(path):
+                    raise FileNotFoundError(f"No such file: '{path}'")
+                with self._connection:
+                    cursor = self._connection.execute(
+                        "INSERT INTO files (path, format, indexed_bytes) VALUES (?, ?, 0)", (path, file_format))
+                files[path] = (cursor.lastrowid, path, file_format, 0, 0, 0, '', 0)
+
+        # the position each file is indexed from, None if it has not changed
+        starts: Dict[str, Optional[int]] = {}
+        deleted: List[int] = []
+        reindex_all = False
+        for path, (file_id, _, _, indexed_bytes, inode, mtime_ns, fingerprint, overrides) in files.items():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                deleted.append(file_id)
+                reindex_all = reindex_all or bool(overrides)
+                continue
+            if (stat.st_size, stat.st_ino, stat.st_mtime_ns) == (indexed_bytes, inode, mtime_ns):
+                starts[path] = None
+            elif (stat.st_ino == inode and stat.st_size >= indexed_bytes
+                  and _fingerprint_file(path, indexed_bytes) == fingerprint):
+                starts[path] = indexed_bytes
+            else:
+                starts[path] = 0
+                reindex_all = reindex_all or bool(overrides)
+        # the ids that the file had replaced are restored by indexing the other files again
+        changed = {path for path, start in starts.items() if start is not None}
+        if reindex_all:
+            starts = dict.fromkeys(starts, 0)
+
+        for file_id in deleted:
+            self._close_map(file_id)
+            with self._connection:
+                self._connection.execute("DELETE FROM records WHERE file_id = ?", (file_id,))
+                self._connection.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+
+        indexed = 0
+        for path, start in starts.items():
+            if start is None:
+                continue
+            file_id, _, file_format, indexed_bytes = files[path][:4]
+            overrides = files[path][7] if start > 0 else 0
+            self._close_map(file_id)
+            with self._connection:
+                if start == 0 and indexed_bytes > 0:
+                    self._connection.execute("DELETE FROM records WHERE file_id = ?", (file_id,))
+                records, indexed_bytes, fingerprint, stat = _index_file(path, file_format, start)
+                count = len(self)
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO records (id, file_id, offset, length) VALUES (?, ?, ?, ?)",
+                    ((phenopacket_id, file_id, offset, length) for phenopacket_id, offset, length in records))
+                # records with ids that were already indexed have been replaced
+                overrides = int(overrides or len(self) < count + len(records))
+                self._connection.execute(
+                    "UPDATE files SET indexed_bytes = ?, inode = ?, mtime_ns = ?, fingerprint = ?, overrides = ? "
+                    "WHERE file_id = ?",
+                    (indexed_bytes, stat.st_ino, stat.st_mtime_ns, fingerprint, overrides, file_id))
+            if path in changed:
+                indexed += len(records)
+        return indexed
+
+    def get(self, phenopacket_id: str, default: Optional[Phenopacket] = None) -> Optional[Phenopacket]:
+        """Returns the phenopacket with the id `phenopacket_id`, or `default` if it is not in the store"""
+        row = self._connection.execute("SELECT file_id, offset, length FROM records WHERE id = ?",
+                                       (phenopacket_id,)).fetchone()
+        if row is None:
+            return default
+        return self._read(*row)
+
+    def __getitem__(self, phenopacket_id: str) -> Phenopacket:
+        phenopacket = self.get(phenopacket_id)
+        if phenopacket is None:
+            raise KeyError(phenopacket_id)
+        return phenopacket
+
+    def __contains__(self, phenopacket_id: str) -> bool:
+        return self._connection.execute("SELECT 1 FROM records WHERE id = ?", (phenopacket_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over the ids in the store, in the order of the files and records"""
+        cursor = self._connection.execute("SELECT id FROM records ORDER BY file_id, offset")
+        return (phenopacket_id for phenopacket_id, in cursor)
+
+    def ids(self) -> List[str]:
+        """Returns the ids of the phenopackets in the store"""
+        return list(self)
+
+    def close(self):
+        """Closes the memory maps of the data files and the index"""
+        for file_id in list(self._maps):
+            self._close_map(file_id)
+        self._connection.close()
+
+    def __enter__(self) -> 'PhenopacketStore':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _read(self, file_id: int, offset: int, length: int) -> Phenopacket:
+        if file_id not in self._maps:
+            path, file_format = self._connection.execute("SELECT path, format FROM files WHERE file_id = ?",
+                                                         (file_id,)).fetchone()
+            with open(path, 'rb') as fh:
+                self._maps[file_id] = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ), file_format
+        data, file_format = self._maps[file_id]
+        record = data[offset:offset + length]
+        phenopacket = Phenopacket()
+        if file_format == 'binary':
+            phenopacket.ParseFromString(record)
+        else:
+            Parse(record.decode('utf-8'), phenopacket)
+        return phenopacket
+
+    def _close_map(self, file_id: int):
+        if file_id in self._maps:
+            self._maps.pop(file_id)[0].close()
+
+
+def _file_format(path: str) -> StoreFileFormat:
+    suffix = Path(path).suffix
+    if suffix in ('.gz', '.zst'):
+        raise ValueError(f"Compressed file {path} cannot be memory-mapped, write it with compression=None")
+    if suffix not in _SUFFIX_FORMATS:
+        raise ValueError(f"Cannot infer the format of {path}, use an NDJSON (.ndjson, .jsonl) or binary (.pb) file")
+    return _SUFFIX_FORMATS[suffix]
+
+
+def _index_file(
+        path: str,
+        file_format: StoreFileFormat,
+        start: int,
+) -> Tuple[List[Tuple[str, int, int]], int, str, os.stat_result]:
+    """Reads the id, offset and length of the records of a file, beginning at `start`
+
+    A record at the end of the file that is not complete yet, e.g. because the file is still being written, is left for
+    the next update.
+
+    :return: The records, the number of bytes of the file indexed, their fingerprint and the status of the file
+    """
+    records = []
+    with open(path, 'rb') as fh:
+        stat = os.fstat(fh.fileno())
+        if stat.st_size == 0:  # empty files cannot be memory-mapped
+            return records, 0, '', stat
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            size = len(data)
+            pos = start
+            if file_format == 'binary':
+                while pos < size:
+                    try:
+                        length, record_start = decode_varint(data, pos)
+                    except ValueError:  # truncated length prefix
+                        break
+                    if record_start + length > size:
+                        break
+                    records.append((_binary_record_id(data, record_start, length), record_start, length))
+                    pos = record_start + length
+            else:
+                while pos < size:
+                    end = data.find(b'\n', pos)
+                    if end == -1:
+                        break
+                    if end > pos:
+                        records.append((_ndjson_record_id(data[pos:end], path, pos), pos, end - pos))
+                    pos = end + 1
+            return records, pos, _fingerprint(data, pos), stat
+
+
+def _ndjson_record_id(record: bytes, path: str, offset: int) -> str:
+    """Reads the id of an NDJSON phenopacket record"""
+    try:
+        phenopacket_id = json.loads(record)['id']
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"The record at byte {offset} of {path} is not a phenopacket with an id") from e
+    return phenopacket_id
+
+
+def _fingerprint(data: mmap.mmap, length: int) -> str:
+    """Hashes the first and last `_FINGERPRINT_BYTES` of the first `length` bytes of a file"""
+    h = hashlib.sha256(data[:min(length, _FINGERPRINT_BYTES)])
+    h.update(data[max(0, length - _FINGERPRINT_BYTES):length])
+    return h.hexdigest()
+
+
+def _fingerprint_file(path: str, length: int) -> str:
+    """Returns the `_fingerprint` of the first `length` bytes of a file, which must have at least that many bytes"""
+    if length == 0:
+        return ''
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return _fingerprint(data, length)
+
+
+def _binary_record_id(data: mmap.mmap, offset: int, length: int) -> str:
+    """Reads the id of a binary phenopacket record, without decoding the rest of it"""
+    # the id is field 1, which protobuf serializes first, as the tag 0x0A followed by the length of the string
+    if length > 0 and data[offset] == 0x0A:
+        id_length, id_start = decode_varint(data, offset + 1)
+        return data[id_start:id_start + id_length].decode('utf-8')
+    phenopacket = Phenopacket()
+    phenopacket.ParseFromString(data[offset:offset + length])
+    return phenopacket.id
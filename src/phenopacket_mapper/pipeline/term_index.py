@@ -0,0 +1,293 @@
+"""
+This module provides an inverted index from ontology terms to the phenopackets they occur in.
+
+The `TermIndex` records the id of every `OntologyClass` in a phenopacket, in phenotypic features, diseases,
+measurements, interpretations and any other field, so that questions like "which patients have HP:0001250 and not
+ORPHA:206638" can be answered without reading the phenopackets again. It is filled while writing:
+
+```python
+term_index = TermIndex()
+write(phenopackets, out_dir, term_index=term_index)
+term_index.save(out_dir / "terms.idx")
+
+term_index = TermIndex.load(out_dir / "terms.idx")
+term_index.query("HP:0001250 AND NOT ORPHA:206638")
+```
+
+The index is saved as varints: each term is followed by the gaps between the numbers of the phenopackets it occurs in,
+which take one or two bytes each for dense postings.
+"""
+
+import bisect
+import re
+from pathlib import Path
+from typing import Dict, List, Iterable, Set, Tuple, Union
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.message import Message
+from phenopackets.schema.v2 import Phenopacket
+
+from phenopacket_mapper.utils import encode_varint, decode_varint, is_repeated
+
+_ONTOLOGY_CLASS = 'org.phenopackets.schema.v2.core.OntologyClass'
+
+_MAGIC = b'PMTI'
+_VERSION = 1
+
+_TOKEN = re.compile(r'\(|\)|[^\s()]+')
+
+
+class TermIndex:
+    """Inverted index from the ids of `OntologyClass` terms to the ids of the phenopackets they occur in
+
+    Phenotypic features and diseases marked as `excluded` are not indexed unless `include_excluded` is set, so that a
+    lookup of a term returns the phenopackets that have it.
+    """
+
+    def __init__(self, include_excluded: bool = False):
+        """
+        :param include_excluded: Whether to index the terms of excluded phenotypic features and diseases
+        """
+        self.include_excluded = include_excluded
+        self._phenopacket_ids: List[str] = []
+        self._numbers: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+
+    def add(self, phenopacket: Phenopacket):
+        """Adds the terms of a phenopacket to the index
+
+        Adding a phenopacket with an id that is already in the index adds its terms to those of the earlier one.
+
+        :param phenopacket: The phenopacket to index
+        """
+        number = self._numbers.get(phenopacket.id)
+        if number is None:
+            number = self._numbers[phenopacket.id] = len(self._phenopacket_ids)
+            self._phenopacket_ids.append(phenopacket.id)
+        for term in ontology_class_ids(phenopacket, self.include_excluded):
+            postings = self._postings.setdefault(term, [])
+            if not postings or postings[-1] < number:
+                postings.append(number)
+            else:
+                i = bisect.bisect_left(postings, number)
+                if i == len(postings) or postings[i] != number:
+                    postings.insert(i, number)
+
+    def update(self, phenopackets_list: Iterable[Phenopacket]):
+        """Adds the terms of each phenopacket to the index"""
+        for phenopacket in phenopackets_list:
+            self.add(phenopacket)
+
+    def lookup(self, term: str) -> List[str]:
+        """Returns the ids of the phenopackets a term occurs in
+
+        :param term: The id of the term, e.g. 'HP:0001250'
+        :return: The ids of the phenopackets, in the order they were indexed
+        """
+        return [self._phenopacket_ids[n] for n in self._postings.get(term, [])]
+
+    def query(self, expression: str) -> List[str]:
+        """Returns the ids of the phenopackets matching a boolean combination of terms
+
+        Terms are combined with `AND`, `OR` and `NOT` (in order of increasing precedence) and parentheses:
+
+        >>> term_index = TermIndex()
+        >>> term_index.update([Phenopacket(id="p0", diseases=[{"term": {"id": "ORPHA:1"}}]),
+        ...                    Phenopacket(id="p1", phenotypic_features=[{"type": {"id": "HP:1"}}])])
+        >>> term_index.query("HP:1 OR ORPHA:1")
+        ['p0', 'p1']
+        >>> term_index.query("NOT (HP:1 AND ORPHA:1)")
+        ['p0', 'p1']
+        >>> term_index.query("NOT ORPHA:1")
+        ['p1']
+
+        :param expression: The query
+        :return: The ids of the matching phenopackets, in the order they were indexed
+        """
+        tokens = _TOKEN.findall(expression)
+        numbers, pos = self._parse_or(tokens, 0)
+        if pos != len(tokens):
+            raise ValueError(f"Unexpected '{tokens[pos]}' at token {pos} of query '{expression}'")
+        return [self._phenopacket_ids[n] for n in sorted(numbers)]
+
+    def terms(self) -> List[str]:
+        """Returns the ids of the terms in the index"""
+        return list(self._postings)
+
+    def count(self, term: str) -> int:
+        """Returns the number of phenopackets a term occurs in"""
+        return len(self._postings.get(term, []))
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._postings
+
+    def __len__(self) -> int:
+        """The number of phenopackets in the index"""
+        return len(self._phenopacket_ids)
+
+    def save(self, path: Union[str, Path]):
+        """Saves the index to a file
+
+        :param path: The path of the file
+        """
+        out = bytearray(_MAGIC)
+        out += encode_varint(_VERSION)
+        out += encode_varint(int(self.include_excluded))
+        out += encode_varint(len(self._phenopacket_ids))
+        for phenopacket_id in self._phenopacket_ids:
+            _append_string(out, phenopacket_id)
+        out += encode_varint(len(self._postings))
+        for term, postings in self._postings.items():
+            _append_string(out, term)
+            out += encode_varint(len(postings))
+            previous = 0
+            for number in postings:
+                out += encode_varint(number - previous)
+                previous = number
+        Path(path).write_bytes(out)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'TermIndex':
+        """Loads an index saved with `save`
+
+        :param path: The path of the file
+        :return: The index
+        """
+        data = Path(path).read_bytes()
+        if not data.startswith(_MAGIC):
+            raise ValueError(f"{path} is not a term index")
+        version, pos = decode_varint(data, len(_MAGIC))
+        if version != _VERSION:
+            raise ValueError(f"Version {version} of term index {path} is not supported")
+        include_excluded, pos = decode_varint(data, pos)
+        term_index = cls(include_excluded=bool(include_excluded))
+
+        n_phenopackets, pos = decode_varint(data, pos)
+        for number in range(n_phenopackets):
+            phenopacket_id, pos = _read_string(data, pos)
+            term_index._phenopacket_ids.append(phenopacket_id)
+            term_index._numbers[phenopacket_id] = number
+
+        n_terms, pos = decode_varint(data, pos)
+        for _ in range(n_terms):
+            term, pos = _read_string(data, pos)
+            n_postings, pos = decode_varint(data, pos)
+            postings = []
+            number = 0
+            for _ in range(n_postings):
+                gap, pos = decode_varint(data, pos)
+                number += gap
+                postings.append(number)
+            term_index._postings[term] = postings
+        return term_index
+
+    def _parse_or(self, tokens: List[str], pos: int) -> Tuple[Set[int], int]:
+        numbers, pos = self._parse_and(tokens, pos)
+        while pos < len(tokens) and tokens[pos] == 'OR':
+            right, pos = self._parse_and(tokens, pos + 1)
+            numbers = numbers | right
+        return numbers, pos
+
+    def _parse_and(self, tokens: List[str], pos: int) -> Tuple[Set[int], int]:
+        numbers, pos = self._parse_not(tokens, pos)
+        while pos < len(tokens) and tokens[pos] == 'AND':
+            right, pos = self._parse_not(tokens, pos + 1)
+            numbers = numbers & right
+        return numbers, pos
+
+    def _parse_not(self, tokens: List[str], pos: int) -> Tuple[Set[int], int]:
+        if pos >= len(tokens):
+            raise ValueError("Query ended where a term was expected")
+        token = tokens[pos]
+        if token == 'NOT':
+            numbers, pos = self._parse_not(tokens, pos + 1)
+            return set(range(len(self._phenopacket_ids))) - numbers, pos
+        elif token == '(':
+            numbers, pos = self._parse_or(tokens, pos + 1)
+            if pos >= len(tokens) or tokens[pos] != ')':
+                raise ValueError("Missing ')' in query")
+            return numbers, pos + 1
+        elif token in ('AND', 'OR', ')'):
+            raise ValueError(f"Unexpected '{token}' at token {pos} of query, expected a term")
+        return set(self._postings.get(token, [])), pos + 1
+
+
+def ontology_class_ids(message: Message, include_excluded: bool = False) -> Set[str]:
+    """Returns the ids of all `OntologyClass` messages within a message
+
+    >>> features = [{"type": {"id": "HP:1"}}, {"type": {"id": "HP:2"}, "excluded": True}]
+    >>> sorted(ontology_class_ids(Phenopacket(id="p0", phenotypic_features=features)))
+    ['HP:1']
+
+    :param message: The message, e.g. a `Phenopacket`
+    :param include_excluded: Whether to include the terms of messages with `excluded` set, e.g. `PhenotypicFeature`
+    :return: The set of term ids
+    """
+    ids = set()
+    _collect_ontology_class_ids(message, include_excluded, ids)
+    return ids
+
+
+_walkers: Dict[str, Tuple[bool, List[Tuple[FieldDescriptor, bool]]]] = {}
+
+
+def _collect_ontology_class_ids(message: Message, include_excluded: bool, ids: Set[str]):
+    if message.DESCRIPTOR.full_name == _ONTOLOGY_CLASS:
+        if message.id:
+            ids.add(message.id)
+        return
+    has_excluded, fields = _walker(message.DESCRIPTOR)
+    if has_excluded and not include_excluded and message.excluded:
+        return
+    for f, repeated in fields:
+        if repeated:
+            for value in getattr(message, f.name):
+                _collect_ontology_class_ids(value, include_excluded, ids)
+        elif message.HasField(f.name):
+            _collect_ontology_class_ids(getattr(message, f.name), include_excluded, ids)
+
+
+def _walker(descriptor: Descriptor) -> Tuple[bool, List[Tuple[FieldDescriptor, bool]]]:
+    """Returns whether a message type has an `excluded` flag, and its fields that can contain an `OntologyClass`"""
+    walker = _walkers.get(descriptor.full_name)
+    if walker is None:
+        reachable = _reaches_ontology_class(descriptor)
+        fields = [(f, is_repeated(f)) for f in descriptor.fields if f.message_type is not None
+                  and not f.message_type.GetOptions().map_entry and reachable.get(f.message_type.full_name, False)]
+        excluded = descriptor.fields_by_name.get('excluded')
+        has_excluded = excluded is not None and excluded.cpp_type == FieldDescriptor.CPPTYPE_BOOL
+        walker = _walkers[descriptor.full_name] = (has_excluded, fields)
+    return walker
+
+
+def _reaches_ontology_class(descriptor: Descriptor) -> Dict[str, bool]:
+    """Returns for `descriptor` and all message types within it whether they are or contain an `OntologyClass`"""
+    types: Dict[str, Descriptor] = {}
+    stack = [descriptor]
+    while stack:
+        d = stack.pop()
+        if d.full_name not in types:
+            types[d.full_name] = d
+            stack.extend(f.message_type for f in d.fields if f.message_type is not None)
+
+    reachable = {name: name == _ONTOLOGY_CLASS for name in types}
+    changed = True
+    while changed:  # until a fixed point, as message types can be recursive
+        changed = False
+        for name, d in types.items():
+            if not reachable[name] and any(reachable[f.message_type.full_name]
+                                           for f in d.fields if f.message_type is not None):
+                reachable[name] = changed = True
+    return reachable
+
+
+def _append_string(out: bytearray, value: str):
+    data = value.encode('utf-8')
+    out += encode_varint(len(data))
+    out += data
+
+
+def _read_string(data: bytes, pos: int) -> Tuple[str, int]:
+    length, pos = decode_varint(data, pos)
+    return data[pos:pos + length].decode('utf-8'), pos + length
+
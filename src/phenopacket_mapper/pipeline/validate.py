@@ -1,59 +1,471 @@
+import hashlib
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import List
+from time import perf_counter
+from typing import List, Iterable, Iterator, Optional, Dict, Tuple, Literal, Union
 
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.message import Message
 from phenopackets.schema.v2 import Phenopacket
 
-from phenopacket_mapper.pipeline import read_phenopackets
+from phenopacket_mapper.pipeline.input import iter_phenopackets
+from phenopacket_mapper.pipeline.validation_cache import ValidationCache
+from phenopacket_mapper.pipeline.validation_rules import Rule, Nodes, DEFAULT_RULES
+from phenopacket_mapper.utils import is_repeated
+
+
+@dataclass(slots=True, frozen=True)
+class ValidationIssue:
+    """A problem found in a phenopacket by a rule of the `Validator`
+
+    :ivar rule: The name of the rule
+    :ivar path: The path of the field with the problem, e.g. `phenotypic_features[0].type.id`
+    :ivar message: The description of the problem
+    """
+    rule: str
+    path: str
+    message: str
+
+    def __str__(self):
+        return f"{self.path}: {self.message} [{self.rule}]"
+
+
+@dataclass(slots=True)
+class ValidationResult:
+    """The result of validating a phenopacket
+
+    :ivar phenopacket_id: The id of the phenopacket
+    :ivar issues: The problems found, empty if the phenopacket is valid
+    """
+    phenopacket_id: str
+    issues: List[ValidationIssue] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return not self.issues
+
+    def to_json(self) -> str:
+        """Serializes the result to JSON, `{"id": <phenopacket id>, "issues": [[<rule>, <path>, <message>], ...]}`"""
+        return json.dumps({'id': self.phenopacket_id, 'issues': [[i.rule, i.path, i.message] for i in self.issues]})
+
+    @staticmethod
+    def from_json(json_str: Union[str, bytes]) -> 'ValidationResult':
+        """Deserializes a result serialized with `to_json`"""
+        js = json.loads(json_str)
+        return ValidationResult(phenopacket_id=js['id'], issues=[
+            ValidationIssue(rule=rule, path=path, message=message) for rule, path, message in js['issues']])
+
+    def __str__(self):
+        if self.valid:
+            return f"{self.phenopacket_id}: valid"
+        return f"{self.phenopacket_id}: {len(self.issues)} issues\n" + "\n".join(f"  {i}" for i in self.issues)
+
+
+@dataclass(slots=True, frozen=True)
+class RuleTiming:
+    """Time spent in a rule of the `Validator`, as measured while validating
+
+    The time spent walking the phenopackets to collect the messages for the rules is reported as the rule '(walk)'.
+
+    :ivar rule: The name of the rule
+    :ivar calls: Number of phenopackets the rule checked
+    :ivar seconds: Total time spent in the rule
+    """
+    rule: str
+    calls: int
+    seconds: float
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def __str__(self):
+        return (f"{self.rule}: {self.calls} calls, {self.seconds:.6f} s "
+                f"({self.mean_seconds * 1e6:.2f} us/call)")
+
+
+_WALK = '(walk)'
+
+# number of phenopackets looked up in and added to the cache at a time
+_CACHE_CHUNK_SIZE = 500
 
 
 class Validator:
     """
-    Internal class, implemented using the singleton pattern, that uses phenopacket-tools to validate phenopackets.
-    This is complicated a bit by the fact that phenopacket-tools is implemented in java. The singleton pattern ensures
-    that only one instance of the class is created for efficiency purposes.
+    Native structural validator of phenopackets against the Phenopacket v2 schema.
+
+    The rules (see `pipeline.validation_rules`) are compiled once, when the validator is created. Each phenopacket is
+    walked once to collect the messages the rules inspect, then each rule checks them. The time spent in each rule is
+    accumulated in `timings`.
+
+    E.g.:
+    ```python
+    validator = Validator()
+    for result in validator.iter_validate(phenopackets, workers=4):
+        if not result.valid:
+            print(result)
+    for timing in validator.timings:
+        print(timing)
+    ```
     """
-    _instance = None
 
-    def __new__(cls, *args, **kwargs):
-        """Singleton pattern to ensure only one instance of the class is created."""
-        if not cls._instance:
-            cls._instance = super(Validator, cls).__new__(cls, *args, **kwargs)
-        return cls._instance
+    def __init__(self, rules: Optional[Iterable[Rule]] = None):
+        """
+        :param rules: The rules to check, defaults to an instance of each rule in `DEFAULT_RULES`
+        """
+        self.rules: Tuple[Rule, ...] = tuple(rules) if rules is not None else tuple(r() for r in DEFAULT_RULES)
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Rule names must be unique, got {names}")
+        self._message_types = frozenset(t for rule in self.rules for t in rule.message_types)
+        self._walkers: Dict[str, List[Tuple[str, bool]]] = {}
+        self._timings: Dict[str, List] = {}
+        self._worker = None
+
+    def __getstate__(self):
+        # the walkers refer to descriptors, they are compiled again when needed
+        return {'rules': self.rules, 'message_types': self._message_types}
+
+    def __setstate__(self, state):
+        self.rules = state['rules']
+        self._message_types = state['message_types']
+        self._walkers = {}
+        self._timings = {}
+        self._worker = None
 
-    def __init__(self):
-        """Initialize the validator only if one is not already initialized."""
-        # Initialize only if not already initialized
-        if not hasattr(self, '_initialized'):
-            self._initialized = True
-            # TODO: Implement the validator
+    @property
+    def version(self) -> str:
+        """The version of the rule set, a hash of the fingerprints of the rules, see `Rule.fingerprint`
+
+        It is part of the keys of the `ValidationCache`, so that results of other rules are not used.
+        """
+        h = hashlib.sha256()
+        for rule in self.rules:
+            h.update(rule.fingerprint().encode('utf-8'))
+            h.update(b'\0')
+        return h.hexdigest()[:16]
 
-    def validate(self, phenopackets: List[Phenopacket]) -> bool:
-        """Validate phenopackets using phenopacket-tools.
+    def close(self):
+        """Stops the worker subprocess of the 'worker' executor, if it was started"""
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
 
-        :param phenopackets: List of phenopackets to validate
+    def validate(
+            self,
+            phenopackets: Iterable[Phenopacket],
+            workers: int = 1,
+            cache: Optional[ValidationCache] = None,
+    ) -> bool:
+        """Validates phenopackets
+
+        :param phenopackets: The phenopackets to validate
+        :param workers: Number of processes validating the phenopackets
+        :param cache: A `ValidationCache` of results, the phenopackets with a cached result are not validated again
         :return: True if the phenopackets are valid, False otherwise
         """
-        # TODO: Implement validation logic
-        raise NotImplementedError
+        valid = True
+        for result in self.iter_validate(phenopackets, workers=workers, cache=cache):
+            valid = valid and result.valid
+        return valid
+
+    def check(self, phenopacket: Phenopacket) -> ValidationResult:
+        """Validates a phenopacket
+
+        :param phenopacket: The phenopacket to validate
+        :return: The `ValidationResult` with the problems found
+        """
+        return self._check(phenopacket, self._timings)
+
+    def iter_validate(
+            self,
+            phenopackets: Iterable[Phenopacket],
+            workers: int = 1,
+            executor: Literal['thread', 'process', 'worker'] = 'process',
+            batch_size: int = 100,
+            cache: Optional[ValidationCache] = None,
+    ) -> Iterator[ValidationResult]:
+        """Validates phenopackets one at a time, yielding the result of each as soon as it is available
+
+        With `workers` greater than 1, batches of phenopackets are validated in a pool of processes (or threads), each
+        with its own copy of the compiled rules. Only a few batches are submitted ahead of the pool, so `phenopackets`
+        can be a generator, e.g. `iter_phenopackets`. The results are yielded in the order of `phenopackets`.
+
+        With the 'worker' executor, the batches are validated by a `ValidatorWorker`, a long-lived subprocess that is
+        started on first use and kept for later calls until `close`. Its rules are not included in `timings`.
+
+        With a `cache`, the results of the phenopackets that were validated before, unchanged and with the same rules,
+        are taken from the cache, and only the other phenopackets are validated, and their results added to the cache.
+        Rules that are not `cacheable`, e.g. `TimestampRule`, are left out of the cached results and check every
+        phenopacket again.
+
+        :param phenopackets: The phenopackets to validate
+        :param workers: Number of processes (or threads) validating the phenopackets, ignored by the 'worker' executor
+        :param executor: 'process' or 'thread', the kind of pool used if `workers` is greater than 1, or 'worker'
+        :param batch_size: Number of phenopackets validated per task of the pool or batch sent to the worker
+        :param cache: A `ValidationCache` of results, the phenopackets with a cached result are not validated again
+        :return: An iterator over the `ValidationResult` of each phenopacket
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be a positive integer, not {workers}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, not {batch_size}")
+        if executor not in ('thread', 'process', 'worker'):
+            raise ValueError(f"Executor {executor} is not valid, use 'thread', 'process' or 'worker'")
 
+        if cache is not None:
+            yield from self._iter_validate_cached(phenopackets, cache, workers, executor, batch_size)
+            return
 
-def validate(phenopackets: List[Phenopacket]) -> bool:
+        if executor == 'worker' or workers == 1:
+            yield from self._iter_validate_with(phenopackets, executor, None, workers, batch_size)
+            return
+
+        with self._create_pool(workers, executor) as pool:
+            yield from self._iter_validate_with(phenopackets, executor, pool, workers, batch_size)
+
+    def _create_pool(self, workers: int, executor: Literal['thread', 'process']):
+        if executor == 'process':
+            return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,))
+        return ThreadPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,))
+
+    def _iter_validate_with(
+            self,
+            phenopackets: Iterable[Phenopacket],
+            executor: Literal['thread', 'process', 'worker'],
+            pool: Optional[Union[ThreadPoolExecutor, ProcessPoolExecutor]],
+            workers: int,
+            batch_size: int,
+    ) -> Iterator[ValidationResult]:
+        """Validates phenopackets with the `ValidatorWorker`, in `pool` or, without a pool, in this thread"""
+        if executor == 'worker':
+            if self._worker is None:
+                # imported here, as the worker module imports the results of validation from this module
+                from phenopacket_mapper.pipeline.validator_worker import ValidatorWorker
+                self._worker = ValidatorWorker(backend=self)
+            it = iter(phenopackets)
+            while batch := list(islice(it, batch_size)):
+                yield from self._worker.validate_batch(batch)
+            return
+
+        if pool is None:
+            for phenopacket in phenopackets:
+                yield self.check(phenopacket)
+            return
+
+        it = iter(phenopackets)
+        window = deque()
+        while batch := list(islice(it, batch_size)):
+            if len(window) >= 2 * workers:  # bound the number of batches held in memory
+                yield from self._merge(window.popleft().result())
+            window.append(pool.submit(_validate_batch, batch))
+        while window:
+            yield from self._merge(window.popleft().result())
+
+    def _iter_validate_cached(
+            self,
+            phenopackets: Iterable[Phenopacket],
+            cache: ValidationCache,
+            workers: int,
+            executor: Literal['thread', 'process', 'worker'],
+            batch_size: int,
+    ) -> Iterator[ValidationResult]:
+        """Validates the phenopackets without a cached result, and merges their results with the cached ones in order
+
+        The phenopackets are looked up in the cache in chunks of `_CACHE_CHUNK_SIZE`, and the results of a chunk are
+        yielded before the next chunk is read, so that only one chunk is held in memory. The pool, if any, is shared by
+        all chunks.
+
+        Only the issues of `cacheable` rules are cached, the other rules check the phenopackets with a cached result.
+        """
+        version = self.version
+        cacheable = {rule.name for rule in self.rules if rule.cacheable}
+        complete = len(cacheable) < len(self.rules)
+
+        def from_cache(cached: str, phenopacket: Phenopacket) -> ValidationResult:
+            result = ValidationResult.from_json(cached)
+            return self._check(phenopacket, self._timings, cached=result) if complete else result
+
+        def to_cache(result: ValidationResult) -> str:
+            if complete:
+                result = ValidationResult(phenopacket_id=result.phenopacket_id,
+                                          issues=[i for i in result.issues if i.rule in cacheable])
+            return result.to_json()
+
+        if executor == 'worker' or workers == 1:
+            pool = None
+        else:
+            pool = self._create_pool(workers, executor)
+        try:
+            it = iter(phenopackets)
+            while chunk := list(islice(it, _CACHE_CHUNK_SIZE)):
+                keys = [cache.key(phenopacket, version) for phenopacket in chunk]
+                cached = cache.get_many(keys)
+                results = self._iter_validate_with(
+                    (phenopacket for phenopacket, key in zip(chunk, keys) if key not in cached),
+                    executor, pool, workers, batch_size)
+                new_results = []
+                try:
+                    for phenopacket, key in zip(chunk, keys):
+                        if key in cached:
+                            yield from_cache(cached[key], phenopacket)
+                        else:
+                            result = next(results)
+                            new_results.append((key, to_cache(result)))
+                            yield result
+                finally:
+                    cache.put_many(new_results)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    @property
+    def timings(self) -> List[RuleTiming]:
+        """The time spent in the walk and in each rule, over all phenopackets validated by this validator"""
+        return [RuleTiming(rule=name, calls=calls, seconds=seconds)
+                for name, (calls, seconds) in self._timings.items()]
+
+    def reset_timings(self):
+        self._timings = {}
+
+    def _merge(self, batch_result: Tuple[List[ValidationResult], Dict[str, List]]) -> List[ValidationResult]:
+        results, timings = batch_result
+        for name, (calls, seconds) in timings.items():
+            timing = self._timings.setdefault(name, [0, 0.0])
+            timing[0] += calls
+            timing[1] += seconds
+        return results
+
+    def _check(self, phenopacket: Phenopacket, timings: Dict[str, List],
+               cached: Optional[ValidationResult] = None) -> ValidationResult:
+        """Checks a phenopacket with the rules, taking the issues of `cacheable` rules from `cached` if given"""
+        start = perf_counter()
+        nodes: Nodes = {}
+        self._walk(phenopacket, '', nodes)
+        end = perf_counter()
+        _record(timings, _WALK, end - start)
+
+        result = ValidationResult(phenopacket_id=phenopacket.id)
+        for rule in self.rules:
+            if cached is not None and rule.cacheable:
+                result.issues.extend(issue for issue in cached.issues if issue.rule == rule.name)
+                continue
+            start = end
+            for path, message in rule.check(phenopacket, nodes):
+                result.issues.append(ValidationIssue(rule=rule.name, path=path, message=message))
+            end = perf_counter()
+            _record(timings, rule.name, end - start)
+        return result
+
+    def _walk(self, message: Message, path: str, nodes: Nodes):
+        """Collects the messages of the types inspected by the rules, with their paths"""
+        type_name = message.DESCRIPTOR.full_name
+        if type_name in self._message_types:
+            nodes.setdefault(type_name, []).append((path, message))
+        walker = self._walkers.get(type_name)
+        if walker is None:
+            walker = self._walkers[type_name] = _compile_walker(message.DESCRIPTOR)
+        prefix = path + '.' if path else ''
+        for name, repeated in walker:
+            if repeated:
+                for i, value in enumerate(getattr(message, name)):
+                    self._walk(value, f"{prefix}{name}[{i}]", nodes)
+            elif message.HasField(name):
+                self._walk(getattr(message, name), prefix + name, nodes)
+
+
+def _compile_walker(descriptor: Descriptor) -> List[Tuple[str, bool]]:
+    """Returns the name of each message field of a message type, and whether it is repeated"""
+    return [(f.name, is_repeated(f)) for f in descriptor.fields
+            if f.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE and not f.message_type.GetOptions().map_entry]
+
+
+def _record(timings: Dict[str, List], name: str, seconds: float):
+    timing = timings.get(name)
+    if timing is None:
+        timing = timings[name] = [0, 0.0]
+    timing[0] += 1
+    timing[1] += seconds
+
+
+_worker_validator: Optional[Validator] = None
+
+
+def _init_worker(validator: Validator):
+    global _worker_validator
+    _worker_validator = validator
+
+
+def _validate_batch(phenopackets: List[Phenopacket]) -> Tuple[List[ValidationResult], Dict[str, List]]:
+    timings = {}
+    return [_worker_validator._check(phenopacket, timings) for phenopacket in phenopackets], timings
+
+
+_default_validator: Optional[Validator] = None
+
+
+def _get_default_validator() -> Validator:
+    global _default_validator
+    if _default_validator is None:
+        _default_validator = Validator()
+    return _default_validator
+
+
+def validate(
+        phenopackets: Iterable[Phenopacket],
+        workers: int = 1,
+        cache: Optional[ValidationCache] = None,
+) -> bool:
     """
-    Validate phenopackets using phenopacket-tools.
+    Validate phenopackets against the Phenopacket v2 schema, see `Validator`.
 
     :param phenopackets: List of phenopackets to validate
+    :param workers: Number of processes validating the phenopackets
+    :param cache: A `ValidationCache` of results, the phenopackets with a cached result are not validated again
     :return: True if the phenopackets are valid, False otherwise
     """
-    validator = Validator()
-    return validator.validate(phenopackets)
+    return _get_default_validator().validate(phenopackets, workers=workers, cache=cache)
+
 
+def iter_validate(
+        phenopackets: Iterable[Phenopacket],
+        workers: int = 1,
+        batch_size: int = 100,
+        cache: Optional[ValidationCache] = None,
+) -> Iterator[ValidationResult]:
+    """
+    Validate phenopackets against the Phenopacket v2 schema, yielding the result of each, see `Validator.iter_validate`.
 
-def read_validate(path: Path) -> bool:
+    :param phenopackets: The phenopackets to validate
+    :param workers: Number of processes validating the phenopackets
+    :param batch_size: Number of phenopackets validated per task of the pool
+    :param cache: A `ValidationCache` of results, the phenopackets with a cached result are not validated again
+    :return: An iterator over the `ValidationResult` of each phenopacket
     """
-    Read phenopackets from a file and validate them.
+    return _get_default_validator().iter_validate(phenopackets, workers=workers, batch_size=batch_size, cache=cache)
+
+
+def read_validate(
+        path: Union[str, Path],
+        workers: int = 1,
+        recursive: bool = False,
+        cache: Optional[ValidationCache] = None,
+) -> bool:
+    """
+    Read phenopackets from a directory and validate them.
+
+    Files that cannot be read as phenopackets make the result invalid.
 
-    :param path: Path to the file containing phenopackets
+    :param path: Path to the directory containing the phenopackets
+    :param workers: Number of processes validating the phenopackets
+    :param recursive: Whether to read the phenopackets in subdirectories too
+    :param cache: A `ValidationCache` of results, the phenopackets with a cached result are not validated again
     :return: True if the phenopackets are valid, False otherwise
     """
-    phenopackets = read_phenopackets(path)
-    return validate(phenopackets)
+    errors = []
+    valid = validate(iter_phenopackets(path, recursive=recursive, errors=errors), workers=workers, cache=cache)
+    return valid and not errors
@@ -0,0 +1,123 @@
+"""
+This module provides a persistent cache of validation results, keyed by the content of the phenopackets.
+
+The key of a phenopacket is the SHA-256 hash of the version of the rule set of the validator and the deterministic
+protobuf binary encoding of the phenopacket. A phenopacket that has not changed since it was validated with the same
+rules therefore has a cached result, and changing the rules invalidates every entry. The results are stored in an
+SQLite database, as the JSON of `ValidationResult.to_json`.
+
+```python
+with ValidationCache("validation.sqlite", max_age=30 * 24 * 60 * 60) as cache:
+    valid = validate(phenopackets, cache=cache)
+```
+"""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Union, Optional, Iterable, Dict, Tuple, List
+
+from phenopackets.schema.v2 import Phenopacket
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key BLOB PRIMARY KEY,
+    result TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_created ON results (created);
+"""
+
+# SQLite limits the number of parameters of a statement
+_MAX_PARAMETERS = 500
+
+
+class ValidationCache:
+    """Persistent cache of validation results, keyed by a hash of the phenopacket and the rule set version"""
+
+    def __init__(self, path: Union[str, Path], max_age: Optional[float] = None):
+        """Opens the cache, creating it if it does not exist
+
+        :param path: The path of the SQLite database
+        :param max_age: Age in seconds after which a result is not used anymore, `None` to use results of any age
+        """
+        self.path = Path(path)
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._connection = sqlite3.connect(self.path)
+        self._connection.executescript(_SCHEMA)
+
+    @staticmethod
+    def key(phenopacket: Phenopacket, version: str) -> bytes:
+        """Returns the key of a phenopacket validated with the rule set `version`
+
+        :param phenopacket: The phenopacket
+        :param version: The version of the rule set, e.g. `Validator.version`
+        :return: The SHA-256 digest of the version and the deterministic encoding of the phenopacket
+        """
+        h = hashlib.sha256(version.encode('utf-8'))
+        h.update(b'\0')
+        h.update(phenopacket.SerializeToString(deterministic=True))
+        return h.digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, str]:
+        """Returns the cached results of the keys that have one
+
+        :param keys: The keys
+        :return: The cached result of each key found, as JSON
+        """
+        found = {}
+        oldest = time.time() - self.max_age if self.max_age is not None else None
+        for i in range(0, len(keys), _MAX_PARAMETERS):
+            chunk = keys[i:i + _MAX_PARAMETERS]
+            query = f"SELECT key, result FROM results WHERE key IN ({', '.join('?' * len(chunk))})"
+            if oldest is not None:
+                rows = self._connection.execute(query + " AND created >= ?", (*chunk, oldest))
+            else:
+                rows = self._connection.execute(query, chunk)
+            found.update(rows)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[bytes, str]]):
+        """Stores results in the cache
+
+        :param items: The key and the result, as JSON, of each phenopacket
+        """
+        now = time.time()
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO results (key, result, created) VALUES (?, ?, ?)",
+                                         ((key, result, now) for key, result in items))
+
+    def expire(self, max_age: Optional[float] = None) -> int:
+        """Removes the results older than `max_age`
+
+        :param max_age: Age in seconds, defaults to the `max_age` of the cache
+        :return: The number of results removed
+        """
+        max_age = max_age if max_age is not None else self.max_age
+        if max_age is None:
+            raise ValueError("max_age must be given if the cache has none")
+        with self._connection:
+            return self._connection.execute("DELETE FROM results WHERE created < ?",
+                                            (time.time() - max_age,)).rowcount
+
+    def clear(self):
+        """Removes all results"""
+        with self._connection:
+            self._connection.execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> 'ValidationCache':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,213 @@
+"""
+This module defines the rules of the native phenopacket validator, see `pipeline.validate.Validator`.
+
+A rule declares the message types it inspects in `message_types`. The validator walks each phenopacket once, collects
+the messages of those types with their paths, and passes them to the rule, which yields the path and description of
+each problem it finds. Rules are compiled once, when they are created, e.g. `RequiredFieldsRule` resolves its table of
+required fields against the descriptors of the Phenopacket v2 schema.
+"""
+
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple, Iterator, Iterable, Optional
+
+from google.protobuf.descriptor import FieldDescriptor, Descriptor
+from google.protobuf.message import Message
+from phenopackets.schema.v2 import Phenopacket
+
+from phenopacket_mapper.utils import is_repeated
+
+Nodes = Dict[str, List[Tuple[str, Message]]]
+"""The messages of a phenopacket by the full name of their type, each with its path, e.g. `diseases[0].term`"""
+
+_V2 = 'org.phenopackets.schema.v2.'
+_CORE = 'org.phenopackets.schema.v2.core.'
+
+ONTOLOGY_CLASS = _CORE + 'OntologyClass'
+TIMESTAMP = 'google.protobuf.Timestamp'
+
+CURIE_PATTERN = re.compile(r'^[A-Za-z][A-Za-z0-9_.-]*:[^\s:]\S*$')
+ISO8601_DURATION_PATTERN = re.compile(
+    r'^P(?!$)(\d+Y)?(\d+M)?(\d+W)?(\d+D)?(T(?=\d)(\d+H)?(\d+M)?(\d+(\.\d+)?S)?)?$')
+
+# range of valid timestamps, 0001-01-01T00:00:00Z to 9999-12-31T23:59:59Z
+_MIN_SECONDS = -62135596800
+_MAX_SECONDS = 253402300799
+
+
+class Rule(ABC):
+    """A check of phenopackets
+
+    Subclasses set `name` and `message_types`, and implement `check`.
+    """
+    name: str = ''
+    message_types: Tuple[str, ...] = ()
+    version: str = '1'
+    """Version of the implementation of the rule, to be increased when it changes the results of `check`"""
+    cacheable: bool = True
+    """Whether the results of `check` only depend on the phenopacket, and not e.g. on the current time, so that they
+    can be taken from a `ValidationCache`"""
+
+    def fingerprint(self) -> str:
+        """Identifies the rule and its configuration, results of rules with the same fingerprint are interchangeable
+
+        :return: The class, `version` and attributes of the rule
+        """
+        cls = type(self)
+        return f"{cls.__module__}.{cls.__qualname__}:{self.version}:{sorted(vars(self).items())!r}"
+
+    @abstractmethod
+    def check(self, phenopacket: Phenopacket, nodes: Nodes) -> Iterator[Tuple[str, str]]:
+        """Checks a phenopacket
+
+        :param phenopacket: The phenopacket
+        :param nodes: The messages of the types in `message_types` found in the phenopacket, with their paths
+        :return: An iterator over the path and description of each problem
+        """
+        pass
+
+
+class RequiredFieldsRule(Rule):
+    """Checks that the fields required by the Phenopacket v2 schema are set"""
+    name = 'required'
+
+    REQUIRED_FIELDS: Dict[str, Tuple[str, ...]] = {
+        _V2 + 'Phenopacket': ('id', 'meta_data'),
+        _CORE + 'Individual': ('id',),
+        _CORE + 'OntologyClass': ('id', 'label'),
+        _CORE + 'PhenotypicFeature': ('type',),
+        _CORE + 'Disease': ('term',),
+        _CORE + 'Measurement': ('assay', 'measurement_value'),
+        _CORE + 'Quantity': ('unit',),
+        _CORE + 'TypedQuantity': ('type', 'quantity'),
+        _CORE + 'Biosample': ('id',),
+        _CORE + 'Interpretation': ('id',),
+        _CORE + 'Diagnosis': ('disease',),
+        _CORE + 'GenomicInterpretation': ('subject_or_biosample_id', 'call'),
+        _CORE + 'MedicalAction': ('action',),
+        _CORE + 'Treatment': ('agent',),
+        _CORE + 'Procedure': ('code',),
+        _CORE + 'File': ('uri',),
+        _CORE + 'TimeElement': ('element',),
+        _CORE + 'Evidence': ('evidence_code',),
+        _CORE + 'MetaData': ('created', 'created_by', 'phenopacket_schema_version'),
+        _CORE + 'Resource': ('id', 'name', 'url', 'version', 'namespace_prefix', 'iri_prefix'),
+    }
+    """Names of the required fields (or groups of fields, of which one must be set) of each message type"""
+
+    def __init__(self, required_fields: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        :param required_fields: Names of the required fields of each message type, defaults to `REQUIRED_FIELDS`
+        """
+        if required_fields is None:
+            required_fields = self.REQUIRED_FIELDS
+        pool = Phenopacket.DESCRIPTOR.file.pool
+        self._checks: Dict[str, List[Tuple[str, str]]] = {}
+        for type_name, names in required_fields.items():
+            descriptor = pool.FindMessageTypeByName(type_name)
+            self._checks[type_name] = [(name, _field_kind(descriptor, name)) for name in names]
+        self.message_types = tuple(self._checks)
+
+    def check(self, phenopacket: Phenopacket, nodes: Nodes) -> Iterator[Tuple[str, str]]:
+        for type_name, checks in self._checks.items():
+            for path, message in nodes.get(type_name, ()):
+                for name, kind in checks:
+                    if kind == 'oneof':
+                        missing = message.WhichOneof(name) is None
+                    elif kind == 'message':
+                        missing = not message.HasField(name)
+                    else:  # scalars and repeated fields are missing if they are empty
+                        missing = not getattr(message, name)
+                    if missing:
+                        yield _join(path, name), f"{message.DESCRIPTOR.name}.{name} is required"
+
+
+def _field_kind(descriptor: Descriptor, name: str) -> str:
+    if name in descriptor.oneofs_by_name:
+        return 'oneof'
+    f = descriptor.fields_by_name.get(name)
+    if f is None:
+        raise ValueError(f"{descriptor.full_name} has no field or oneof {name}")
+    if is_repeated(f):
+        return 'repeated'
+    return 'message' if f.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE else 'scalar'
+
+
+class CurieRule(Rule):
+    """Checks that the ids of ontology classes are CURIEs, i.e. `prefix:local_id` like `HP:0001250`"""
+    name = 'curie'
+    message_types = (ONTOLOGY_CLASS,)
+
+    def check(self, phenopacket: Phenopacket, nodes: Nodes) -> Iterator[Tuple[str, str]]:
+        for path, ontology_class in nodes.get(ONTOLOGY_CLASS, ()):
+            if ontology_class.id and not CURIE_PATTERN.match(ontology_class.id):
+                yield _join(path, 'id'), f"'{ontology_class.id}' is not a CURIE"
+
+
+class ResourcePrefixRule(Rule):
+    """Checks that the prefix of each ontology class id is the `namespace_prefix` of a resource in the meta data, and
+    that no two resources have the same prefix"""
+    name = 'resource_prefix'
+    message_types = (ONTOLOGY_CLASS,)
+
+    def check(self, phenopacket: Phenopacket, nodes: Nodes) -> Iterator[Tuple[str, str]]:
+        prefixes = set()
+        for i, resource in enumerate(phenopacket.meta_data.resources):
+            if resource.namespace_prefix in prefixes:
+                yield (f"meta_data.resources[{i}].namespace_prefix",
+                       f"Prefix {resource.namespace_prefix} is used by more than one resource")
+            prefixes.add(resource.namespace_prefix)
+
+        reported = set()
+        for path, ontology_class in nodes.get(ONTOLOGY_CLASS, ()):
+            prefix = ontology_class.id.partition(':')[0] if CURIE_PATTERN.match(ontology_class.id) else None
+            if prefix is not None and prefix not in prefixes and prefix not in reported:
+                reported.add(prefix)
+                yield _join(path, 'id'), (f"Prefix {prefix} of '{ontology_class.id}' is not defined in "
+                                          f"meta_data.resources")
+
+
+class TimestampRule(Rule):
+    """Checks that timestamps are valid and not in the future, that ages are ISO 8601 durations, that time intervals
+    do not end before they start, and that individuals did not die before they were born"""
+    name = 'timestamp'
+    message_types = (TIMESTAMP, _CORE + 'Age', _CORE + 'TimeInterval', _CORE + 'Individual')
+    cacheable = False  # timestamps are checked against the current time
+
+    def __init__(self, tolerance_seconds: int = 24 * 60 * 60):
+        """
+        :param tolerance_seconds: How far in the future a timestamp may be, to allow for time zones and clock skew
+        """
+        self.tolerance_seconds = tolerance_seconds
+
+    def check(self, phenopacket: Phenopacket, nodes: Nodes) -> Iterator[Tuple[str, str]]:
+        latest = time.time() + self.tolerance_seconds
+        for path, timestamp in nodes.get(TIMESTAMP, ()):
+            if not _MIN_SECONDS <= timestamp.seconds <= _MAX_SECONDS or not 0 <= timestamp.nanos < 1_000_000_000:
+                yield path, f"Timestamp is out of range (seconds={timestamp.seconds}, nanos={timestamp.nanos})"
+            elif timestamp.seconds > latest:
+                yield path, f"Timestamp {timestamp.ToJsonString()} is in the future"
+        for path, age in nodes.get(_CORE + 'Age', ()):
+            if age.iso8601duration and not ISO8601_DURATION_PATTERN.match(age.iso8601duration):
+                yield _join(path, 'iso8601duration'), f"'{age.iso8601duration}' is not an ISO 8601 duration"
+        for path, interval in nodes.get(_CORE + 'TimeInterval', ()):
+            if interval.HasField('start') and interval.HasField('end') and _before(interval.end, interval.start):
+                yield _join(path, 'end'), "Time interval ends before it starts"
+        for path, individual in nodes.get(_CORE + 'Individual', ()):
+            time_of_death = individual.vital_status.time_of_death
+            if (individual.HasField('date_of_birth') and time_of_death.HasField('timestamp')
+                    and _before(time_of_death.timestamp, individual.date_of_birth)):
+                yield _join(path, 'vital_status.time_of_death'), "Time of death is before the date of birth"
+
+
+DEFAULT_RULES: Tuple[type, ...] = (RequiredFieldsRule, CurieRule, ResourcePrefixRule, TimestampRule)
+"""The rule classes of the default rule set of `Validator`"""
+
+
+def _before(a: Message, b: Message) -> bool:
+    return (a.seconds, a.nanos) < (b.seconds, b.nanos)
+
+
+def _join(path: str, name: str) -> str:
+    return f"{path}.{name}" if path else name
@@ -0,0 +1,207 @@
+"""
+This module runs a phenopacket validator in a long-lived subprocess, see `ValidatorWorker`.
+
+The worker and its client exchange frames over the pipes of the subprocess, each frame prefixed with its length as a
+varint:
+- after starting, the worker sends a `ready` frame, once its backend is loaded
+- the client sends a batch as one frame holding the protobuf binary encoding of each phenopacket, prefixed with its
+  length as a varint (the format of `write(..., file_format='binary')`)
+- the worker answers with one frame per phenopacket, in order, holding the JSON
+  `{"id": <phenopacket id>, "issues": [[<rule>, <path>, <message>], ...]}`
+- the client closes the pipe to stop the worker
+
+The backend is any class with a method `check(phenopacket) -> ValidationResult`, like `Validator`, named as
+`module:Class` and created without arguments in the worker, or an instance that is pickled to the worker.
+"""
+
+import importlib
+import io
+import os
+import pickle
+import subprocess
+import sys
+from typing import Union, Iterable, Iterator, Optional, List, BinaryIO
+
+from phenopackets.schema.v2 import Phenopacket
+
+from phenopacket_mapper.pipeline.validate import ValidationResult, ValidationIssue
+from phenopacket_mapper.utils import encode_varint, decode_varint, read_varint
+
+DEFAULT_BACKEND = 'phenopacket_mapper.pipeline.validate:Validator'
+
+_READY = b'ready'
+_PICKLED = '-'
+
+
+class ValidatorWorker:
+    """Client of a validator running in a long-lived subprocess
+
+    The subprocess is started once and validates any number of batches, so the cost of starting it is paid once rather
+    than per call. If it crashes, it is started again and the phenopackets of the batch without a result are sent
+    again. A phenopacket that crashes the worker twice in a row is reported with an issue of the rule 'worker'.
+
+    ```python
+    with ValidatorWorker() as worker:
+        for result in worker.validate_batch(phenopackets):
+            print(result)
+    ```
+    """
+
+    def __init__(self, backend: Union[str, object] = DEFAULT_BACKEND, python: str = sys.executable):
+        """
+        :param backend: The validator run by the worker, as `module:Class`, or an instance that can be pickled
+        :param python: The Python interpreter running the worker
+        """
+        if isinstance(backend, str) and ':' not in backend:
+            raise ValueError(f"Backend {backend} is not valid, use 'module:Class'")
+        self.backend = backend
+        self.python = python
+        self.restarts = 0
+        self._process: Optional[subprocess.Popen] = None
+
+    def start(self):
+        """Starts the subprocess, if it is not running, and waits until its backend is loaded"""
+        if self.running:
+            return
+        spec = self.backend if isinstance(self.backend, str) else _PICKLED
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+        self._process = subprocess.Popen([self.python, '-m', __name__, spec], stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE, env=env)
+        if spec == _PICKLED:
+            _write_frame(self._process.stdin, pickle.dumps(self.backend))
+            self._process.stdin.flush()
+        if _read_frame(self._process.stdout) != _READY:
+            returncode = self._process.wait()
+            self._process = None
+            raise RuntimeError(f"Validator worker with backend {spec} failed to start (exit code {returncode})")
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def validate_batch(self, phenopackets: Iterable[Phenopacket]) -> Iterator[ValidationResult]:
+        """Validates a batch of phenopackets in the worker, yielding the result of each as it arrives
+
+        :param phenopackets: The phenopackets of the batch
+        :return: An iterator over the `ValidationResult` of each phenopacket, in order
+        """
+        pending: List[Phenopacket] = list(phenopackets)
+        crashed_at: Optional[int] = None
+        done = 0
+        while done < len(pending):
+            self.start()
+            # the worker flushes its results at the end of each batch, so after a crash the remaining phenopackets are
+            # sent one at a time, to find the one that crashed it
+            stop = len(pending) if crashed_at is None else done + 1
+            try:
+                self._send_batch(pending[done:stop])
+                for _ in range(stop - done):
+                    frame = _read_frame(self._process.stdout)
+                    if frame is None:
+                        raise EOFError
+                    yield ValidationResult.from_json(frame)
+                    done += 1
+            except GeneratorExit:
+                # results of the batch may still be in the pipe, they would be read as those of the next batch
+                self._kill()
+                raise
+            except (EOFError, BrokenPipeError):
+                self._kill()
+                self.restarts += 1
+                if crashed_at == done:  # the same phenopacket crashed the worker twice
+                    yield ValidationResult(phenopacket_id=pending[done].id, issues=[ValidationIssue(
+                        rule='worker', path='', message="The validator worker crashed on this phenopacket")])
+                    done += 1
+                    crashed_at = None
+                else:
+                    crashed_at = done
+
+    def close(self):
+        """Stops the worker"""
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=10)
+            except (BrokenPipeError, subprocess.TimeoutExpired):
+                self._process.kill()
+                self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+    def __enter__(self) -> 'ValidatorWorker':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _send_batch(self, phenopackets: List[Phenopacket]):
+        batch = bytearray()
+        for phenopacket in phenopackets:
+            data = phenopacket.SerializeToString()
+            batch += encode_varint(len(data))
+            batch += data
+        _write_frame(self._process.stdin, batch)
+        self._process.stdin.flush()
+
+    def _kill(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process.stdin.close()
+            self._process.stdout.close()
+            self._process = None
+
+
+def _write_frame(stream: BinaryIO, payload: bytes):
+    stream.write(encode_varint(len(payload)))
+    stream.write(payload)
+
+
+def _read_frame(stream: BinaryIO) -> Optional[bytes]:
+    """Reads a frame, returning `None` if the stream ends before it is complete"""
+    try:
+        length = read_varint(stream)
+    except ValueError:
+        return None
+    if length is None:
+        return None
+    payload = stream.read(length)
+    return payload if len(payload) == length else None
+
+
+def _load_backend(spec: str, stdin: BinaryIO):
+    if spec == _PICKLED:
+        return pickle.loads(_read_frame(stdin))
+    module_name, _, class_name = spec.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)()
+
+
+def serve(spec: str, stdin: BinaryIO, stdout: BinaryIO):
+    """Runs the worker: loads the backend, then validates batches from `stdin` until it is closed
+
+    :param spec: The backend as `module:Class`, or '-' to read a pickled instance from `stdin`
+    :param stdin: The stream the batches are read from
+    :param stdout: The stream the results are written to
+    """
+    backend = _load_backend(spec, stdin)
+    _write_frame(stdout, _READY)
+    stdout.flush()
+    while (batch := _read_frame(stdin)) is not None:
+        pos = 0
+        while pos < len(batch):
+            length, pos = decode_varint(batch, pos)
+            phenopacket = Phenopacket()
+            phenopacket.ParseFromString(batch[pos:pos + length])
+            pos += length
+            _write_frame(stdout, backend.check(phenopacket).to_json().encode('utf-8'))
+        stdout.flush()
+
+
+if __name__ == '__main__':
+    # the frames are written to the original stdout, anything the backend prints goes to stderr
+    out = io.open(os.dup(1), 'wb')
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    serve(sys.argv[1], sys.stdin.buffer, out)
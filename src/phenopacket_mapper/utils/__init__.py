@@ -1,10 +1,15 @@
 """This submodule contains utility functions that are used throughout the package."""
 from .create_ipynb_in_code import NotebookBuilder
-from .pandas_utils import loc_default
+from .pandas_utils import loc_default, present_mask
+from .protobuf_utils import is_repeated
 from .str_to_valid_id import str_to_valid_id
+from .varint import encode_varint, decode_varint, read_varint
 
 __all__ = [
     "NotebookBuilder",
     "loc_default",
-    "str_to_valid_id"
+    "present_mask",
+    "is_repeated",
+    "str_to_valid_id",
+    "encode_varint", "decode_varint", "read_varint",
 ]
@@ -1,5 +1,6 @@
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 
@@ -16,3 +17,20 @@ def loc_default(df: pd.DataFrame, row_index: int, column_name: str, default: Any
         return df.loc[row_index, column_name]
     except:
         return default
+
+
+def present_mask(column: pd.Series) -> np.ndarray:
+    """Computes a boolean mask of the cells in a column that hold a value
+
+    This is the vectorized equivalent of checking `not value or (isinstance(value, float) and math.isnan(value))` for
+    every cell, i.e. missing values (`None`, `NaN`, `NaT`) as well as falsy values (e.g. `''`) are masked out.
+
+    :param column: the column of a `pd.DataFrame`
+    :return: a boolean `np.ndarray` that is `True` where the column holds a value
+    """
+    mask = column.notna().to_numpy(dtype=bool, copy=True)
+    try:
+        mask[mask] = column[mask].astype(bool).to_numpy(dtype=bool)
+    except (TypeError, ValueError):  # e.g. datetime columns, all present values are truthy
+        pass
+    return mask
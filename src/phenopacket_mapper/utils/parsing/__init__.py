@@ -8,6 +8,9 @@ from .parse_date import parse_date
 from .parse_coding import parse_coding
 from .parse_value import parse_value
 from .parse_value_set import parse_value_set
+from .compile_value_parser import compile_value_parser, ValueParser
+from .parse_cache import ParseCache, ParseCacheStats, resources_fingerprint
+from .parse_ontology_file import OntologyTerm, parse_ontology_file, parse_obo, parse_obographs, iri_to_curie
 
 __all__ = [
     "parse_data_type", "parse_single_data_type",
@@ -18,4 +21,7 @@ __all__ = [
     "parse_value",
     "get_codesystem_by_namespace_prefx",
     "parse_value_set",
+    "compile_value_parser", "ValueParser",
+    "ParseCache", "ParseCacheStats", "resources_fingerprint",
+    "OntologyTerm", "parse_ontology_file", "parse_obo", "parse_obographs", "iri_to_curie",
 ]
@@ -0,0 +1,148 @@
+from dataclasses import dataclass, field
+from typing import List, Literal, Tuple, Any, FrozenSet, Union
+
+from phenopacket_mapper.data_standards import CodeSystem, Coding, CodeableConcept, Date, ResourceRegistry
+from phenopacket_mapper.data_standards.ontology_hierarchy import OntologySubtree
+from phenopacket_mapper.data_standards.value_set import ValueSet
+from phenopacket_mapper.utils.parsing import parse_date, parse_coding, parse_int, parse_float, parse_bool, parse_value
+
+_NO_MATCH = object()
+
+
+def _parse_date(value_str: str, resources: List[CodeSystem]):
+    try:
+        value = parse_date(date_str=value_str, compliance='strict')
+    except ValueError:
+        return _NO_MATCH
+    return value if value is not None else _NO_MATCH
+
+
+def _parse_coding(value_str: str, resources: List[CodeSystem]):
+    try:
+        return parse_coding(coding_str=value_str, resources=resources, compliance='strict')
+    except ValueError:
+        return _NO_MATCH
+
+
+def _parse_int(value_str: str, resources: List[CodeSystem]):
+    value = parse_int(value_str)
+    if value is None:  # e.g. '1.0', integer columns with missing values are read as floats
+        float_value = parse_float(value_str)
+        if float_value is not None and float_value.is_integer():
+            value = int(float_value)
+    return value if value is not None else _NO_MATCH
+
+
+def _parse_float(value_str: str, resources: List[CodeSystem]):
+    value = parse_float(value_str)
+    return value if value is not None else _NO_MATCH
+
+
+def _parse_bool(value_str: str, resources: List[CodeSystem]):
+    value = parse_bool(value_str)
+    return value if value is not None else _NO_MATCH
+
+
+def _parse_str(value_str: str, resources: List[CodeSystem]):
+    return value_str
+
+
+# the order in which the kinds of values are attempted, equivalent to the order in `parse_value`
+_PARSERS = {
+    'date': _parse_date,
+    'coding': _parse_coding,
+    'int': _parse_int,
+    'float': _parse_float,
+    'bool': _parse_bool,
+    'str': _parse_str,
+}
+
+
+@dataclass(slots=True, frozen=True)
+class ValueParser:
+    """Parser for the values of a single `DataField`, compiled from its `ValueSet` by `compile_value_parser`
+
+    Only the kinds of values that the value set permits are attempted, in the same order as in `parse_value`.
+    Enumerated strings are matched exactly. If the value matches none of them, or if the value set allows `Any`, the
+    parser falls back to `parse_value`.
+
+    :ivar kinds: The kinds of values to attempt, a subset of 'date', 'coding', 'int', 'float', 'bool', 'str'. An empty
+                 tuple means that the generic `parse_value` is used.
+    :ivar enumerated: Strings that are permitted by the value set as literal values
+    :ivar resources: List of CodeSystems to use for parsing codings
+    :ivar compliance: Compliance level for parsing values that match none of the kinds
+    """
+    kinds: Tuple[str, ...] = field(default=())
+    enumerated: FrozenSet[str] = field(default=frozenset())
+    resources: List[CodeSystem] = field(default_factory=list, repr=False)
+    compliance: Literal['strict', 'lenient'] = field(default='lenient')
+
+    def __call__(self, value_str: str) -> Any:
+        value_str = value_str.strip()
+        for kind in self.kinds:
+            if kind == 'str' and self.enumerated and value_str not in self.enumerated:
+                continue
+            value = _PARSERS[kind](value_str, self.resources)
+            if value is not _NO_MATCH:
+                return value
+
+        return parse_value(value_str=value_str, resources=self.resources, compliance=self.compliance)
+
+
+def compile_value_parser(
+        value_set: Union[ValueSet, Any],
+        resources: Union[ResourceRegistry, List[CodeSystem]],
+        compliance: Literal['strict', 'lenient'] = 'lenient'
+) -> ValueParser:
+    """Compiles a dedicated parser for the values of a `DataField` from its `ValueSet`
+
+    Instead of trying every kind of value like `parse_value`, the returned parser only attempts the kinds of values
+    that the value set permits. E.g., a value set of `[int]` results in a parser that only parses integers:
+
+    >>> compile_value_parser(ValueSet([int]), resources=[])
+    ValueParser(kinds=('int',), enumerated=frozenset(), compliance='lenient')
+    >>> compile_value_parser(ValueSet([int]), resources=[])("2024")
+    2024
+
+    Value sets that allow `Any`, are empty or are not a `ValueSet` result in a parser that falls back to `parse_value`.
+
+    :param value_set: The value set (i.e. `DataField.specification`) to compile a parser for
+    :param resources: List of CodeSystems to use for parsing codings
+    :param compliance: Compliance level for parsing values that match none of the permitted kinds
+    :return: A callable that parses a string to a value
+    """
+    resources = ResourceRegistry.of(resources)
+    if not isinstance(value_set, ValueSet) or not value_set.elements or Any in value_set.elements:
+        return ValueParser(resources=resources, compliance=compliance)
+
+    kinds = set()
+    enumerated = set()
+    for e in value_set.elements:
+        if e is Date or isinstance(e, Date):
+            kinds.add('date')
+        elif isinstance(e, (CodeSystem, Coding, CodeableConcept, OntologySubtree)) or e in (Coding, CodeableConcept):
+            kinds.add('coding')
+        elif e is bool or isinstance(e, bool):
+            kinds.add('bool')
+        elif e is int or isinstance(e, int):
+            kinds.add('int')
+        elif e is float or isinstance(e, float):
+            kinds.add('float')
+        elif e is str:
+            kinds.add('str')
+        elif isinstance(e, str):
+            enumerated.add(e.strip())
+        else:  # unknown element, cannot derive a dedicated parser
+            return ValueParser(resources=resources, compliance=compliance)
+
+    if enumerated and 'str' not in kinds:
+        kinds.add('str')
+    else:  # any string is permitted
+        enumerated = set()
+
+    return ValueParser(
+        kinds=tuple(k for k in _PARSERS.keys() if k in kinds),
+        enumerated=frozenset(enumerated),
+        resources=resources,
+        compliance=compliance,
+    )
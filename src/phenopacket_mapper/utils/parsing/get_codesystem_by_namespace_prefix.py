@@ -1,18 +1,27 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from phenopacket_mapper.data_standards import CodeSystem
+from phenopacket_mapper.data_standards import CodeSystem, ResourceRegistry
 
 
-def get_codesystem_by_namespace_prefx(namespace_prefix_str: str, resources: List[CodeSystem]) -> Optional[CodeSystem]:
+def get_codesystem_by_namespace_prefx(
+        namespace_prefix_str: str,
+        resources: Union[ResourceRegistry, List[CodeSystem]]
+) -> Optional[CodeSystem]:
     """
     Returns the CodeSystem object that matches the namespace prefix string. If no match is found, returns None.
 
+    If `resources` is a `ResourceRegistry`, the lookup takes constant time. Otherwise, the list is searched linearly,
+    so callers that look up many prefixes should build a `ResourceRegistry` once and pass it instead.
+
     :param namespace_prefix_str: The namespace prefix string to match
-    :param resources: The list of CodeSystem objects to search through
+    :param resources: The `ResourceRegistry` or list of CodeSystem objects to search through
     :return: The CodeSystem object that matches the namespace prefix string, or None if no match is found
     """
+    if isinstance(resources, ResourceRegistry):
+        return resources.get(namespace_prefix_str)
     if resources:
+        namespace_prefix_str = namespace_prefix_str.lower()
         for res in resources:
             potential_matches = [res.namespace_prefix.lower(), res.name.lower(), *(s.lower() for s in res.synonyms)]
-            if namespace_prefix_str.lower() in potential_matches:
+            if namespace_prefix_str in potential_matches:
                 return res
@@ -0,0 +1,114 @@
+import copy
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Tuple, Hashable
+
+from phenopacket_mapper.data_standards import CodeSystem, Coding
+
+_IMMUTABLE_TYPES = (str, int, float, bool, Coding, CodeSystem, type(None))
+
+
+def resources_fingerprint(resources: List[CodeSystem]) -> Tuple:
+    """Returns a hashable fingerprint of a list of resources, that changes if the parsing of codings could change
+
+    :param resources: List of CodeSystems used for parsing
+    :return: A tuple identifying the resources
+    """
+    if not resources:
+        return ()
+    return tuple((res.namespace_prefix, res.name, res.version, tuple(res.synonyms)) for res in resources)
+
+
+@dataclass(slots=True)
+class ParseCacheStats:
+    """Statistics of a `ParseCache`
+
+    :ivar hits: Number of values that were taken from the cache
+    :ivar misses: Number of values that had to be parsed
+    :ivar evictions: Number of values that were evicted from the cache because it was full
+    """
+    hits: int = field(default=0)
+    misses: int = field(default=0)
+    evictions: int = field(default=0)
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups that were answered from the cache"""
+        if self.lookups == 0:
+            return 0.0
+        return self.hits / self.lookups
+
+
+class ParseCache:
+    """A bounded least recently used (LRU) cache of parsed values
+
+    Registry columns tend to be very repetitive (e.g., sex, yes/no, the same diagnosis codes), so each distinct string
+    only has to be parsed once per field. Values are keyed by the id of the field, the raw string and a fingerprint of
+    the resources used for parsing.
+
+    Immutable values (e.g. `Coding`, primitives) are shared between all cells holding the same string. Mutable values
+    (e.g. `Date`) are copied whenever they are handed out, so that modifying one cell does not change the others.
+
+    >>> cache = ParseCache(max_size=2)
+    >>> cache.parse("age", "42", (), int)
+    42
+    >>> cache.parse("age", "42", (), int)
+    42
+    >>> cache.stats
+    ParseCacheStats(hits=1, misses=1, evictions=0)
+    """
+
+    def __init__(self, max_size: int = 65_536):
+        """
+        :param max_size: Maximum number of distinct values to keep in the cache
+        """
+        if max_size < 1:
+            raise ValueError(f"max_size must be a positive integer, not {max_size}")
+        self.max_size = max_size
+        self.stats = ParseCacheStats()
+        self._cache: OrderedDict = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def parse(
+            self,
+            field_id: str,
+            value_str: str,
+            resources_key: Hashable,
+            parse: Callable[[str], Any]
+    ) -> Any:
+        """Returns the parsed value of `value_str`, parsing it using `parse` only if it is not in the cache yet
+
+        :param field_id: The id of the field the value belongs to
+        :param value_str: The raw string to parse
+        :param resources_key: Fingerprint of the resources used by `parse`, see `resources_fingerprint`
+        :param parse: The parser to use if the value is not in the cache
+        :return: The parsed value
+        """
+        key = (field_id, value_str, resources_key)
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.stats.misses += 1
+            value = parse(value_str)
+            self._cache[key] = value
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.stats.evictions += 1
+        else:
+            self.stats.hits += 1
+            self._cache.move_to_end(key)
+
+        if isinstance(value, _IMMUTABLE_TYPES):
+            return value
+        return copy.copy(value)
+
+    def clear(self):
+        """Removes all values from the cache and resets its statistics"""
+        self._cache.clear()
+        self.stats = ParseCacheStats()
@@ -1,14 +1,14 @@
-from typing import Literal, List
+from typing import Literal, List, Union
 import re
 
-from phenopacket_mapper.data_standards import Coding, CodeSystem
+from phenopacket_mapper.data_standards import Coding, CodeSystem, ResourceRegistry
 from phenopacket_mapper.utils.parsing import get_codesystem_by_namespace_prefx
 from phenopacket_mapper.data_standards import code_system as code_system_module
 
 
 def parse_coding(
         coding_str: str,
-        resources: List[CodeSystem],
+        resources: Union[ResourceRegistry, List[CodeSystem]],
         compliance: Literal['lenient', 'strict'] = 'lenient'
 ) -> Coding:
     """Parsed a string representing a coding to a Coding object
@@ -32,7 +32,7 @@ def parse_coding(
     Coding(system='SNOMED', code='404684003', display='', text='')
 
     :param coding_str: a string representing a coding
-    :param resources: a list of all resources used
+    :param resources: a list of all resources used, preferably as a `ResourceRegistry`
     :param compliance: whether to throw a ValueError or just a warning if a name space prefix is not found in the
     resources
     :return: a Coding object as specified in the coding string
@@ -1,6 +1,6 @@
 from typing import List, Union, Any, Literal
 
-from phenopacket_mapper.data_standards import CodeSystem, Date
+from phenopacket_mapper.data_standards import CodeSystem, Date, ResourceRegistry
 from phenopacket_mapper.utils.parsing import get_codesystem_by_namespace_prefx
 
 PRIMITIVE_DATATYPE_SYNONYMS = {
@@ -15,7 +15,7 @@ PRIMITIVE_DATATYPE_SYNONYMS = {
 
 def parse_data_type(
         type_str: str,
-        resources: List[CodeSystem],
+        resources: Union[ResourceRegistry, List[CodeSystem]],
         compliance: Literal['lenient', 'strict'] = 'lenient'
 ) -> List[Union[Any, CodeSystem, type, str]]:
     """Parses a string representing of one or multiple data types or code systems to a list of `type` in Python
@@ -42,6 +42,7 @@ def parse_data_type(
     if not type_str or not type_str.strip():  # checks for all sorts of empty strings, with however many white spaces
         return [Any]
 
+    resources = ResourceRegistry.of(resources)
     single_type_strings = type_str.split(',')
     types = []
     for single in single_type_strings:
@@ -55,7 +56,7 @@ def parse_data_type(
 
 def parse_single_data_type(
         type_str: str,
-        resources: List[CodeSystem],
+        resources: Union[ResourceRegistry, List[CodeSystem]],
         compliance: Literal['lenient', 'strict'] = 'lenient'
 ) -> Union[Any, CodeSystem, type, str]:
     """Parses a string representing a data type to the `type` in Python
@@ -0,0 +1,158 @@
+import gzip
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Union, Tuple, Optional, Dict, List, TextIO
+
+_OBO_PURL = "http://purl.obolibrary.org/obo/"
+_REPLACED_BY = (_OBO_PURL + "IAO_0100001", "replaced_by", "http://www.geneontology.org/formats/oboInOwl#replacedBy")
+_SYNONYM_PREDICATES = ('hasExactSynonym', 'hasRelatedSynonym', 'hasBroadSynonym', 'hasNarrowSynonym')
+
+
+@dataclass(slots=True, frozen=True)
+class OntologyTerm:
+    """A term of an ontology, as read from an ontology file
+
+    :ivar id: The CURIE of the term, e.g. `HP:0001250`
+    :ivar label: The label of the term
+    :ivar synonyms: The synonyms of the term
+    :ivar obsolete: Whether the term is obsolete
+    :ivar replaced_by: The id of the term replacing an obsolete term
+    :ivar parents: The ids of the terms this term `is_a`
+    """
+    id: str
+    label: str = field(default='')
+    synonyms: Tuple[str, ...] = field(default=())
+    obsolete: bool = field(default=False)
+    replaced_by: Optional[str] = field(default=None)
+    parents: Tuple[str, ...] = field(default=())
+
+
+def parse_ontology_file(path: Union[str, Path]) -> Iterator[OntologyTerm]:
+    """Parses the terms of an ontology file in the OBO format (`.obo`) or the OBO Graphs JSON format (`.json`)
+
+    Files compressed with gzip (e.g. `hp.obo.gz`) are decompressed while reading.
+
+    :param path: The path of the ontology file
+    :return: An iterator over the terms of the ontology
+    """
+    path = Path(path)
+    suffixes = path.suffixes[-2:] if path.suffix == '.gz' else path.suffixes[-1:]
+    file_format = suffixes[0] if suffixes else ''
+    if file_format not in ('.obo', '.json'):
+        raise ValueError(f"Ontology file {path} is not an .obo or .json file")
+
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        if file_format == '.obo':
+            yield from parse_obo(f)
+        else:
+            yield from parse_obographs(json.load(f))
+
+
+def parse_obo(lines: Union[TextIO, Iterator[str]]) -> Iterator[OntologyTerm]:
+    """Parses the `[Term]` stanzas of an ontology in the OBO format
+
+    >>> terms = parse_obo(['[Term]', 'id: HP:0000098', 'name: Tall stature', 'is_a: HP:0000002 ! Abnormality'])
+    >>> term = next(terms)
+    >>> term.id, term.label, term.parents
+    ('HP:0000098', 'Tall stature', ('HP:0000002',))
+
+    :param lines: The lines of the OBO file
+    :return: An iterator over the terms
+    """
+    stanza: Optional[Dict[str, List[str]]] = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith('['):
+            if stanza and 'id' in stanza:
+                yield _obo_term(stanza)
+            stanza = {} if line == '[Term]' else None
+        elif stanza is not None and line and not line.startswith('!'):
+            tag, _, value = line.partition(':')
+            stanza.setdefault(tag, []).append(value.strip())
+    if stanza and 'id' in stanza:
+        yield _obo_term(stanza)
+
+
+def _obo_term(stanza: Dict[str, List[str]]) -> OntologyTerm:
+    replaced_by = stanza.get('replaced_by')
+    return OntologyTerm(
+        id=stanza['id'][0],
+        label=_unescape(stanza['name'][0]) if 'name' in stanza else '',
+        synonyms=tuple(_obo_quoted(value) for value in stanza.get('synonym', ())),
+        obsolete=stanza.get('is_obsolete', ['false'])[0] == 'true',
+        replaced_by=_strip_comment(replaced_by[0]) if replaced_by else None,
+        parents=tuple(_strip_comment(value) for value in stanza.get('is_a', ())),
+    )
+
+
+def _obo_quoted(value: str) -> str:
+    """Returns the quoted string at the start of a value like `"Fits" EXACT [HPO:skoehler]`"""
+    if not value.startswith('"'):
+        return value
+    i = 1
+    while i < len(value) and value[i] != '"':
+        i += 2 if value[i] == '\\' else 1
+    return _unescape(value[1:i])
+
+
+def _unescape(value: str) -> str:
+    return value.replace('\\"', '"').replace('\\\\', '\\') if '\\' in value else value
+
+
+def _strip_comment(value: str) -> str:
+    """Returns the id of a value like `HP:0000001 {source="x"} ! All`"""
+    return value.split('!', 1)[0].split('{', 1)[0].strip()
+
+
+def parse_obographs(graphs: dict) -> Iterator[OntologyTerm]:
+    """Parses the classes of an ontology in the OBO Graphs JSON format, e.g. `hp.json`
+
+    IRIs are shortened to CURIEs, e.g. `http://purl.obolibrary.org/obo/HP_0001250` to `HP:0001250` and
+    `http://www.orpha.net/ORDO/Orphanet_558` to `Orphanet:558`.
+
+    :param graphs: The parsed JSON document
+    :return: An iterator over the terms
+    """
+    for graph in graphs.get('graphs', ()):
+        parents: Dict[str, List[str]] = {}
+        for edge in graph.get('edges', ()):
+            if edge.get('pred') == 'is_a':
+                parents.setdefault(edge['sub'], []).append(iri_to_curie(edge['obj']))
+
+        for node in graph.get('nodes', ()):
+            if node.get('type', 'CLASS') != 'CLASS':
+                continue
+            meta = node.get('meta', {})
+            properties = meta.get('basicPropertyValues', ())
+            replaced_by = next((p['val'] for p in properties if p.get('pred') in _REPLACED_BY), None)
+            synonyms = meta.get('synonyms', ())
+            yield OntologyTerm(
+                id=iri_to_curie(node['id']),
+                label=node.get('lbl', ''),
+                synonyms=tuple(s['val'] for s in synonyms if s.get('pred', 'hasExactSynonym') in _SYNONYM_PREDICATES),
+                obsolete=bool(meta.get('deprecated', False)),
+                replaced_by=iri_to_curie(replaced_by) if replaced_by is not None else None,
+                parents=tuple(parents.get(node['id'], ())),
+            )
+
+
+def iri_to_curie(iri: str) -> str:
+    """Shortens the IRI of an ontology term to a CURIE, leaving CURIEs as they are
+
+    >>> iri_to_curie('http://purl.obolibrary.org/obo/HP_0001250')
+    'HP:0001250'
+    >>> iri_to_curie('http://www.orpha.net/ORDO/Orphanet_558')
+    'Orphanet:558'
+    >>> iri_to_curie('HP:0001250')
+    'HP:0001250'
+
+    :param iri: The IRI
+    :return: The CURIE
+    """
+    if '://' not in iri:
+        return iri
+    local = iri.rstrip('/').rsplit('/', 1)[-1].rsplit('#', 1)[-1]
+    prefix, sep, local_id = local.partition('_')
+    return f"{prefix}:{local_id}" if sep else local
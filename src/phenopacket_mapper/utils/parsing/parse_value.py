@@ -1,12 +1,12 @@
 from typing import List, Literal, Union
 
-from phenopacket_mapper.data_standards import CodeSystem, Coding, CodeableConcept, Date
+from phenopacket_mapper.data_standards import CodeSystem, Coding, CodeableConcept, Date, ResourceRegistry
 from phenopacket_mapper.utils.parsing import parse_primitive_data_value, parse_date, parse_coding
 
 
 def parse_value(
         value_str: str,
-        resources: List[CodeSystem],
+        resources: Union[ResourceRegistry, List[CodeSystem]],
         compliance: Literal['strict', 'lenient'] = 'lenient'
 ) -> Union[Coding, CodeableConcept, CodeSystem, str, bool, int, float, Date, type]:
     """Parses a string representing a value to the appropriate type
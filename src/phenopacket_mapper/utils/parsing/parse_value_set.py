@@ -1,6 +1,6 @@
-from typing import List, Literal, Any
+from typing import List, Literal, Any, Union
 
-from phenopacket_mapper.data_standards import CodeSystem
+from phenopacket_mapper.data_standards import CodeSystem, ResourceRegistry
 from phenopacket_mapper.utils.parsing import parse_single_data_type, parse_value
 from phenopacket_mapper.data_standards.value_set import ValueSet
 
@@ -9,7 +9,7 @@ def parse_value_set(
         value_set_str: str,
         value_set_name: str = "",
         value_set_description: str = "",
-        resources: List[CodeSystem] = None,
+        resources: Union[ResourceRegistry, List[CodeSystem]] = None,
         compliance: Literal['strict', 'lenient'] = 'lenient',
 ) -> ValueSet:
     """Parses a value set from a string representation
@@ -32,8 +32,7 @@ def parse_value_set(
 
     value_set_str = value_set_str.strip()
 
-    if resources is None:
-        resources = []
+    resources = ResourceRegistry.of(resources)
 
     elements_str = value_set_str.split(",")
 
@@ -0,0 +1,20 @@
+"""Helpers for protobuf descriptors that work across the supported versions of protobuf"""
+
+from google.protobuf.descriptor import FieldDescriptor
+
+
+def is_repeated(field: FieldDescriptor) -> bool:
+    """Whether a field of a message is repeated
+
+    >>> from phenopackets.schema.v2 import Phenopacket
+    >>> is_repeated(Phenopacket.DESCRIPTOR.fields_by_name['diseases'])
+    True
+    >>> is_repeated(Phenopacket.DESCRIPTOR.fields_by_name['subject'])
+    False
+
+    :param field: The descriptor of the field
+    :return: True if the field is repeated
+    """
+    if hasattr(FieldDescriptor, 'is_repeated'):  # `label` is deprecated since protobuf 6
+        return field.is_repeated
+    return field.label == FieldDescriptor.LABEL_REPEATED
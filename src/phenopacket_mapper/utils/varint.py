@@ -0,0 +1,71 @@
+"""Base 128 varints, as used by protobuf to prefix length-delimited records"""
+
+from typing import Tuple, Optional, BinaryIO
+
+
+def encode_varint(value: int) -> bytes:
+    """Encodes a non-negative integer as a base 128 varint
+
+    >>> encode_varint(1)
+    b'\\x01'
+    >>> encode_varint(300)
+    b'\\xac\\x02'
+
+    :param value: The integer to encode
+    :return: The varint, 7 bits per byte, least significant group first
+    """
+    if value < 0:
+        raise ValueError(f"Only non-negative integers can be encoded as varint, not {value}")
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def decode_varint(buffer: bytes, pos: int = 0) -> Tuple[int, int]:
+    """Decodes a base 128 varint from a buffer
+
+    >>> decode_varint(b'\\xac\\x02')
+    (300, 2)
+
+    :param buffer: The buffer holding the varint
+    :param pos: Position of the varint in the buffer
+    :return: The decoded integer and the position after the varint
+    """
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(buffer):
+            raise ValueError("Truncated varint")
+        b = buffer[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+        if shift >= 64:
+            raise ValueError("Varint is too long")
+
+
+def read_varint(stream: BinaryIO) -> Optional[int]:
+    """Reads a base 128 varint from a binary stream
+
+    :param stream: The stream to read from
+    :return: The decoded integer, or `None` if the stream ends before the varint
+    """
+    result = 0
+    shift = 0
+    while True:
+        b = stream.read(1)
+        if not b:
+            if shift == 0:
+                return None
+            raise ValueError("Truncated varint")
+        result |= (b[0] & 0x7F) << shift
+        if not b[0] & 0x80:
+            return result
+        shift += 7
+        if shift >= 64:
+            raise ValueError("Varint is too long")
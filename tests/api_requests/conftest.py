@@ -0,0 +1,72 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+HPO_LABELS = {"0000098": "Tall stature", "0001250": "Seizure"}
+ORPHA_LABELS = {"95157": "Acute hepatic porphyria"}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Stand-in for the HPO and Orphanet APIs
+
+    HPO codes of 7 digits starting with 0 exist, unknown ones are labelled `Term <code>`. The server records the path of
+    each request, answers after `delay` seconds, and with status 503 while `failures[path]` is positive.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            fail = server.failures[self.path] > 0
+            server.failures[self.path] -= 1
+        try:
+            time.sleep(server.delay)
+            if fail:
+                self._send(503, "text/plain", "Service unavailable")
+            elif self.path.startswith("/api/hp/terms/HP:0") and len(self.path[17:]) == 7:
+                code = self.path[17:]
+                body = json.dumps({"id": "HP:" + code, "name": HPO_LABELS.get(code, f"Term {code}")})
+                self._send(200, "application/json", body)
+            elif self.path.startswith("/en/disease/detail/") and self.path[19:] in ORPHA_LABELS:
+                title = ORPHA_LABELS[self.path[19:]]
+                self._send(200, "text/html", f"<html><head><title>Orphanet: {title}</title></head></html>")
+            else:
+                self._send(404, "text/plain", "Not found")
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, status: int, content_type: str, body: str):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.failures = Counter()
+    httpd.delay = 0.0
+    httpd.active = 0
+    httpd.max_active = 0
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
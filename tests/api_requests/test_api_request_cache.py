@@ -0,0 +1,143 @@
+from dataclasses import replace
+
+import pytest
+
+from phenopacket_mapper.api_requests import APIRequestCache, APIRequestSuperClass, HPOAPIRequest, OrphaAPIRequest
+from phenopacket_mapper.data_standards import Coding, HPO, ORDO
+
+
+def _hpo(server, **kwargs):
+    return HPOAPIRequest(api_base_url=f"http://127.0.0.1:{server.server_port}/api/hp/terms/HP:", **kwargs)
+
+
+def _orpha(server, **kwargs):
+    return OrphaAPIRequest(api_base_url=f"http://127.0.0.1:{server.server_port}/en/disease/detail/", **kwargs)
+
+
+def test_without_cache_every_get_is_requested(server):
+    hpo = _hpo(server)
+    assert hpo.get("0000098") == Coding(system=HPO, code="0000098", display="Tall stature")
+    assert hpo.get("0000098").display == "Tall stature"
+    assert len(server.requests) == 2
+
+
+def test_memory_cache(server):
+    cache = APIRequestCache()
+    hpo = _hpo(server, cache=cache)
+    orpha = _orpha(server, cache=cache)
+
+    for _ in range(3):
+        assert hpo.get("0000098").display == "Tall stature"
+        assert orpha.get(95157) == Coding(system=ORDO, code="95157", display="Acute hepatic porphyria")
+
+    assert server.requests == ["/api/hp/terms/HP:0000098", "/en/disease/detail/95157"]
+    assert (cache.hits, cache.misses) == (4, 2)
+    assert len(cache) == 2
+
+
+def test_persistent_cache_across_instances(server, tmp_path):
+    path = tmp_path / "cache" / "api_requests.sqlite"
+    with APIRequestCache(path) as cache:
+        assert _hpo(server, cache=cache).get("0001250").display == "Seizure"
+
+    with APIRequestCache(path) as cache:
+        coding = _hpo(server, cache=cache).get("0001250")
+        assert coding == Coding(system=HPO, code="0001250", display="Seizure")
+        assert cache.hits == 1
+    assert len(server.requests) == 1
+
+
+def test_version_is_part_of_key(server):
+    cache = APIRequestCache()
+    _hpo(server, cache=cache).get("0000098")
+    _hpo(server, cache=cache, hpo_code_system=replace(HPO, version="2024-01-01")).get("0000098")
+    _hpo(server, cache=cache, hpo_code_system=replace(HPO, version="2024-01-01")).get("0000098")
+    assert len(server.requests) == 2
+
+
+def test_ttl(server, tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr("phenopacket_mapper.api_requests.cache.time.time", lambda: now[0])
+    cache = APIRequestCache(tmp_path / "cache.sqlite", ttl=60)
+    hpo = _hpo(server, cache=cache)
+
+    hpo.get("0000098")
+    now[0] += 30
+    hpo.get("0000098")
+    assert len(server.requests) == 1
+
+    now[0] += 31
+    hpo.get("0000098")
+    assert len(server.requests) == 2
+
+    hpo.get("0001250")
+    now[0] += 61
+    assert cache.expire() == 2
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_lru_eviction():
+    cache = APIRequestCache(max_entries=2)
+    cache.put("HP", "1", "a", "A")
+    cache.put("HP", "1", "b", "B")
+    assert cache.get("HP", "1", "a") == "A"
+    cache.put("HP", "1", "c", "C")
+    assert cache.get("HP", "1", "b") is None
+    assert cache.get_many("HP", "1", ["a", "c"]) == {"a": "A", "c": "C"}
+
+
+def test_lru_eviction_keeps_persistent_entries(tmp_path):
+    with APIRequestCache(tmp_path / "cache.sqlite", max_entries=1) as cache:
+        cache.put("HP", "1", "a", "A")
+        cache.put("HP", "1", "b", "B")
+        assert cache.get("HP", "1", "a") == "A"
+        assert len(cache) == 2
+
+
+def test_get_many_persistent_entries_in_batches(tmp_path):
+    with APIRequestCache(tmp_path / "cache.sqlite", max_entries=0) as cache:
+        cache.put_many("HP", "1", {str(i): f"Term {i}" for i in range(1200)})
+        cache.put("HP", "2", "0", "Other version")
+        statements = []
+        cache._connection.set_trace_callback(statements.append)
+        found = cache.get_many("HP", "1", [str(i) for i in range(0, 2400, 2)])
+        assert found == {str(i): f"Term {i}" for i in range(0, 1200, 2)}
+        assert len(statements) == 3
+        assert (cache.hits, cache.misses) == (600, 600)
+
+
+def test_clear_namespace(tmp_path):
+    with APIRequestCache(tmp_path / "cache.sqlite") as cache:
+        cache.put("HP", "1", "a", "A")
+        cache.put("ORPHA", "1", "a", "B")
+        cache.clear("HP")
+        assert cache.get("HP", "1", "a") is None
+        assert cache.get("ORPHA", "1", "a") == "B"
+        cache.clear()
+        assert len(cache) == 0
+
+
+def test_max_entries_must_not_be_negative():
+    with pytest.raises(ValueError):
+        APIRequestCache(max_entries=-1)
+
+
+def test_subclass_without_super_init():
+    class Resolver(APIRequestSuperClass):
+        def __init__(self):
+            self.requests = []
+
+        def _fetch(self, concept_id):
+            self.requests.append(str(concept_id))
+            return Coding(system=HPO, code=str(concept_id), display=f"Term {concept_id}")
+
+    resolver = Resolver()
+    assert resolver.get(1).display == "Term 1"
+    assert resolver.get_many([1, 2, 2]) == {"1": Coding(system=HPO, code="1"), "2": Coding(system=HPO, code="2")}
+    assert resolver.requests == ["1", "1", "2"]
+
+    resolver.cache = APIRequestCache()
+    resolver.get_many([3, 3])
+    assert resolver.get(3).display == "Term 3"
+    assert resolver.requests == ["1", "1", "2", "3"]
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from phenopacket_mapper.api_requests import APIRequestCache, HPOAPIRequest, RateLimiter, create_session, get
+from phenopacket_mapper.data_standards import Coding, HPO
+
+
+def _hpo(server, **kwargs):
+    kwargs.setdefault("session", create_session(backoff_factor=0))
+    return HPOAPIRequest(api_base_url=f"http://127.0.0.1:{server.server_port}/api/hp/terms/HP:", **kwargs)
+
+
+def test_get_many(server):
+    codings = _hpo(server).get_many(["0000098", "0001250", "0000001"])
+    assert list(codings) == ["0000098", "0001250", "0000001"]
+    assert codings["0000098"] == Coding(system=HPO, code="0000098", display="Tall stature")
+    assert codings["0000001"].display == "Term 0000001"
+
+
+def test_get_many_deduplicates(server):
+    codes = [f"{i:07d}" for i in range(20)]
+    codings = _hpo(server).get_many(codes + codes[::-1] + codes)
+    assert list(codings) == codes
+    assert sorted(server.requests) == sorted(f"/api/hp/terms/HP:{code}" for code in codes)
+
+
+def test_get_many_is_concurrent(server):
+    server.delay = 0.1
+    codes = [f"{i:07d}" for i in range(16)]
+    start = time.perf_counter()
+    codings = _hpo(server, max_workers=8).get_many(codes)
+    elapsed = time.perf_counter() - start
+    assert len(codings) == 16
+    assert 1 < server.max_active <= 8
+    assert elapsed < 16 * 0.1
+
+
+def test_get_many_deduplicates_in_flight_requests(server):
+    server.delay = 0.2
+    hpo = _hpo(server)
+    codes = [f"{i:07d}" for i in range(4)]
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hpo.get_many(codes))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 3 and all(list(r) == codes for r in results)
+    assert len(server.requests) == 4
+
+
+def test_get_many_uses_cache(server, tmp_path):
+    with APIRequestCache(tmp_path / "cache.sqlite") as cache:
+        _hpo(server, cache=cache).get_many(["0000098", "0001250"])
+    with APIRequestCache(tmp_path / "cache.sqlite") as cache:
+        codings = _hpo(server, cache=cache).get_many(["0001250", "0000098", "0000003"])
+        assert list(codings) == ["0001250", "0000098", "0000003"]
+        assert codings["0001250"].display == "Seizure"
+        assert cache.hits == 2
+    assert len(server.requests) == 3
+
+
+def test_get_many_retries(server):
+    server.failures["/api/hp/terms/HP:0000098"] = 2
+    codings = _hpo(server).get_many(["0000098"])
+    assert codings["0000098"].display == "Tall stature"
+    assert server.requests == ["/api/hp/terms/HP:0000098"] * 3
+
+
+def test_get_many_lenient(server):
+    server.failures["/api/hp/terms/HP:0000098"] = 10
+    errors = []
+    with pytest.warns(UserWarning, match="HP:9999999"):
+        codings = _hpo(server, session=create_session(retries=1, backoff_factor=0)).get_many(
+            ["0000098", "9999999", "0001250"], errors=errors)
+    assert list(codings) == ["0001250"]
+    assert [code for code, _ in errors] == ["0000098", "9999999"]
+
+
+def test_get_many_strict(server):
+    with pytest.raises(ValueError, match="HP:9999999"):
+        _hpo(server).get_many(["0000098", "9999999"], compliance="strict")
+
+
+def test_get_many_rate_limit(server):
+    codes = [f"{i:07d}" for i in range(6)]
+    start = time.perf_counter()
+    _hpo(server, rate_limit=20).get_many(codes)
+    assert time.perf_counter() - start >= 5 / 20
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(100)
+    start = time.perf_counter()
+    for _ in range(11):
+        limiter.wait()
+    assert time.perf_counter() - start >= 0.1
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+
+def test_max_workers_must_be_positive():
+    with pytest.raises(ValueError):
+        HPOAPIRequest(max_workers=0)
+
+
+def test_get_raises_for_error_status(server):
+    url = f"http://127.0.0.1:{server.server_port}"
+    session = create_session(retries=1, backoff_factor=0)
+    assert get(url + "/api/hp/terms/HP:0001250", json=True, session=session)["name"] == "Seizure"
+    with pytest.raises(requests.HTTPError) as e:
+        get(url + "/api/hp/terms/HP:9999999", session=session)
+    assert e.value.response.status_code == 404
+
+    server.failures["/api/hp/terms/HP:0000098"] = 2
+    with pytest.raises(requests.HTTPError) as e:
+        get(url + "/api/hp/terms/HP:0000098", session=session)
+    assert e.value.response.status_code == 503
+    assert server.requests[-2:] == ["/api/hp/terms/HP:0000098"] * 2
@@ -0,0 +1,134 @@
+import os
+
+import pytest
+
+from phenopacket_mapper.api_requests import APIRequestCache, LocalOntologyRequest, OntologyIndex
+from phenopacket_mapper.data_standards import Coding, HPO, ORDO
+from phenopacket_mapper.utils.parsing import OntologyTerm
+
+OBO = """format-version: 1.2
+
+[Term]
+id: HP:0000001
+name: All
+
+[Term]
+id: HP:0001250
+name: Seizure
+synonym: "Epileptic seizure" EXACT []
+is_a: HP:0000001 ! All
+
+[Term]
+id: HP:0000098
+name: Tall stature
+is_a: HP:0000001 ! All
+
+[Term]
+id: HP:0000006
+name: obsolete Autosomal dominant inheritance
+is_obsolete: true
+replaced_by: HP:0000007
+"""
+
+
+@pytest.fixture
+def hp_obo(tmp_path):
+    path = tmp_path / "hp.obo"
+    path.write_text(OBO, encoding="utf-8")
+    return path
+
+
+def test_get(hp_obo):
+    hpo = LocalOntologyRequest(hp_obo, HPO)
+    assert hpo.get("0001250") == Coding(system=HPO, code="0001250", display="Seizure")
+    assert hpo.get("HP:0000098") == Coding(system=HPO, code="0000098", display="Tall stature")
+    assert hpo.get("HP:0000098").curie == "HP:0000098"
+    with pytest.raises(KeyError):
+        hpo.get("9999999")
+    hpo.close()
+
+
+def test_term(hp_obo):
+    hpo = LocalOntologyRequest(hp_obo, HPO)
+    assert hpo.term("0001250") == OntologyTerm(id="HP:0001250", label="Seizure", synonyms=("Epileptic seizure",),
+                                               parents=("HP:0000001",))
+    obsolete = hpo.term("0000006")
+    assert obsolete.obsolete and obsolete.replaced_by == "HP:0000007"
+    hpo.close()
+
+
+def test_get_many(hp_obo):
+    hpo = LocalOntologyRequest(hp_obo, HPO)
+    errors = []
+    with pytest.warns(UserWarning):
+        codings = hpo.get_many(["0000098", "0001250", "0000098", "9999999"], errors=errors)
+    assert list(codings) == ["0000098", "0001250"]
+    assert [code for code, _ in errors] == ["9999999"]
+    with pytest.raises(ValueError):
+        hpo.get_many(["9999999"], compliance="strict")
+    hpo.close()
+
+
+def test_get_prefixed_id_is_cached_without_prefix(hp_obo):
+    cache = APIRequestCache()
+    hpo = LocalOntologyRequest(hp_obo, HPO, cache=cache)
+    assert hpo.get("HP:0001250") == Coding(system=HPO, code="0001250", display="Seizure")
+    assert cache.get(HPO.namespace_prefix, HPO.version, "0001250") == "Seizure"
+    assert cache.get(HPO.namespace_prefix, HPO.version, "HP:0001250") is None
+    assert hpo.get_many(["HP:0001250"])["HP:0001250"].code == "0001250"
+    hpo.close()
+
+
+def test_id_prefix(tmp_path):
+    path = tmp_path / "ordo.obo"
+    path.write_text("[Term]\nid: Orphanet:95157\nname: Acute hepatic porphyria\n", encoding="utf-8")
+    ordo = LocalOntologyRequest(path, ORDO, id_prefix="Orphanet")
+    assert ordo.get(95157) == Coding(system=ORDO, code="95157", display="Acute hepatic porphyria")
+    ordo.close()
+
+
+def test_index_is_reused(hp_obo, monkeypatch):
+    LocalOntologyRequest(hp_obo, HPO).close()
+    index_path = hp_obo.with_name("hp.obo.pmoi")
+    assert index_path.exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the ontology file was parsed again")
+
+    monkeypatch.setattr("phenopacket_mapper.api_requests.ontology_index.parse_ontology_file", fail)
+    hpo = LocalOntologyRequest(hp_obo, HPO)
+    assert hpo.get("0001250").display == "Seizure"
+    hpo.close()
+
+
+def test_index_is_rebuilt_when_ontology_changes(hp_obo, tmp_path):
+    index_path = tmp_path / "index" / "hp.pmoi"
+    index_path.parent.mkdir()
+    LocalOntologyRequest(hp_obo, HPO, index_path=index_path).close()
+
+    hp_obo.write_text(OBO.replace("name: Seizure", "name: Seizures"), encoding="utf-8")
+    stat = hp_obo.stat()
+    os.utime(hp_obo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    hpo = LocalOntologyRequest(hp_obo, HPO, index_path=index_path)
+    assert hpo.get("0001250").display == "Seizures"
+    hpo.close()
+
+
+def test_invalid_index_is_rebuilt(hp_obo):
+    hp_obo.with_name("hp.obo.pmoi").write_bytes(b"not an index")
+    with OntologyIndex.open(hp_obo) as index:
+        assert len(index) == 4
+
+
+def test_ontology_index(tmp_path):
+    terms = [OntologyTerm(id=f"HP:{i:07d}", label=f"Term {i}", parents=(f"HP:{i // 2:07d}",)) for i in range(1000)]
+    with OntologyIndex.build(reversed(terms), tmp_path / "terms.pmoi") as index:
+        assert len(index) == 1000
+        assert list(index) == terms
+        assert all(index.get(term.id) == term for term in terms[::37])
+        assert index.label("HP:0000500") == "Term 500"
+        assert "HP:0001000" not in index and index.get("HP:0001000") is None
+        assert index.label("A") is None and index.label("Z") is None
+
+    with OntologyIndex.build([], tmp_path / "empty.pmoi") as index:
+        assert len(index) == 0 and index.get("HP:0000001") is None
@@ -1,6 +1,6 @@
 import pytest
 
-from phenopacket_mapper.data_standards import DataModel, DataField
+from phenopacket_mapper.data_standards import DataModel, DataField, DataModelInstance, DataFieldValue, DataSet
 from phenopacket_mapper.data_standards.value_set import ValueSet
 
 
@@ -20,3 +20,43 @@ def test_get_data_field_by_id(data_model):
     assert data_model.get_field('date_of_birth').name == 'Date of Birth'
     assert data_model._12pseudonym_2.name == '%^&#12pseudonym!2'
     assert data_model.get_field('_12pseudonym_2').name == '%^&#12pseudonym!2'
+
+
+def test_get_data_field_position(data_model):
+    assert data_model.get_field_position('field_0') == 0
+    assert data_model.get_field_position('_12pseudonym_2') == 2
+    assert data_model.get_field_position('unknown') is None
+    with pytest.raises(AttributeError):
+        _ = data_model.unknown
+
+
+def test_data_model_instance_indexed_access(data_model):
+    instance = DataModelInstance(row_no=0, data_model=data_model, values=[
+        DataFieldValue(row_no=0, field=data_model.date_of_birth, value='2000-01-01'),
+        DataFieldValue(row_no=0, field=data_model.field_0, value='a'),
+    ])
+    assert instance.field_0.value == 'a'
+    assert instance.date_of_birth.value == '2000-01-01'
+    assert [v.value if v else None for v in instance.get_values_by_position()] == ['a', '2000-01-01', None]
+    with pytest.raises(AttributeError):
+        _ = instance._12pseudonym_2
+
+    instance.values.append(DataFieldValue(row_no=0, field=data_model._12pseudonym_2, value='p'))
+    assert instance._12pseudonym_2.value == 'p'
+
+
+def test_data_model_instance_value_replaced(data_model):
+    instance = DataModelInstance(row_no=0, data_model=data_model, values=[
+        DataFieldValue(row_no=0, field=data_model.field_0, value='a'),
+        DataFieldValue(row_no=0, field=data_model.date_of_birth, value='2000-01-01'),
+    ])
+    assert instance.field_0.value == 'a'
+
+    instance.values[0] = DataFieldValue(row_no=0, field=data_model.field_0, value='b')
+    assert instance.field_0.value == 'b'
+    assert instance.get_values_by_position()[0].value == 'b'
+    assert DataSet(data_model=data_model, data=[instance]).data_frame['field_0'].tolist() == ['b']
+
+    instance.values[1] = DataFieldValue(row_no=0, field=data_model._12pseudonym_2, value='p')
+    assert instance._12pseudonym_2.value == 'p'
+    assert not hasattr(instance, 'date_of_birth')
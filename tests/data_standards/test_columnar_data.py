@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from phenopacket_mapper.data_standards import DataModel, DataField, ValueSet, ColumnarData, DataColumn, \
+    DataModelInstance, DataFieldValue
+
+
+@pytest.fixture
+def data_model():
+    return DataModel(data_model_name="test data model", resources=[], fields=(
+        DataField(name="Pseudonym", specification=str),
+        DataField(name="Age", specification=int, required=False),
+        DataField(name="Weight", specification=float, required=False),
+    ))
+
+
+@pytest.mark.parametrize(
+    ('values', 'expected_dtype'),
+    [
+        ([1, None, 3], np.int64),
+        ([1.5, 2.0, None], np.float64),
+        ([True, None, False], np.bool_),
+        (['a', None, 'c'], None),
+        ([1, 'b', None], None),
+        ([2 ** 70, None, 1], None),
+    ]
+)
+def test_data_column_from_values(values, expected_dtype):
+    column = DataColumn.from_values(values)
+    if expected_dtype is None:
+        assert isinstance(column.values, list)
+    else:
+        assert column.values.dtype == expected_dtype
+    assert column.present.tolist() == [v is not None for v in values]
+    assert column.tolist() == values
+    assert column[1:].tolist() == values[1:]
+
+
+def test_data_column_present_none():
+    column = DataColumn.from_values([None, 'a'], present=np.array([True, True]))
+    assert column.present.tolist() == [True, True]
+    with pytest.raises(ValueError):
+        DataColumn.from_values([None, 'a'], present=np.array([True]))
+
+
+def test_columnar_data_views(data_model):
+    data = ColumnarData(
+        data_model=data_model,
+        columns=[DataColumn.from_values(['p0', 'p1']), DataColumn.from_values([None, 41]), None],
+        row_nos=range(10, 12),
+    )
+    assert len(data) == 2
+    assert data == [
+        DataModelInstance(row_no=10, data_model=data_model, values=[
+            DataFieldValue(row_no=10, field=data_model.pseudonym, value='p0')]),
+        DataModelInstance(row_no=11, data_model=data_model, values=[
+            DataFieldValue(row_no=11, field=data_model.pseudonym, value='p1'),
+            DataFieldValue(row_no=11, field=data_model.age, value=41)]),
+    ]
+    assert data[-1].age.value == 41
+    assert type(data[1].age.value) is int
+    assert data[1:].row_nos == range(11, 12)
+    with pytest.raises(AttributeError):
+        _ = data[0].age
+    with pytest.raises(IndexError):
+        _ = data[2]
+
+
+def test_columnar_data_column_length(data_model):
+    with pytest.raises(ValueError):
+        ColumnarData(data_model=data_model, columns=[DataColumn.from_values(['p0']), None, None], row_nos=range(2))
+    with pytest.raises(ValueError):
+        ColumnarData(data_model=data_model, columns=[None], row_nos=range(2))
@@ -104,3 +104,15 @@ def test_invalid_values(
     if raises_exc:
         with pytest.raises(exc):
             pm.data_standards.Date(year, month, day, hour, minute, second)
+
+
+@pytest.mark.parametrize(
+    ('date', 'expected'),
+    [
+        (pm.data_standards.Date(2024, 9, 5, 11, 38, 19), datetime.datetime(2024, 9, 5, 11, 38, 19)),
+        (pm.data_standards.Date(2024), datetime.datetime(2024, 1, 1)),
+        (pm.data_standards.Date(), datetime.datetime(1, 1, 1)),
+    ]
+)
+def test_protobuf_timestamp(date, expected):
+    assert date.protobuf_timestamp().ToDatetime() == expected
@@ -0,0 +1,137 @@
+from collections import Counter
+from dataclasses import replace
+
+import phenopackets
+import pytest
+
+from phenopacket_mapper import PhenopacketMapper
+from phenopacket_mapper.api_requests import APIRequestSuperClass
+from phenopacket_mapper.data_standards import DataModel, DataField, ValueSet, ColumnarData, DataColumn, \
+    DataModelInstance, DataFieldValue, DataSet, Coding, CodeableConcept, HPO, ORDO, OMIM
+from phenopacket_mapper.mapping import PhenopacketBuildingBlock
+
+
+class FakeResolver(APIRequestSuperClass):
+    def __init__(self, code_system, labels):
+        super().__init__(code_system)
+        self.labels = labels
+        self.requests = Counter()
+
+    def _fetch(self, concept_id):
+        self.requests[str(concept_id)] += 1
+        return Coding(system=self.code_system, code=str(concept_id), display=self.labels[str(concept_id)])
+
+
+@pytest.fixture
+def data_model():
+    return DataModel(data_model_name="test data model", resources=[HPO, ORDO, OMIM], fields=(
+        DataField(name="Pseudonym", specification=str),
+        DataField(name="Phenotype", specification=ValueSet([HPO]), required=False),
+        DataField(name="Diagnosis", specification=ValueSet([CodeableConcept]), required=False),
+        DataField(name="Age", specification=int, required=False),
+    ))
+
+
+def _rows(data_model):
+    phenotypes = ["0000098", "0001250", None, "0000098", "0001250", "0000098"]
+    rows = []
+    for i, phenotype in enumerate(phenotypes):
+        values = [DataFieldValue(row_no=i, field=data_model.pseudonym, value=f"p{i}"),
+                  DataFieldValue(row_no=i, field=data_model.age, value=40 + i)]
+        if phenotype is not None:
+            values.append(DataFieldValue(row_no=i, field=data_model.phenotype,
+                                         value=Coding(system=HPO, code=phenotype)))
+        if i % 2 == 0:
+            values.append(DataFieldValue(row_no=i, field=data_model.diagnosis, value=CodeableConcept(coding=[
+                Coding(system=ORDO, code="95157"), Coding(system=OMIM, code="176000")])))
+        rows.append(DataModelInstance(row_no=i, data_model=data_model, values=values))
+    return rows
+
+
+def _resolvers():
+    return [FakeResolver(HPO, {"0000098": "Tall stature", "0001250": "Seizure"}),
+            FakeResolver(ORDO, {"95157": "Acute hepatic porphyria"})]
+
+
+def _columnar(data_model):
+    rows = _rows(data_model)
+    columns = []
+    for f in data_model.fields:
+        values = [next((v.value for v in row.values if v.field.id == f.id), None) for row in rows]
+        columns.append(DataColumn.from_values(values))
+    return ColumnarData(data_model=data_model, columns=columns, row_nos=range(len(rows)))
+
+
+@pytest.mark.parametrize('storage', ['rows', 'columnar'])
+def test_enrich_codings(data_model, storage):
+    data = _rows(data_model) if storage == 'rows' else _columnar(data_model)
+    data_set = DataSet(data_model=data_model, data=data)
+    hpo, ordo = _resolvers()
+
+    assert data_set.enrich_codings([hpo, ordo]) == 5 + 3
+    assert hpo.requests == Counter({"0000098": 1, "0001250": 1})
+    assert ordo.requests == Counter({"95157": 1})
+
+    instances = list(data_set)
+    assert [i.phenotype.value.display for i in instances if hasattr(i, 'phenotype')] == [
+        "Tall stature", "Seizure", "Tall stature", "Seizure", "Tall stature"]
+    diagnosis = instances[0].diagnosis.value
+    assert [c.display for c in diagnosis.coding] == ["Acute hepatic porphyria", ""]
+    assert instances[1].age.value == 41
+    # cells with the same code share the enriched coding
+    assert instances[0].phenotype.value is instances[3].phenotype.value
+    assert diagnosis.coding[0] is instances[2].diagnosis.value.coding[0]
+
+    # all codings that can be resolved have a display now
+    assert data_set.enrich_codings([hpo, ordo]) == 0
+    assert sum(hpo.requests.values()) == 2
+
+
+def test_enrich_codings_fields_and_overwrite(data_model):
+    data_set = DataSet(data_model=data_model, data=_rows(data_model))
+    hpo, ordo = _resolvers()
+    assert data_set.enrich_codings([hpo, ordo], fields=[data_model.diagnosis]) == 3
+    assert not hpo.requests
+
+    data_set.enrich_codings(hpo)
+    hpo.labels["0000098"] = "Tall"
+    assert data_set.enrich_codings(hpo, fields="phenotype") == 0
+    assert data_set.enrich_codings(hpo, fields="phenotype", overwrite=True) == 3
+    assert data_set.data[0].phenotype.value.display == "Tall"
+
+
+def test_enrich_codings_unresolved(data_model):
+    data_set = DataSet(data_model=data_model, data=_rows(data_model))
+    hpo = FakeResolver(HPO, {"0000098": "Tall stature"})
+    with pytest.warns(UserWarning, match="0001250"):
+        assert data_set.enrich_codings(hpo) == 3
+    assert data_set.data[1].phenotype.value.display == ""
+    with pytest.raises(ValueError):
+        data_set.enrich_codings(hpo, compliance='strict')
+
+
+def test_enrich_codings_equal_code_systems(data_model):
+    rows = _rows(data_model)
+    rows[0].values.append(DataFieldValue(row_no=0, field=data_model.diagnosis, value=CodeableConcept(coding=[
+        Coding(system="ORPHA", code="95157")])))
+    rows[1].phenotype.value = Coding(system=replace(HPO), code="0001250")
+    data_set = DataSet(data_model=data_model, data=rows)
+    hpo, ordo = _resolvers()
+
+    assert data_set.enrich_codings([hpo, ordo]) == 5 + 3
+    assert data_set.data[1].phenotype.value.display == "Seizure"
+    assert data_set.data[0].values[-1].value.coding[0].display == ""
+    assert hpo.requests == Counter({"0000098": 1, "0001250": 1})
+
+
+def test_map_enriched_data_set(data_model):
+    data_set = DataSet(data_model=data_model, data=_rows(data_model))
+    data_set.enrich_codings(_resolvers())
+    mapper = PhenopacketMapper(
+        data_model=data_model,
+        id=data_model.pseudonym,
+        phenotypic_features=[PhenopacketBuildingBlock(phenopackets.PhenotypicFeature, type=data_model.phenotype)],
+    )
+
+    phenopacket = mapper.map(data_set)[1]
+    assert phenopacket.phenotypic_features[0].type == phenopackets.OntologyClass(id="HP:0001250", label="Seizure")
@@ -0,0 +1,112 @@
+import pytest
+
+from phenopacket_mapper.data_standards import OntologyHierarchy, OntologySubtree, ValueSet, DataField, \
+    DataFieldValue, Coding, CodeableConcept, HPO, ORDO
+from phenopacket_mapper.utils.parsing import compile_value_parser
+
+OBO = """format-version: 1.2
+
+[Term]
+id: HP:0000001
+name: All
+
+[Term]
+id: HP:0000118
+name: Phenotypic abnormality
+is_a: HP:0000001 ! All
+
+[Term]
+id: HP:0000707
+name: Abnormality of the nervous system
+is_a: HP:0000118 ! Phenotypic abnormality
+
+[Term]
+id: HP:0012638
+name: Abnormal nervous system physiology
+is_a: HP:0000707 ! Abnormality of the nervous system
+
+[Term]
+id: HP:0001250
+name: Seizure
+is_a: HP:0000707 ! Abnormality of the nervous system
+is_a: HP:0012638 ! Abnormal nervous system physiology
+
+[Term]
+id: HP:0000005
+name: Mode of inheritance
+is_a: HP:0000001 ! All
+
+[Term]
+id: HP:0000006
+name: Autosomal dominant inheritance
+is_a: HP:0000005 ! Mode of inheritance
+
+[Term]
+id: HP:0000007
+name: obsolete term
+is_obsolete: true
+is_a: HP:0000118
+"""
+
+
+@pytest.fixture
+def hierarchy(tmp_path):
+    path = tmp_path / "hp.obo"
+    path.write_text(OBO, encoding="utf-8")
+    return OntologyHierarchy.from_file(path)
+
+
+def test_hierarchy(hierarchy):
+    assert len(hierarchy) == 7
+    assert "HP:0000007" not in hierarchy
+    assert hierarchy.parents("HP:0001250") == ("HP:0000707", "HP:0012638")
+    assert set(hierarchy.children("HP:0000707")) == {"HP:0012638", "HP:0001250"}
+    assert hierarchy.descendants("HP:0000118") == {"HP:0000118", "HP:0000707", "HP:0012638", "HP:0001250"}
+    assert hierarchy.descendants("HP:0000118") is hierarchy.descendants("HP:0000118")
+    assert hierarchy.is_descendant("HP:0001250", "HP:0000118")
+    assert not hierarchy.is_descendant("HP:0000006", "HP:0000118")
+
+
+def test_ontology_subtree(hierarchy):
+    subtree = OntologySubtree(HPO, "HP:0000118", hierarchy)
+    assert subtree.codes == {"0000118", "0000707", "0012638", "0001250"}
+    assert Coding(system=HPO, code="0001250") in subtree
+    assert Coding(system=HPO, code="0000006") not in subtree
+    assert Coding(system=ORDO, code="0001250") not in subtree
+    assert CodeableConcept(coding=[Coding(system=ORDO, code="1"), Coding(system=HPO, code="0000707")]) in subtree
+    assert "HP:0001250" not in subtree
+
+    assert Coding(system=HPO, code="0000118") not in OntologySubtree(HPO, "HP:0000118", hierarchy,
+                                                                     include_root=False)
+    with pytest.raises(ValueError):
+        OntologySubtree(HPO, "HP:9999999", hierarchy)
+
+
+def test_ontology_subtree_id_prefix():
+    hierarchy = OntologyHierarchy({"Orphanet:68367": (), "Orphanet:558": ("Orphanet:68367",)})
+    subtree = OntologySubtree(ORDO, "Orphanet:68367", hierarchy, id_prefix="Orphanet")
+    assert Coding(system=ORDO, code="558") in subtree
+
+
+def test_value_set(hierarchy):
+    value_set = ValueSet([OntologySubtree(HPO, "HP:0000118", hierarchy), "unknown"])
+    assert Coding(system=HPO, code="0001250") in value_set
+    assert Coding(system=HPO, code="0000006") not in value_set
+    assert "unknown" in value_set
+    assert value_set.resources == [HPO]
+    assert len(value_set.extend("extended", ValueSet([value_set.elements[0]])).elements) == 2
+    # subtrees are compared by identity, their hierarchies could come from different versions of the ontology
+    assert len(value_set.extend("extended", ValueSet([OntologySubtree(HPO, "HP:0000118", hierarchy)])).elements) == 3
+
+
+def test_data_field_value_validate(hierarchy):
+    data_field = DataField(name="Phenotype", specification=ValueSet([OntologySubtree(HPO, "HP:0000118", hierarchy)]))
+    assert DataFieldValue(row_no=0, field=data_field, value=Coding(system=HPO, code="0001250")).validate()
+    with pytest.warns(UserWarning):
+        assert not DataFieldValue(row_no=1, field=data_field, value=Coding(system=HPO, code="0000006")).validate()
+
+
+def test_compile_value_parser(hierarchy):
+    parser = compile_value_parser(ValueSet([OntologySubtree(HPO, "HP:0000118", hierarchy)]), resources=[HPO])
+    assert parser.kinds == ('coding',)
+    assert parser("HP:0001250") == Coding(system=HPO, code="0001250")
@@ -0,0 +1,68 @@
+import pytest
+
+from phenopacket_mapper.data_standards import ResourceRegistry, CodeSystem, DataModel, DataField
+from phenopacket_mapper.data_standards.code_system import HPO, ORDO, SNOMED_CT, ICD10CM, ICD9
+from phenopacket_mapper.utils.parsing import get_codesystem_by_namespace_prefx
+
+
+@pytest.fixture
+def resources():
+    return [HPO, ORDO, SNOMED_CT, ICD10CM, ICD9]
+
+
+@pytest.mark.parametrize("namespace_prefix_str, expected", [
+    ("HP", HPO),
+    ("hp", HPO),
+    ("HPO", HPO),
+    ("Human Phenotype Ontology", HPO),
+    ("orpha", ORDO),
+    ("ORDO", ORDO),
+    ("SCT", SNOMED_CT),
+    ("icd-10-cm", ICD10CM),
+    ("ICD_9", ICD9),
+    ("MONDO", None),
+])
+def test_resource_registry_get(resources, namespace_prefix_str, expected):
+    registry = ResourceRegistry(resources)
+    assert registry.get(namespace_prefix_str) == expected
+    assert get_codesystem_by_namespace_prefx(namespace_prefix_str, registry) == \
+           get_codesystem_by_namespace_prefx(namespace_prefix_str, resources)
+
+
+def test_resource_registry_behaves_like_list(resources):
+    registry = ResourceRegistry(resources)
+    assert list(registry) == resources
+    assert len(registry) == len(resources)
+    assert registry[0] == HPO
+    assert ORDO in registry
+    assert ResourceRegistry.of(registry) is registry
+
+
+def test_resource_registry_collisions():
+    other_hpo = CodeSystem(name="Other", namespace_prefix="HPO")
+    with pytest.warns(UserWarning):
+        registry = ResourceRegistry([HPO, other_hpo])
+    assert registry.collisions == {"hpo": [HPO, other_hpo]}
+    assert registry.get("HPO") is HPO
+
+    with pytest.raises(ValueError):
+        ResourceRegistry([HPO, other_hpo], compliance='strict')
+
+
+def test_resource_registry_same_resource_twice():
+    registry = ResourceRegistry([ORDO, ORDO.set_version("2024-08-02")])
+    assert registry.collisions == {}
+
+
+def test_data_model_resource_registry(resources):
+    data_model = DataModel("test", (DataField(name="Field 0", specification=str),), resources=resources)
+    assert data_model.resource_registry.get("hpo") == HPO
+    assert data_model.resource_registry is data_model.resource_registry
+
+
+def test_data_model_resource_registry_resource_replaced():
+    data_model = DataModel("test", (DataField(name="Field 0", specification=str),), resources=[HPO])
+    assert data_model.resource_registry.get("hp") == HPO
+    data_model.resources[0] = ORDO
+    assert data_model.resource_registry.get("hp") is None
+    assert data_model.resource_registry.get("orpha") == ORDO
@@ -0,0 +1,96 @@
+import phenopackets
+import pytest
+
+from phenopacket_mapper import PhenopacketMapper
+from phenopacket_mapper.data_standards import DataModel, DataField, DataModelInstance, DataFieldValue, DataSet, \
+    ValueSet
+from phenopacket_mapper.mapping import PhenopacketBuildingBlock
+
+
+@pytest.fixture
+def data_model():
+    return DataModel(data_model_name="test data model", resources=[], fields=(
+        DataField(name="Pseudonym", specification=str),
+        DataField(name="Sex", specification=ValueSet(["MALE", "FEMALE"]), required=False),
+    ))
+
+
+@pytest.fixture
+def mapper(data_model):
+    return PhenopacketMapper(
+        data_model=data_model,
+        id=data_model.pseudonym,
+        subject=PhenopacketBuildingBlock(phenopackets.Individual, id=data_model.pseudonym, sex=data_model.sex),
+    )
+
+
+def make_data_set(data_model, sexes):
+    return DataSet(data_model=data_model, data=[
+        DataModelInstance(row_no=i, data_model=data_model, values=[
+            DataFieldValue(row_no=i, field=data_model.pseudonym, value=f"p{i}"),
+            DataFieldValue(row_no=i, field=data_model.sex, value=sex),
+        ])
+        for i, sex in enumerate(sexes)
+    ])
+
+
+def test_partition(data_model):
+    data_set = make_data_set(data_model, ["MALE"] * 5)
+    partitions = data_set.partition(2)
+    assert [p.height for p in partitions] == [2, 2, 1]
+    assert [i.row_no for p in partitions for i in p] == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        data_set.partition(0)
+
+
+@pytest.mark.parametrize('as_list', [False, True])
+def test_map_workers(mapper, data_model, as_list):
+    data_set = make_data_set(data_model, ["MALE", "FEMALE"] * 10)
+    data = list(data_set) if as_list else data_set
+    phenopackets_list = mapper.map(data, workers=2, chunk_size=3)
+    assert phenopackets_list == mapper.map(data)
+    assert [p.id for p in phenopackets_list] == [f"p{i}" for i in range(20)]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_map_error_reports_row_no(mapper, data_model, workers):
+    data_set = make_data_set(data_model, ["MALE", "FEMALE", "MALE", "NOT_A_SEX"])
+    with pytest.raises(ValueError, match=r"row 3"):
+        mapper.map(data_set, workers=workers, chunk_size=2)
+
+
+def test_map_invalid_workers(mapper, data_model):
+    with pytest.raises(ValueError):
+        mapper.map(make_data_set(data_model, ["MALE"]), workers=0)
+
+
+def test_map_workers_without_fork(mapper, data_model, monkeypatch):
+    # without fork, the chunks are pickled and sent to the processes
+    from phenopacket_mapper.mapping import mapper as mapper_module
+    spawn = mapper_module.multiprocessing.get_context('spawn')
+    monkeypatch.setattr(mapper_module.multiprocessing, 'get_context', lambda: spawn)
+    data_set = make_data_set(data_model, ["MALE", "FEMALE"] * 5)
+    assert mapper.map(data_set, workers=2, chunk_size=3) == mapper.map(data_set)
+
+
+def test_imap(mapper, data_model):
+    data_set = make_data_set(data_model, ["MALE", "FEMALE"] * 3)
+    phenopackets_iter = mapper.imap(data_set)
+    assert next(phenopackets_iter).id == "p0"
+    assert [next(phenopackets_iter)] + list(phenopackets_iter) == mapper.map(data_set)[1:]
+    assert list(mapper.imap(data_set.partition(4))) == mapper.map(data_set)
+    assert list(mapper.imap(iter(list(data_set)))) == mapper.map(data_set)
+
+
+def test_imap_is_lazy(mapper, data_model):
+    def records():
+        yield from make_data_set(data_model, ["MALE"])
+        raise AssertionError("records consumed eagerly")
+
+    assert next(mapper.imap(records())).id == "p0"
+
+
+def test_imap_error_reports_row_no(mapper, data_model):
+    data_set = make_data_set(data_model, ["MALE", "NOT_A_SEX"])
+    with pytest.raises(ValueError, match=r"row 1"):
+        list(mapper.imap(data_set))
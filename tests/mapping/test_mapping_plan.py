@@ -0,0 +1,116 @@
+import pickle
+
+import phenopackets
+import pytest
+
+from phenopacket_mapper import PhenopacketMapper
+from phenopacket_mapper.data_standards import DataModel, DataField, DataModelInstance, DataFieldValue, Date, \
+    Coding, ValueSet
+from phenopacket_mapper.data_standards.code_system import ORDO
+from phenopacket_mapper.mapping import PhenopacketBuildingBlock, MappingPlan, map_single
+from phenopacket_mapper.mapping.mapping_plan import _CONVERTERS
+
+
+@pytest.fixture
+def data_model():
+    return DataModel(data_model_name="test data model", resources=[ORDO], fields=(
+        DataField(name="Pseudonym", specification=str),
+        DataField(name="Date of Birth", specification=Date, required=False),
+        DataField(name="Sex", specification=ValueSet(["MALE", "FEMALE"]), required=False),
+        DataField(name="Diagnosis", specification=ValueSet([ORDO]), required=False),
+    ))
+
+
+@pytest.fixture
+def mapper(data_model):
+    return PhenopacketMapper(
+        data_model=data_model,
+        id=data_model.pseudonym,
+        subject=PhenopacketBuildingBlock(
+            phenopackets.Individual,
+            id=data_model.pseudonym,
+            date_of_birth=data_model.date_of_birth,
+            sex=data_model.sex,
+        ),
+        diseases=[PhenopacketBuildingBlock(phenopackets.Disease, term=data_model.diagnosis)],
+    )
+
+
+@pytest.fixture
+def data(data_model):
+    def instance(row_no, **values):
+        return DataModelInstance(row_no=row_no, data_model=data_model, values=[
+            DataFieldValue(row_no=row_no, field=data_model.get_field(k), value=v) for k, v in values.items()
+        ])
+
+    return [
+        instance(0, pseudonym="p0", date_of_birth=Date(2000, 1, 2), sex="MALE",
+                 diagnosis=Coding(system=ORDO, code="206638", display="Fibrodysplasia")),
+        instance(1, pseudonym="p1", sex="FEMALE"),
+        instance(2, pseudonym="p2", diagnosis=Coding(system=ORDO, code="558")),
+    ]
+
+
+def legacy_map(mapper, data):
+    phenopackets_list = []
+    for instance in data:
+        kwargs = {}
+        for key, e in mapper.elements.items():
+            map_single(key, e, instance, kwargs)
+        phenopackets_list.append(phenopackets.Phenopacket(**kwargs))
+    return phenopackets_list
+
+
+def test_plan_matches_map_single(mapper, data):
+    assert mapper.map(data) == legacy_map(mapper, data)
+    assert mapper.map(data)[0].diseases[0].term == phenopackets.OntologyClass(id="ORPHA:206638",
+                                                                             label="Fibrodysplasia")
+    assert mapper.map(data)[0].subject.date_of_birth.ToDatetime().year == 2000
+
+
+@pytest.mark.parametrize('converter', ['coding', 'dynamic'])
+def test_convert_coding(converter):
+    convert = _CONVERTERS[converter]
+    assert convert(Coding(system=ORDO, code="558", display="Marfan syndrome")) == phenopackets.OntologyClass(
+        id="ORPHA:558", label="Marfan syndrome")
+    assert convert(Coding(system="SNOMED", code="404684003")) == phenopackets.OntologyClass(id="SNOMED:404684003")
+
+
+def test_plan_nodes(mapper):
+    plan = mapper.plan
+    assert plan is mapper.plan
+    assert [(n.kind, n.key) for n in plan.nodes] == [
+        ('field', 'id'),
+        ('field', 'id'), ('field', 'date_of_birth'), ('field', 'sex'),
+        ('block', 'subject'),
+        ('field', 'term'), ('block', None), ('list', 'diseases'),
+        ('block', None),
+    ]
+    assert [n.converter for n in plan.nodes if n.kind == 'field'] == ['primitive', 'primitive', 'date', 'primitive',
+                                                                      'coding']
+    assert [n.parent for n in plan.nodes] == [8, 4, 4, 4, 8, 6, 7, 8, None]
+    assert plan.nodes[2].field_position == 1
+    assert "date_of_birth <- date_of_birth (date)" in str(plan)
+
+
+def test_plan_profile(mapper, data):
+    profiles = mapper.plan.profile(data)
+    assert [p.node for p in profiles] == mapper.plan.nodes
+    assert all(p.calls == len(data) and p.seconds >= 0 for p in profiles)
+
+
+def test_building_block_plan(data_model, data):
+    block = PhenopacketBuildingBlock(phenopackets.Individual, id=data_model.pseudonym, sex=data_model.sex)
+    assert block.map(data[0]) == phenopackets.Individual(id="p0", sex="MALE")
+    assert block.plan_for(data_model) is block.plan_for(data_model)
+
+
+def test_plan_list_of_fields(data_model):
+    with pytest.raises(ValueError):
+        MappingPlan.compile(phenopackets.Phenopacket, {"diseases": [data_model.diagnosis]}, data_model)
+
+
+def test_pickle_mapper(mapper, data):
+    _ = mapper.plan
+    unpickled = pickle.loads(pickle.dumps(mapper))
+    assert unpickled.map(data) == mapper.map(data)
@@ -0,0 +1,153 @@
+import pandas as pd
+import pytest
+
+from phenopacket_mapper.data_standards import DataModel, DataField, ValueSet, Date, Coding
+from phenopacket_mapper.data_standards.code_system import ORDO
+from phenopacket_mapper.pipeline import load_data_using_data_model, iter_data_using_data_model
+
+
+@pytest.fixture
+def data_model():
+    return DataModel(data_model_name="test data model", resources=[ORDO], fields=(
+        DataField(name="Pseudonym", specification=str),
+        DataField(name="Date of Birth", specification=Date),
+        DataField(name="Age", specification=int, required=False),
+        DataField(name="Diagnosis", specification=ValueSet([ORDO]), required=False),
+    ))
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({
+        "id": ["patient0", "patient1", "patient2", "patient3"],
+        "dob": ["2002-02-01", None, "12/07/2005", "2000"],
+        "age": [22, 0, None, 24],
+        "diagnosis": ["ORPHA:206638", "ORPHA:95157", "", None],
+    }).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def xlsx_path(tmp_path, csv_path):
+    path = tmp_path / "data.xlsx"
+    pd.read_csv(csv_path).to_excel(path, index=False)
+    return path
+
+
+@pytest.fixture
+def column_names():
+    return {"pseudonym": "id", "date_of_birth": "dob", "age_column": "age", "diagnosis": "diagnosis"}
+
+
+def test_load_data_using_data_model(data_model, csv_path, column_names):
+    data_set = load_data_using_data_model(csv_path, data_model, column_names)
+
+    assert data_set.height == 4
+    assert [instance.row_no for instance in data_set] == [0, 1, 2, 3]
+    assert [[v.field.id for v in instance.values] for instance in data_set] == [
+        ["pseudonym", "date_of_birth", "age", "diagnosis"],
+        ["pseudonym", "diagnosis"],  # missing and falsy values are skipped
+        ["pseudonym", "date_of_birth"],
+        ["pseudonym", "date_of_birth", "age"],
+    ]
+    assert data_set.data[0].date_of_birth.value == Date(year=2002, month=2, day=1)
+    assert data_set.data[0].diagnosis.value == Coding(system=ORDO, code="206638")
+    assert data_set.data[2].date_of_birth.value == Date(year=2005, month=7, day=12)
+    assert data_set.data[3].age.value == 24.0
+    assert all(v.row_no == instance.row_no for instance in data_set for v in instance.values)
+
+
+def test_load_data_missing_column(data_model, csv_path, column_names):
+    column_names["diagnosis"] = "not a column"
+    data_set = load_data_using_data_model(csv_path, data_model, column_names)
+
+    assert all("diagnosis" not in [v.field.id for v in instance.values] for instance in data_set)
+
+
+def test_load_data_column_names_incomplete(data_model, csv_path):
+    with pytest.raises(ValueError):
+        load_data_using_data_model(csv_path, data_model, {"pseudonym": "id"})
+
+
+@pytest.mark.parametrize("file_fixture", ["csv_path", "xlsx_path"])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 10])
+def test_iter_data_using_data_model(request, data_model, column_names, file_fixture, chunk_size):
+    path = request.getfixturevalue(file_fixture)
+    loaded = load_data_using_data_model(path, data_model, dict(column_names))
+    chunks = list(iter_data_using_data_model(path, data_model, dict(column_names), chunk_size=chunk_size))
+
+    assert all(chunk.height <= chunk_size for chunk in chunks)
+    streamed = [instance for chunk in chunks for instance in chunk]
+    assert [instance.row_no for instance in streamed] == [instance.row_no for instance in loaded]
+    assert [[(v.row_no, v.field.id, v.value) for v in instance.values] for instance in streamed] == \
+           [[(v.row_no, v.field.id, v.value) for v in instance.values] for instance in loaded]
+
+
+def test_data_model_iter_data(data_model, csv_path):
+    chunks = data_model.iter_data(csv_path, chunk_size=3, pseudonym_column="id", date_of_birth_column="dob",
+                                  age_column="age", diagnosis_column="diagnosis")
+
+    assert [[instance.row_no for instance in chunk] for chunk in chunks] == [[0, 1, 2], [3]]
+
+
+def test_load_data_parse_stats(data_model, csv_path, column_names):
+    data_set = load_data_using_data_model(csv_path, data_model, column_names)
+    assert data_set.parse_stats.lookups == sum(len(instance.values) for instance in data_set)
+
+    data_set = load_data_using_data_model(csv_path, data_model, column_names, parse_cache_size=0)
+    assert data_set.parse_stats is None
+
+
+def test_load_data_columnar_storage(data_model, csv_path, column_names):
+    rows = load_data_using_data_model(csv_path, data_model, dict(column_names))
+    columnar = load_data_using_data_model(csv_path, data_model, dict(column_names), storage='columnar')
+
+    assert rows.storage == 'rows'
+    assert columnar.storage == 'columnar'
+    assert columnar.height == rows.height == 4
+    assert columnar == rows
+    assert columnar.data[3].age.value == 24
+    assert columnar.data_frame.equals(rows.data_frame)
+
+    rows.preprocess("diagnosis", lambda v: v.code)
+    columnar.preprocess(data_model.diagnosis, lambda v: v.code)
+    assert columnar.data_frame.equals(rows.data_frame)
+    assert [i.diagnosis.value for i in columnar.data[:2]] == ["206638", "95157"]
+
+
+def test_iter_data_columnar_storage(data_model, csv_path, column_names):
+    chunks = list(iter_data_using_data_model(csv_path, data_model, column_names, chunk_size=3, storage='columnar'))
+    assert [c.storage for c in chunks] == ['columnar', 'columnar']
+    assert [instance.row_no for c in chunks for instance in c] == [0, 1, 2, 3]
+
+
+def test_load_data_invalid_storage(data_model, csv_path, column_names):
+    with pytest.raises(ValueError):
+        load_data_using_data_model(csv_path, data_model, column_names, storage='arrow')
+
+
+@pytest.mark.parametrize("chunk_size", [2, 3])
+def test_iter_data_column_types_of_whole_file(tmp_path, chunk_size):
+    path = tmp_path / "types.csv"
+    path.write_text("id,age,smoker,code\n"
+                    "p0,22,True,0\n"
+                    "p1,0,False,12\n"
+                    "p2,,,abc\n"
+                    "p3,24,False,0\n", encoding="utf-8")
+    data_model = DataModel(data_model_name="types", fields=(
+        DataField(name="Pseudonym", specification=str),
+        DataField(name="Age", specification=str, required=False),
+        DataField(name="Smoker", specification=str, required=False),
+        DataField(name="Code", specification=str, required=False),
+    ))
+    column_names = {"pseudonym": "id", "age": "age", "smoker": "smoker", "code": "code"}
+
+    def values(instances):
+        return [[(v.field.id, v.value) for v in instance.values] for instance in instances]
+
+    loaded = load_data_using_data_model(path, data_model, dict(column_names))
+    chunks = iter_data_using_data_model(path, data_model, dict(column_names), chunk_size=chunk_size)
+    assert values(instance for chunk in chunks for instance in chunk) == values(loaded)
+    assert loaded.data[3].age.value == "24.0"
+    assert loaded.data[3].code.value == "0"
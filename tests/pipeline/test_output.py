@@ -0,0 +1,107 @@
+import gzip
+import json
+import tarfile
+import zipfile
+
+import pytest
+from phenopackets.schema.v2 import Phenopacket, Individual
+
+from phenopacket_mapper.pipeline import write, read_phenopackets_from_binary, iter_phenopackets_from_binary
+from phenopacket_mapper.utils import encode_varint
+from phenopacket_mapper.pipeline.output import shard_path
+
+
+def test_write_generator(tmp_path):
+    write((Phenopacket(id=f"p{i}") for i in range(3)), tmp_path / "out")
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["p0.json", "p1.json", "p2.json"]
+    assert json.loads((tmp_path / "out" / "p1.json").read_text()) == {"id": "p1"}
+
+
+@pytest.mark.parametrize(('workers', 'executor'), [(1, 'thread'), (3, 'thread'), (2, 'process')])
+def test_write_workers_sharded(tmp_path, workers, executor):
+    report = write((Phenopacket(id=f"p{i}") for i in range(50)), tmp_path, workers=workers, executor=executor,
+                   shard_depth=1, batch_size=4)
+    assert report.files == 50
+    assert report.files_per_second > 0
+    files = sorted(tmp_path.rglob("*.json"))
+    assert len(files) == 50
+    assert all(f.parent.name == shard_path(f.stem, 1) for f in files)
+    assert len({f.parent for f in files}) > 1
+
+
+def test_write_invalid_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        write([], tmp_path, workers=0)
+    with pytest.raises(ValueError):
+        write([], tmp_path, shard_depth=-1)
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_write_ndjson(tmp_path, compression, workers):
+    report = write((Phenopacket(id=f"p{i}") for i in range(5)), tmp_path, file_format='ndjson',
+                   compression=compression, workers=workers, batch_size=2)
+    assert report.files == 5
+    if compression == 'gzip':
+        assert report.path == tmp_path / "phenopackets.ndjson.gz"
+        lines = gzip.decompress(report.path.read_bytes()).decode().splitlines()
+    else:
+        assert report.path == tmp_path / "phenopackets.ndjson"
+        lines = report.path.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [{"id": f"p{i}"} for i in range(5)]
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_write_zip(tmp_path, compression):
+    report = write([Phenopacket(id=f"p{i}") for i in range(3)], tmp_path, file_format='zip', compression=compression,
+                   shard_depth=1, file_name="cohort.zip")
+    with zipfile.ZipFile(report.path) as zf:
+        assert sorted(zf.namelist()) == sorted(f"{shard_path(f'p{i}', 1)}/p{i}.json" for i in range(3))
+        assert json.loads(zf.read(f"{shard_path('p1', 1)}/p1.json")) == {"id": "p1"}
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_write_tar(tmp_path, compression):
+    report = write((Phenopacket(id=f"p{i}") for i in range(3)), tmp_path, file_format='tar', compression=compression)
+    with tarfile.open(report.path) as tf:
+        assert tf.getnames() == ["p0.json", "p1.json", "p2.json"]
+        assert json.loads(tf.extractfile("p2.json").read()) == {"id": "p2"}
+
+
+def test_write_json_gzip(tmp_path):
+    write([Phenopacket(id="p0")], tmp_path, compression='gzip')
+    assert json.loads(gzip.decompress((tmp_path / "p0.json.gz").read_bytes())) == {"id": "p0"}
+
+
+def test_write_zstd(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    report = write([Phenopacket(id="p0")], tmp_path, file_format='ndjson', compression='zstd')
+    assert report.path.name == "phenopackets.ndjson.zst"
+    with zstandard.ZstdDecompressor().stream_reader(report.path.open('rb')) as fh:
+        assert json.loads(fh.read()) == {"id": "p0"}
+
+
+def test_write_invalid_format(tmp_path):
+    with pytest.raises(ValueError):
+        write([], tmp_path, file_format='parquet')
+    with pytest.raises(ValueError):
+        write([], tmp_path, file_format='zip', compression='zstd')
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_write_read_binary(tmp_path, compression, workers):
+    phenopackets_list = [Phenopacket(id=f"p{i}", subject=Individual(id=f"p{i}", sex="MALE")) for i in range(200)]
+    phenopackets_list.append(Phenopacket())  # empty records are 0 bytes long
+    report = write(phenopackets_list, tmp_path, file_format='binary', compression=compression, workers=workers)
+    assert report.path.name == "phenopackets.pb" + (".gz" if compression else "")
+    assert read_phenopackets_from_binary(report.path) == phenopackets_list
+    assert next(iter_phenopackets_from_binary(report.path, compression=compression)) == phenopackets_list[0]
+
+
+def test_read_binary_truncated(tmp_path):
+    path = tmp_path / "truncated.pb"
+    data = Phenopacket(id="p0").SerializeToString()
+    path.write_bytes(encode_varint(len(data) + 1) + data)
+    with pytest.raises(ValueError):
+        read_phenopackets_from_binary(path)
@@ -0,0 +1,62 @@
+import pytest
+from phenopackets.schema.v2 import Phenopacket
+
+from phenopacket_mapper.pipeline import write, read_phenopackets, iter_phenopackets
+
+
+@pytest.fixture
+def phenopackets_list():
+    return [Phenopacket(id=f"p{i}") for i in range(20)]
+
+
+def ids(phenopackets_list):
+    return sorted(p.id for p in phenopackets_list)
+
+
+@pytest.mark.parametrize(('workers', 'executor'), [(1, 'thread'), (3, 'thread'), (2, 'process')])
+def test_iter_phenopackets(tmp_path, phenopackets_list, workers, executor):
+    write(phenopackets_list, tmp_path)
+    it = iter_phenopackets(tmp_path, workers=workers, executor=executor, batch_size=3)
+    assert not isinstance(it, list)
+    assert ids(it) == ids(phenopackets_list)
+
+
+def test_iter_phenopackets_sharded(tmp_path, phenopackets_list):
+    write(phenopackets_list, tmp_path, shard_depth=2)
+    assert list(iter_phenopackets(tmp_path)) == []
+    assert ids(iter_phenopackets(tmp_path, recursive=True)) == ids(phenopackets_list)
+    assert ids(read_phenopackets(tmp_path, recursive=True, workers=2)) == ids(phenopackets_list)
+
+
+def test_iter_phenopackets_order_with_workers(tmp_path, phenopackets_list):
+    write(phenopackets_list, tmp_path, shard_depth=1)
+    serial = [p.id for p in iter_phenopackets(tmp_path, recursive=True)]
+    assert [p.id for p in iter_phenopackets(tmp_path, recursive=True, workers=4, batch_size=2)] == serial
+
+
+def test_iter_phenopackets_compressed(tmp_path, phenopackets_list):
+    write(phenopackets_list, tmp_path, compression='gzip')
+    assert ids(iter_phenopackets(tmp_path)) == ids(phenopackets_list)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_iter_phenopackets_skips_bad_files(tmp_path, phenopackets_list, workers):
+    write(phenopackets_list, tmp_path)
+    (tmp_path / "broken.json").write_text('{"id": ')
+    (tmp_path / "notes.txt").write_text("not a phenopacket")
+
+    errors = []
+    with pytest.warns(UserWarning, match="broken.json"):
+        read = list(iter_phenopackets(tmp_path, workers=workers, errors=errors))
+    assert ids(read) == ids(phenopackets_list)
+    assert [path.name for path, _ in errors] == ["broken.json"]
+
+    with pytest.raises(ValueError, match="broken.json"):
+        read_phenopackets(tmp_path)
+
+
+def test_iter_phenopackets_invalid_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_phenopackets(tmp_path, workers=0))
+    with pytest.raises(ValueError):
+        list(iter_phenopackets(tmp_path, compliance='ignore'))
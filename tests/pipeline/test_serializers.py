@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+
+import pytest
+from google.protobuf.json_format import MessageToDict, Parse
+from google.protobuf.timestamp_pb2 import Timestamp
+from phenopackets.schema.v2 import Phenopacket, Individual, Disease, OntologyClass, PhenotypicFeature, TimeElement, \
+    Age, Measurement, Value, Quantity, MetaData, Resource
+
+from phenopacket_mapper.pipeline import write, read_phenopackets
+from phenopacket_mapper.pipeline.serializers import to_json, message_to_dict
+
+ERDRI_OUTPUT = Path(__file__).parents[2] / "res" / "test_data" / "erdri" / "output"
+
+
+@pytest.fixture
+def phenopacket():
+    return Phenopacket(
+        id="p0",
+        subject=Individual(id="p0", date_of_birth=Timestamp(seconds=631152000, nanos=500), sex="FEMALE"),
+        diseases=[Disease(term=OntologyClass(id="ORPHA:206638", label="Fibrodysplasia ossificans progressiva"),
+                          onset=TimeElement(age=Age(iso8601duration="P3Y")))],
+        phenotypic_features=[PhenotypicFeature(type=OntologyClass(id="HP:0001250", label="Seizure"), excluded=True)],
+        measurements=[Measurement(assay=OntologyClass(id="LOINC:26515-7"),
+                                  value=Value(quantity=Quantity(unit=OntologyClass(id="UCUM:mg"), value=float('nan')))),
+                      Measurement(assay=OntologyClass(id="LOINC:26515-7"),
+                                  value=Value(quantity=Quantity(value=-float('inf'))))],
+        meta_data=MetaData(created_by="test", phenopacket_schema_version="2.0",
+                           resources=[Resource(id="hp", version="2024-01-01")]),
+    )
+
+
+def test_message_to_dict(phenopacket):
+    assert message_to_dict(phenopacket) == MessageToDict(phenopacket)
+
+
+def test_to_json_fast_is_compact(phenopacket):
+    fast = to_json(phenopacket, serializer='fast')
+    assert "\n" not in fast
+    assert json.loads(fast) == json.loads(to_json(phenopacket))
+    assert len(fast) < len(to_json(phenopacket))
+
+
+def test_to_json_invalid_serializer(phenopacket):
+    with pytest.raises(ValueError):
+        to_json(phenopacket, serializer='pretty')
+
+
+@pytest.mark.parametrize('path', sorted(ERDRI_OUTPUT.glob("*.json")), ids=lambda p: p.name)
+def test_fast_serializer_erdri_output(path):
+    expected = Parse(path.read_text(), Phenopacket())
+    fast = to_json(expected, serializer='fast')
+    assert json.loads(fast) == json.loads(path.read_text())
+    assert Parse(fast, Phenopacket()) == expected
+
+
+def test_write_fast_serializer(tmp_path, phenopacket):
+    write([phenopacket], tmp_path / "protobuf")
+    write([phenopacket], tmp_path / "fast", serializer='fast')
+    assert read_phenopackets(tmp_path / "fast") == read_phenopackets(tmp_path / "protobuf") == [phenopacket]
+    assert "\n" not in (tmp_path / "fast" / "p0.json").read_text()
+
+
+def test_write_fast_serializer_ndjson(tmp_path, phenopacket):
+    report = write([phenopacket, Phenopacket(id="p1")], tmp_path, file_format='ndjson', serializer='fast')
+    lines = report.path.read_text().splitlines()
+    assert [Parse(line, Phenopacket()) for line in lines] == [phenopacket, Phenopacket(id="p1")]
+
+
+def test_write_invalid_serializer(tmp_path):
+    with pytest.raises(ValueError):
+        write([], tmp_path, serializer='pretty')
@@ -0,0 +1,122 @@
+import pytest
+from phenopackets.schema.v2 import Phenopacket, Individual, Sex
+
+from phenopacket_mapper.pipeline import write, PhenopacketStore
+from phenopacket_mapper.utils import encode_varint
+
+
+def make_phenopackets(start, stop):
+    return [Phenopacket(id=f"p{i}", subject=Individual(id=f"p{i}", sex="MALE")) for i in range(start, stop)]
+
+
+@pytest.mark.parametrize('file_format', ['ndjson', 'binary'])
+def test_store_get(tmp_path, file_format):
+    report = write(make_phenopackets(0, 10), tmp_path, file_format=file_format)
+    with PhenopacketStore(tmp_path / "index.sqlite", [report.path]) as store:
+        assert len(store) == 10
+        assert store["p7"] == make_phenopackets(7, 8)[0]
+        assert "p3" in store
+        assert "p10" not in store
+        assert store.get("p10") is None
+        with pytest.raises(KeyError):
+            store["p10"]
+        assert store.ids() == [f"p{i}" for i in range(10)]
+
+
+def test_store_index_is_persistent(tmp_path):
+    report = write(make_phenopackets(0, 5), tmp_path, file_format='binary')
+    PhenopacketStore(tmp_path / "index.sqlite", [report.path]).close()
+    with PhenopacketStore(tmp_path / "index.sqlite") as store:
+        assert store.update() == 0
+        assert store["p4"].id == "p4"
+
+
+@pytest.mark.parametrize('file_format', ['ndjson', 'binary'])
+def test_store_incremental_update(tmp_path, file_format):
+    report = write(make_phenopackets(0, 5), tmp_path, file_format=file_format)
+    with PhenopacketStore(tmp_path / "index.sqlite", [report.path]) as store:
+        assert store["p1"].id == "p1"
+        appended = make_phenopackets(5, 8)
+        with open(report.path, 'ab') as fh:
+            for phenopacket in appended:
+                if file_format == 'binary':
+                    data = phenopacket.SerializeToString()
+                    fh.write(encode_varint(len(data)) + data)
+                else:
+                    fh.write(b'{"id": "%s"}\n' % phenopacket.id.encode())
+            fh.write(b'\x7f' if file_format == 'binary' else b'{"id": "p')  # incomplete record
+        assert store.update() == 3
+        assert len(store) == 8
+        assert store["p6"].id == "p6"
+        assert store["p1"].id == "p1"
+
+
+def test_store_multiple_files(tmp_path):
+    first = write(make_phenopackets(0, 3), tmp_path / "a", file_format='ndjson')
+    second = write(make_phenopackets(3, 6), tmp_path / "b", file_format='binary')
+    with PhenopacketStore(tmp_path / "index.sqlite", [first.path]) as store:
+        store.update([second.path])
+        assert len(store) == 6
+        assert store["p0"].id == "p0"
+        assert store["p5"].id == "p5"
+
+
+def test_store_invalid_files(tmp_path):
+    report = write(make_phenopackets(0, 2), tmp_path, file_format='ndjson', compression='gzip')
+    with pytest.raises(ValueError):
+        PhenopacketStore(tmp_path / "index.sqlite", [report.path])
+    with pytest.raises(ValueError):
+        PhenopacketStore(tmp_path / "index2.sqlite", [tmp_path / "phenopackets.json"])
+
+
+def test_store_deleted_file(tmp_path):
+    first = write(make_phenopackets(0, 3), tmp_path / "a", file_format='ndjson')
+    second = write(make_phenopackets(3, 6), tmp_path / "b", file_format='binary')
+    with PhenopacketStore(tmp_path / "index.sqlite", [first.path, second.path]) as store:
+        assert store["p4"].id == "p4"
+        second.path.unlink()
+        assert store.update() == 0
+        assert len(store) == 3
+        assert "p4" not in store
+        assert store.ids() == ["p0", "p1", "p2"]
+
+        write(make_phenopackets(3, 5), tmp_path / "b", file_format='binary')
+        assert store.update([second.path]) == 2
+        assert store["p4"].id == "p4"
+        with pytest.raises(FileNotFoundError):
+            store.update([tmp_path / "missing.ndjson"])
+        assert len(store) == 5
+
+
+@pytest.mark.parametrize('file_format', ['ndjson', 'binary'])
+def test_store_rewritten_file(tmp_path, file_format):
+    report = write(make_phenopackets(0, 5), tmp_path, file_format=file_format)
+    with PhenopacketStore(tmp_path / "index.sqlite", [report.path]) as store:
+        assert store["p1"].id == "p1"
+        write(make_phenopackets(5, 10), tmp_path, file_format=file_format)  # same size
+        assert store.update() == 5
+        assert store.ids() == [f"p{i}" for i in range(5, 10)]
+        assert store["p7"].id == "p7"
+        write(make_phenopackets(10, 20), tmp_path, file_format=file_format)  # larger
+        assert store.update() == 10
+        assert len(store) == 10
+        assert store["p15"].id == "p15"
+
+
+def test_store_ndjson_record_without_id(tmp_path):
+    path = tmp_path / "phenopackets.ndjson"
+    path.write_bytes(b'{"id": "p0"}\n{"subject": {"id": "p1"}}\n')
+    with pytest.raises(ValueError, match=f"byte 13 of {path}"):
+        PhenopacketStore(tmp_path / "index.sqlite", [path])
+
+
+def test_store_deleted_file_restores_ids(tmp_path):
+    first = write(make_phenopackets(0, 3), tmp_path / "a", file_format='ndjson')
+    second = write([Phenopacket(id="p1", subject=Individual(id="p1", sex="FEMALE"))], tmp_path / "b",
+                   file_format='binary')
+    with PhenopacketStore(tmp_path / "index.sqlite", [first.path, second.path]) as store:
+        assert store["p1"].subject.sex == Sex.FEMALE
+        second.path.unlink()
+        store.update()
+        assert store.ids() == ["p0", "p1", "p2"]
+        assert store["p1"].subject.sex == Sex.MALE
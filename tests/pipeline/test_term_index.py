@@ -0,0 +1,98 @@
+import pytest
+from phenopackets.schema.v2 import Phenopacket, PhenotypicFeature, OntologyClass, Disease, Measurement, \
+    Interpretation, Diagnosis, GenomicInterpretation
+
+from phenopacket_mapper.pipeline import write, TermIndex
+
+
+@pytest.fixture
+def phenopackets_list():
+    return [
+        Phenopacket(id="p0", phenotypic_features=[PhenotypicFeature(type=OntologyClass(id="HP:0001250")),
+                                                  PhenotypicFeature(type=OntologyClass(id="HP:0000001"),
+                                                                    excluded=True)],
+                    diseases=[Disease(term=OntologyClass(id="ORPHA:206638"))]),
+        Phenopacket(id="p1", phenotypic_features=[PhenotypicFeature(type=OntologyClass(id="HP:0001250"),
+                                                                    modifiers=[OntologyClass(id="HP:0012828")])]),
+        Phenopacket(id="p2", measurements=[Measurement(assay=OntologyClass(id="LOINC:26515-7"))],
+                    interpretations=[Interpretation(id="i0", diagnosis=Diagnosis(
+                        disease=OntologyClass(id="ORPHA:558"),
+                        genomic_interpretations=[GenomicInterpretation(subject_or_biosample_id="p2")]))]),
+        Phenopacket(id="p3"),
+    ]
+
+
+@pytest.fixture
+def term_index(phenopackets_list):
+    term_index = TermIndex()
+    term_index.update(phenopackets_list)
+    return term_index
+
+
+def test_lookup(term_index):
+    assert len(term_index) == 4
+    assert term_index.lookup("HP:0001250") == ["p0", "p1"]
+    assert term_index.lookup("HP:0012828") == ["p1"]
+    assert term_index.lookup("ORPHA:558") == ["p2"]
+    assert term_index.lookup("LOINC:26515-7") == ["p2"]
+    assert term_index.lookup("HP:0000001") == []
+    assert term_index.count("HP:0001250") == 2
+    assert "ORPHA:206638" in term_index
+
+
+def test_include_excluded(phenopackets_list):
+    term_index = TermIndex(include_excluded=True)
+    term_index.update(phenopackets_list)
+    assert term_index.lookup("HP:0000001") == ["p0"]
+
+
+@pytest.mark.parametrize(('expression', 'expected'), [
+    ("HP:0001250 AND ORPHA:206638", ["p0"]),
+    ("HP:0001250 AND NOT ORPHA:206638", ["p1"]),
+    ("ORPHA:558 OR HP:0012828", ["p1", "p2"]),
+    ("NOT HP:0001250", ["p2", "p3"]),
+    ("NOT (HP:0001250 OR ORPHA:558)", ["p3"]),
+    ("ORPHA:558 OR HP:0001250 AND ORPHA:206638", ["p0", "p2"]),
+    ("(ORPHA:558 OR HP:0001250) AND NOT NOT ORPHA:206638", ["p0"]),
+    ("UNKNOWN:1", []),
+])
+def test_query(term_index, expression, expected):
+    assert term_index.query(expression) == expected
+
+
+@pytest.mark.parametrize('expression', ["", "HP:0001250 AND", "(HP:0001250", "HP:0001250)", "OR HP:0001250",
+                                        "HP:0001250 ORPHA:558"])
+def test_query_invalid(term_index, expression):
+    with pytest.raises(ValueError):
+        term_index.query(expression)
+
+
+def test_add_same_id_twice(term_index):
+    term_index.add(Phenopacket(id="p0", diseases=[Disease(term=OntologyClass(id="ORPHA:558"))]))
+    assert len(term_index) == 4
+    assert term_index.lookup("ORPHA:558") == ["p0", "p2"]
+    assert term_index.lookup("HP:0001250") == ["p0", "p1"]
+
+
+def test_save_load(tmp_path, term_index):
+    term_index.save(tmp_path / "terms.idx")
+    loaded = TermIndex.load(tmp_path / "terms.idx")
+    assert len(loaded) == len(term_index)
+    assert sorted(loaded.terms()) == sorted(term_index.terms())
+    for term in term_index.terms():
+        assert loaded.lookup(term) == term_index.lookup(term)
+    assert loaded.query("NOT HP:0001250") == ["p2", "p3"]
+
+
+def test_load_invalid(tmp_path):
+    (tmp_path / "terms.idx").write_bytes(b"not an index")
+    with pytest.raises(ValueError):
+        TermIndex.load(tmp_path / "terms.idx")
+
+
+@pytest.mark.parametrize('file_format', ['json', 'ndjson'])
+def test_write_term_index(tmp_path, phenopackets_list, file_format):
+    term_index = TermIndex()
+    write(iter(phenopackets_list), tmp_path, file_format=file_format, workers=2, term_index=term_index)
+    assert len(term_index) == 4
+    assert term_index.query("HP:0001250 AND NOT ORPHA:206638") == ["p1"]
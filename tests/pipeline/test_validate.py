@@ -0,0 +1,123 @@
+import pytest
+from google.protobuf.timestamp_pb2 import Timestamp
+from phenopackets.schema.v2 import Phenopacket, Individual, PhenotypicFeature, OntologyClass, MetaData, Resource, \
+    Disease, TimeElement, Age, VitalStatus, Measurement
+
+from phenopacket_mapper.pipeline import write, Validator, validate, read_validate
+from phenopacket_mapper.pipeline.validation_rules import Rule, RequiredFieldsRule, CurieRule
+
+
+def make_phenopacket(i=0, **kwargs):
+    return Phenopacket(
+        id=f"p{i}",
+        subject=Individual(id=f"p{i}", date_of_birth=Timestamp(seconds=631152000)),
+        phenotypic_features=[PhenotypicFeature(type=OntologyClass(id="HP:0001250", label="Seizure"),
+                                               onset=TimeElement(age=Age(iso8601duration="P3Y6M")))],
+        meta_data=MetaData(created=Timestamp(seconds=1700000000), created_by="test",
+                           phenopacket_schema_version="2.0",
+                           resources=[Resource(id="hp", name="human phenotype ontology", namespace_prefix="HP",
+                                               url="http://purl.obolibrary.org/obo/hp.owl", version="2024-01-01",
+                                               iri_prefix="http://purl.obolibrary.org/obo/HP_")]),
+        **kwargs,
+    )
+
+
+def issues(phenopacket, validator=None):
+    result = (validator or Validator()).check(phenopacket)
+    return sorted((issue.rule, issue.path) for issue in result.issues)
+
+
+def test_valid_phenopacket():
+    result = Validator().check(make_phenopacket())
+    assert result.valid
+    assert result.phenopacket_id == "p0"
+
+
+def test_required_fields():
+    phenopacket = make_phenopacket(diseases=[Disease()], measurements=[Measurement(assay=OntologyClass(
+        id="HP:0000001", label="All"))])
+    phenopacket.ClearField('id')
+    phenopacket.phenotypic_features[0].type.ClearField('label')
+    assert issues(phenopacket) == [
+        ('required', 'diseases[0].term'),
+        ('required', 'id'),
+        ('required', 'measurements[0].measurement_value'),
+        ('required', 'phenotypic_features[0].type.label'),
+    ]
+
+
+def test_curie():
+    phenopacket = make_phenopacket()
+    phenopacket.phenotypic_features[0].type.id = "HP 0001250"
+    assert issues(phenopacket) == [('curie', 'phenotypic_features[0].type.id')]
+
+
+def test_resource_prefix():
+    phenopacket = make_phenopacket(diseases=[Disease(term=OntologyClass(id="ORPHA:558", label="Marfan")),
+                                             Disease(term=OntologyClass(id="ORPHA:1", label="x"))])
+    phenopacket.meta_data.resources.append(phenopacket.meta_data.resources[0])
+    assert issues(phenopacket) == [('resource_prefix', 'diseases[0].term.id'),
+                                   ('resource_prefix', 'meta_data.resources[1].namespace_prefix')]
+
+
+def test_timestamp():
+    phenopacket = make_phenopacket()
+    phenopacket.phenotypic_features[0].onset.age.iso8601duration = "3 years"
+    phenopacket.meta_data.created.seconds = 10 ** 11
+    phenopacket.subject.vital_status.CopyFrom(VitalStatus(
+        status=VitalStatus.DECEASED, time_of_death=TimeElement(timestamp=Timestamp(seconds=0))))
+    assert issues(phenopacket) == [
+        ('timestamp', 'meta_data.created'),
+        ('timestamp', 'phenotypic_features[0].onset.age.iso8601duration'),
+        ('timestamp', 'subject.vital_status.time_of_death'),
+    ]
+
+
+def test_custom_rules():
+    class NoExcludedRule(Rule):
+        name = 'no_excluded'
+        message_types = ('org.phenopackets.schema.v2.core.PhenotypicFeature',)
+
+        def check(self, phenopacket, nodes):
+            for path, feature in nodes.get(self.message_types[0], ()):
+                if feature.excluded:
+                    yield path, "Excluded features are not allowed"
+
+    phenopacket = make_phenopacket()
+    phenopacket.phenotypic_features[0].excluded = True
+    phenopacket.ClearField('meta_data')
+    assert issues(phenopacket, Validator([NoExcludedRule(), CurieRule()])) == [
+        ('no_excluded', 'phenotypic_features[0]')]
+    with pytest.raises(ValueError):
+        Validator([CurieRule(), CurieRule()])
+    with pytest.raises(TypeError):  # check is abstract
+        type('IncompleteRule', (Rule,), {'name': 'incomplete'})()
+
+
+def test_required_fields_rule_checks_table():
+    with pytest.raises(ValueError):
+        RequiredFieldsRule({'org.phenopackets.schema.v2.core.OntologyClass': ('identifier',)})
+
+
+@pytest.mark.parametrize(('workers', 'executor'), [(1, 'process'), (2, 'thread'), (2, 'process')])
+def test_iter_validate(workers, executor):
+    phenopackets_list = [make_phenopacket(i) for i in range(25)]
+    phenopackets_list[7].phenotypic_features[0].type.id = "not a curie"
+    validator = Validator()
+    results = list(validator.iter_validate(iter(phenopackets_list), workers=workers, executor=executor,
+                                           batch_size=4))
+    assert [r.phenopacket_id for r in results] == [f"p{i}" for i in range(25)]
+    assert [r.phenopacket_id for r in results if not r.valid] == ["p7"]
+    timings = {t.rule: t for t in validator.timings}
+    assert set(timings) == {'(walk)', 'required', 'curie', 'resource_prefix', 'timestamp'}
+    assert all(t.calls == 25 for t in timings.values())
+
+
+def test_validate_and_read_validate(tmp_path):
+    phenopackets_list = [make_phenopacket(i) for i in range(3)]
+    assert validate(phenopackets_list)
+    write(phenopackets_list, tmp_path)
+    assert read_validate(tmp_path)
+    (tmp_path / "broken.json").write_text("{")
+    with pytest.warns(UserWarning):
+        assert not read_validate(tmp_path)
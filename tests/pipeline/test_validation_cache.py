@@ -0,0 +1,156 @@
+import time
+
+import pytest
+from phenopackets.schema.v2 import Phenopacket, PhenotypicFeature, OntologyClass
+
+from phenopacket_mapper.pipeline import Validator, ValidationCache, ValidationResult, write, read_validate
+from phenopacket_mapper.pipeline.validate import _CACHE_CHUNK_SIZE
+from phenopacket_mapper.pipeline.validation_rules import CurieRule, TimestampRule
+
+
+def make_phenopackets(n):
+    return [Phenopacket(id=f"p{i}", phenotypic_features=[
+        PhenotypicFeature(type=OntologyClass(id=f"HP:{i}" if i % 2 else "invalid", label="x"))]) for i in range(n)]
+
+
+class CountingValidator(Validator):
+    checked = 0
+
+    def check(self, phenopacket):
+        CountingValidator.checked += 1
+        return super().check(phenopacket)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with ValidationCache(tmp_path / "cache.sqlite") as cache:
+        yield cache
+
+
+def test_cache_key():
+    phenopacket = make_phenopackets(1)[0]
+    key = ValidationCache.key(phenopacket, "v1")
+    assert key == ValidationCache.key(Phenopacket.FromString(phenopacket.SerializeToString()), "v1")
+    assert key != ValidationCache.key(phenopacket, "v2")
+    phenopacket.phenotypic_features[0].type.label = "y"
+    assert key != ValidationCache.key(phenopacket, "v1")
+
+
+def test_result_json_round_trip():
+    result = Validator().check(make_phenopackets(1)[0])
+    assert not result.valid
+    assert ValidationResult.from_json(result.to_json()) == result
+
+
+def test_validator_version():
+    assert Validator().version == Validator().version
+    assert Validator().version != Validator([CurieRule()]).version
+    assert Validator([TimestampRule()]).version != Validator([TimestampRule(tolerance_seconds=0)]).version
+
+
+def test_iter_validate_uses_cache(cache):
+    validator = CountingValidator()
+    phenopackets_list = make_phenopackets(10)
+    expected = [validator.check(p) for p in phenopackets_list]
+    CountingValidator.checked = 0
+
+    assert list(validator.iter_validate(phenopackets_list, cache=cache)) == expected
+    assert CountingValidator.checked == 10
+    assert len(cache) == 10
+
+    phenopackets_list[3].phenotypic_features[0].type.id = "HP:3b"
+    phenopackets_list[8].phenotypic_features[0].type.id = "HP:8"
+    expected[3] = validator.check(phenopackets_list[3])
+    expected[8] = validator.check(phenopackets_list[8])
+    CountingValidator.checked = 0
+    assert list(validator.iter_validate(phenopackets_list, cache=cache)) == expected
+    assert CountingValidator.checked == 2
+    assert cache.hits == 8
+
+
+@pytest.mark.parametrize(('workers', 'executor'), [(2, 'thread'), (2, 'process')])
+def test_iter_validate_cache_with_pool(cache, workers, executor):
+    phenopackets_list = make_phenopackets(30)
+    validator = Validator()
+    expected = [validator.check(p) for p in phenopackets_list]
+    list(validator.iter_validate(phenopackets_list[::3], cache=cache))
+    results = list(validator.iter_validate(iter(phenopackets_list), workers=workers, executor=executor,
+                                           batch_size=4, cache=cache))
+    assert results == expected
+    assert cache.hits == 10
+
+
+def test_cache_rule_set_version(cache):
+    phenopackets_list = make_phenopackets(4)
+    assert not Validator().validate(phenopackets_list, cache=cache)
+    assert Validator([TimestampRule()]).validate(phenopackets_list, cache=cache)
+    assert cache.hits == 0
+    assert len(cache) == 8
+
+
+def test_cache_clear_and_expire(tmp_path, cache):
+    Validator().validate(make_phenopackets(4), cache=cache)
+    assert len(cache) == 4
+    assert cache.expire(max_age=60) == 0
+    time.sleep(0.01)
+    assert cache.expire(max_age=0.001) == 4
+    assert len(cache) == 0
+
+    Validator().validate(make_phenopackets(4), cache=cache)
+    cache.clear()
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        cache.expire()
+
+    Validator().validate(make_phenopackets(4), cache=cache)
+    with ValidationCache(tmp_path / "cache.sqlite", max_age=0.001) as expired:
+        time.sleep(0.01)
+        assert expired.get_many([ValidationCache.key(p, Validator().version) for p in make_phenopackets(4)]) == {}
+
+
+def test_read_validate_cache(tmp_path, cache):
+    write(make_phenopackets(4), tmp_path / "out")
+    assert not read_validate(tmp_path / "out", cache=cache)
+    assert not read_validate(tmp_path / "out", cache=cache)
+    assert cache.hits == 4
+
+
+def test_cache_rechecks_uncacheable_rules(cache, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr("phenopacket_mapper.pipeline.validation_rules.time.time", lambda: now[0])
+    phenopackets_list = make_phenopackets(4)
+    for phenopacket in phenopackets_list:
+        phenopacket.subject.id = "s"
+        phenopacket.subject.date_of_birth.seconds = 2_000_000
+    validator = Validator([CurieRule(), TimestampRule(tolerance_seconds=0)])
+
+    for hits in (0, 4):
+        results = list(validator.iter_validate(phenopackets_list, cache=cache))
+        assert [[i.rule for i in r.issues] for r in results] == [['curie', 'timestamp'], ['timestamp']] * 2
+        assert cache.hits == hits
+
+    now[0] = 3_000_000.0
+    results = list(validator.iter_validate(phenopackets_list, cache=cache))
+    assert [[i.rule for i in r.issues] for r in results] == [['curie'], []] * 2
+    assert results == [validator.check(p) for p in phenopackets_list]
+    assert cache.hits == 8
+
+
+@pytest.mark.parametrize(('workers', 'executor'), [(1, 'process'), (2, 'thread')])
+def test_iter_validate_cached_streams(cache, workers, executor):
+    phenopackets_list = make_phenopackets(3000)
+    validator = Validator()
+    validator.validate(phenopackets_list, cache=cache)
+    consumed = [0]
+
+    def generate():
+        for phenopacket in phenopackets_list:
+            consumed[0] += 1
+            yield phenopacket
+
+    phenopackets_list[1200].phenotypic_features[0].type.id = "HP:new"
+    it = validator.iter_validate(generate(), workers=workers, executor=executor, batch_size=50, cache=cache)
+    assert next(it) == validator.check(phenopackets_list[0])
+    assert consumed[0] <= _CACHE_CHUNK_SIZE
+    assert sum(1 for _ in it) == 2999
+    assert cache.hits == 2999
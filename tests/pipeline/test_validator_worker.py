@@ -0,0 +1,84 @@
+import os
+from itertools import islice
+
+import pytest
+from phenopackets.schema.v2 import Phenopacket, OntologyClass, PhenotypicFeature
+
+from phenopacket_mapper.pipeline import Validator, ValidationResult, ValidationIssue
+from phenopacket_mapper.pipeline.validator_worker import ValidatorWorker
+
+
+class EchoBackend:
+    """Stand-in validator, reporting the id of each phenopacket and the process it was validated in"""
+
+    def check(self, phenopacket):
+        return ValidationResult(phenopacket_id=phenopacket.id,
+                                issues=[ValidationIssue(rule='echo', path=str(os.getpid()), message=phenopacket.id)])
+
+
+class CrashingBackend:
+    """Stand-in validator, crashing on phenopackets with the id 'crash', and on 'flaky' until `marker` exists"""
+
+    def __init__(self, marker=None):
+        self.marker = marker
+
+    def check(self, phenopacket):
+        if phenopacket.id == 'crash':
+            os._exit(1)
+        if phenopacket.id == 'flaky' and not os.path.exists(self.marker):
+            open(self.marker, 'w').close()
+            os._exit(1)
+        return ValidationResult(phenopacket_id=phenopacket.id)
+
+
+def phenopackets(*ids):
+    return [Phenopacket(id=i) for i in ids]
+
+
+def test_worker_stand_in_backend():
+    with ValidatorWorker(backend='test_validator_worker:EchoBackend') as worker:
+        first = list(worker.validate_batch(phenopackets("p0", "p1", "p2")))
+        second = list(worker.validate_batch(phenopackets("p3")))
+    assert [r.phenopacket_id for r in first + second] == ["p0", "p1", "p2", "p3"]
+    assert [r.issues[0].message for r in first] == ["p0", "p1", "p2"]
+    pids = {r.issues[0].path for r in first + second}
+    assert len(pids) == 1  # one long-lived process
+    assert pids != {str(os.getpid())}
+
+
+def test_worker_restarts_after_crash(tmp_path):
+    backend = CrashingBackend(marker=str(tmp_path / "marker"))
+    with ValidatorWorker(backend=backend) as worker:
+        results = list(worker.validate_batch(phenopackets("p0", "flaky", "p1")))
+        assert [(r.phenopacket_id, r.valid) for r in results] == [("p0", True), ("flaky", True), ("p1", True)]
+        assert worker.restarts == 1
+
+        results = list(worker.validate_batch(phenopackets("p2", "crash", "p3")))
+        assert [(r.phenopacket_id, r.valid) for r in results] == [("p2", True), ("crash", False), ("p3", True)]
+        assert results[1].issues[0].rule == 'worker'
+        assert worker.restarts == 4
+
+
+def test_worker_batch_closed_early():
+    with ValidatorWorker(backend='test_validator_worker:EchoBackend') as worker:
+        assert [r.phenopacket_id for r in islice(worker.validate_batch(phenopackets("p0", "p1", "p2")), 1)] == ["p0"]
+        assert [r.phenopacket_id for r in worker.validate_batch(phenopackets("p3"))] == ["p3"]
+
+
+def test_worker_invalid_backend():
+    with pytest.raises(ValueError):
+        ValidatorWorker(backend='no_class')
+    with pytest.raises(RuntimeError):
+        ValidatorWorker(backend='test_validator_worker:MissingBackend').start()
+
+
+def test_validator_worker_executor():
+    phenopackets_list = [Phenopacket(id=f"p{i}", phenotypic_features=[
+        PhenotypicFeature(type=OntologyClass(id=f"HP:{i}" if i % 3 else "invalid", label="x"))]) for i in range(10)]
+    validator = Validator()
+    try:
+        results = list(validator.iter_validate(iter(phenopackets_list), executor='worker', batch_size=4))
+        assert results == [validator.check(p) for p in phenopackets_list]
+        assert list(validator.iter_validate(phenopackets_list[:2], executor='worker')) == results[:2]
+    finally:
+        validator.close()
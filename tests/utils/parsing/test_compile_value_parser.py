@@ -0,0 +1,62 @@
+from typing import Any
+
+import pytest
+
+from phenopacket_mapper.data_standards import Coding, Date, ValueSet
+from phenopacket_mapper.data_standards.code_system import HPO, ORDO, OMIM
+from phenopacket_mapper.utils.parsing import compile_value_parser, parse_value
+
+
+@pytest.fixture
+def resources():
+    return [HPO, ORDO, OMIM]
+
+
+@pytest.mark.parametrize("value_set, kinds", [
+    (ValueSet([int]), ('int',)),
+    (ValueSet([Date]), ('date',)),
+    (ValueSet([HPO]), ('coding',)),
+    (ValueSet([ORDO, OMIM]), ('coding',)),
+    (ValueSet([Date, "Antenatal", "At birth"]), ('date', 'str')),
+    (ValueSet(["Female", "Male"]), ('str',)),
+    (ValueSet([str, int, bool]), ('int', 'bool', 'str')),
+    (ValueSet([1, 2, 3]), ('int',)),
+    (ValueSet([True, False]), ('bool',)),
+    (ValueSet([Any]), ()),
+    (ValueSet([]), ()),
+    ("string, date", ()),
+])
+def test_compile_value_parser_kinds(value_set, kinds, resources):
+    assert compile_value_parser(value_set, resources).kinds == kinds
+
+
+@pytest.mark.parametrize("value_set, value_str, expected", [
+    (ValueSet([int]), "2024", 2024),
+    (ValueSet([int]), " 17 ", 17),
+    (ValueSet([int]), "3.0", 3),
+    (ValueSet([float]), "3", 3.0),
+    (ValueSet([Date]), "2024", Date(year=2024)),
+    (ValueSet([Date]), "12/07/2005", Date(year=2005, month=7, day=12)),
+    (ValueSet([HPO]), "HP:0000098", Coding(system=HPO, code="0000098")),
+    (ValueSet([ORDO, OMIM]), "OMIM:614106", Coding(system=OMIM, code="614106")),
+    (ValueSet([Date, "Antenatal", "At birth"]), "At birth", "At birth"),
+    (ValueSet([Date, "Antenatal", "At birth"]), "2005-07-12", Date(year=2005, month=7, day=12)),
+    (ValueSet(["Female", "Male"]), "Male", "Male"),
+    (ValueSet([True, False]), "f", False),
+    (ValueSet([str]), "2024", "2024"),
+])
+def test_compiled_value_parser(value_set, value_str, expected, resources):
+    value = compile_value_parser(value_set, resources)(value_str)
+    assert value == expected
+    assert type(value) is type(expected)
+
+
+@pytest.mark.parametrize("value_set, value_str", [
+    (ValueSet([int]), "ORPHA:558"),  # does not match the value set
+    (ValueSet(["Female", "Male"]), "f"),  # not one of the enumerated strings
+    (ValueSet([Any]), "2024-01-01"),
+    (ValueSet([Any]), "HP:0000098"),
+    (ValueSet([Any]), "word"),
+])
+def test_compiled_value_parser_falls_back(value_set, value_str, resources):
+    assert compile_value_parser(value_set, resources)(value_str) == parse_value(value_str, resources)
@@ -0,0 +1,69 @@
+import pytest
+
+from phenopacket_mapper.data_standards import Date, Coding
+from phenopacket_mapper.data_standards.code_system import HPO, ORDO
+from phenopacket_mapper.utils.parsing import ParseCache, parse_date, parse_coding, resources_fingerprint
+
+
+@pytest.fixture
+def cache():
+    return ParseCache(max_size=2)
+
+
+def test_parse_cache_hits_and_misses(cache):
+    for value_str in ["1", "1", "2", "1", "2", "2"]:
+        cache.parse("field", value_str, (), int)
+
+    assert cache.stats.misses == 2
+    assert cache.stats.hits == 4
+    assert cache.stats.hit_rate == pytest.approx(4 / 6)
+
+
+def test_parse_cache_keyed_by_field_and_resources():
+    cache = ParseCache()
+    cache.parse("field_0", "1", (), int)
+    cache.parse("field_1", "1", (), str)
+    cache.parse("field_1", "1", resources_fingerprint([HPO]), str)
+
+    assert cache.stats.misses == 3
+    assert cache.parse("field_0", "1", (), str) == 1
+
+
+def test_parse_cache_lru_eviction(cache):
+    cache.parse("field", "1", (), int)
+    cache.parse("field", "2", (), int)
+    cache.parse("field", "1", (), int)  # "2" is now least recently used
+    cache.parse("field", "3", (), int)
+
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    cache.parse("field", "1", (), int)
+    assert cache.stats.misses == 3
+    cache.parse("field", "2", (), int)
+    assert cache.stats.misses == 4
+
+
+def test_parse_cache_shares_immutable_values(cache):
+    def parse(value_str):
+        return parse_coding(value_str, [ORDO])
+
+    first = cache.parse("field", "ORPHA:558", (), parse)
+    second = cache.parse("field", "ORPHA:558", (), parse)
+
+    assert first == Coding(system=ORDO, code="558")
+    assert first is second
+
+
+def test_parse_cache_copies_dates(cache):
+    first = cache.parse("field", "2024-01-01", (), parse_date)
+    first.year = 1999
+    second = cache.parse("field", "2024-01-01", (), parse_date)
+
+    assert second == Date(year=2024, month=1, day=1)
+    assert second is not first
+
+
+def test_resources_fingerprint():
+    assert resources_fingerprint([HPO, ORDO]) == resources_fingerprint([HPO, ORDO])
+    assert resources_fingerprint([HPO, ORDO]) != resources_fingerprint([HPO.set_version("2024-01-01"), ORDO])
+    assert resources_fingerprint([]) == resources_fingerprint(None) == ()
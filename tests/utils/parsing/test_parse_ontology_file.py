@@ -0,0 +1,82 @@
+import gzip
+import json
+
+import pytest
+
+from phenopacket_mapper.utils.parsing import OntologyTerm, parse_ontology_file, parse_obo, iri_to_curie
+
+OBO = """format-version: 1.2
+ontology: hp
+
+[Term]
+id: HP:0000001
+name: All
+
+[Term]
+id: HP:0001250
+name: Seizure
+synonym: "Epileptic seizure" EXACT []
+synonym: "Fits \\"and\\" spells" RELATED [HPO:skoehler]
+is_a: HP:0012638 ! Abnormal nervous system physiology
+is_a: HP:0000001 {source="x"} ! All
+
+[Term]
+id: HP:0000006
+name: obsolete Autosomal dominant inheritance
+is_obsolete: true
+replaced_by: HP:0000006
+
+[Typedef]
+id: part_of
+name: part of
+"""
+
+
+def test_parse_obo():
+    terms = list(parse_obo(OBO.splitlines()))
+    assert [t.id for t in terms] == ["HP:0000001", "HP:0001250", "HP:0000006"]
+    assert terms[1] == OntologyTerm(
+        id="HP:0001250", label="Seizure", synonyms=("Epileptic seizure", 'Fits "and" spells'),
+        parents=("HP:0012638", "HP:0000001"))
+    assert terms[2].obsolete and terms[2].replaced_by == "HP:0000006"
+
+
+def test_parse_obographs(tmp_path):
+    graphs = {"graphs": [{
+        "nodes": [
+            {"id": "http://www.orpha.net/ORDO/Orphanet_95157", "lbl": "Acute hepatic porphyria", "type": "CLASS",
+             "meta": {"synonyms": [{"pred": "hasExactSynonym", "val": "AHP"}]}},
+            {"id": "http://www.orpha.net/ORDO/Orphanet_1", "lbl": "obsolete term", "type": "CLASS",
+             "meta": {"deprecated": True, "basicPropertyValues": [
+                 {"pred": "http://purl.obolibrary.org/obo/IAO_0100001",
+                  "val": "http://www.orpha.net/ORDO/Orphanet_95157"}]}},
+            {"id": "http://www.orpha.net/ORDO/part_of", "lbl": "part of", "type": "PROPERTY"},
+        ],
+        "edges": [{"sub": "http://www.orpha.net/ORDO/Orphanet_95157", "pred": "is_a",
+                   "obj": "http://www.orpha.net/ORDO/Orphanet_738"}],
+    }]}
+    path = tmp_path / "ordo.json.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(graphs, f)
+
+    terms = list(parse_ontology_file(path))
+    assert terms == [
+        OntologyTerm(id="Orphanet:95157", label="Acute hepatic porphyria", synonyms=("AHP",),
+                     parents=("Orphanet:738",)),
+        OntologyTerm(id="Orphanet:1", label="obsolete term", obsolete=True, replaced_by="Orphanet:95157"),
+    ]
+
+
+def test_parse_ontology_file_obo(tmp_path):
+    path = tmp_path / "hp.obo"
+    path.write_text(OBO, encoding="utf-8")
+    assert len(list(parse_ontology_file(path))) == 3
+
+
+def test_parse_ontology_file_unsupported(tmp_path):
+    with pytest.raises(ValueError):
+        list(parse_ontology_file(tmp_path / "hp.owl"))
+
+
+def test_iri_to_curie():
+    assert iri_to_curie("http://purl.obolibrary.org/obo/MONDO_0007739") == "MONDO:0007739"
@@ -0,0 +1,22 @@
+import io
+
+import pytest
+
+from phenopacket_mapper.utils import encode_varint, decode_varint, read_varint
+
+
+@pytest.mark.parametrize('value', [0, 1, 127, 128, 300, 2 ** 32, 2 ** 63 - 1])
+def test_varint_round_trip(value):
+    encoded = encode_varint(value)
+    assert decode_varint(encoded + b'\x05') == (value, len(encoded))
+    assert read_varint(io.BytesIO(encoded)) == value
+
+
+def test_varint_errors():
+    with pytest.raises(ValueError):
+        encode_varint(-1)
+    with pytest.raises(ValueError):
+        decode_varint(b'\x80')
+    with pytest.raises(ValueError):
+        read_varint(io.BytesIO(b'\x80'))
+    assert read_varint(io.BytesIO(b'')) is None